@@ -1,45 +1,35 @@
-import os
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from langchain_core.output_parsers import JsonOutputParser
-from pydantic import BaseModel, Field
 from dotenv import load_dotenv
+from cv_compactor import compact_cv, estimate_tokens
+from llm_gateway import LLMError, get_llm_gateway
 
 load_dotenv()
 
-# Define the output structure
-class Assessment(BaseModel):
-    score: int = Field(description="Score between 0 and 100")
-    reasoning: str = Field(description="Concise explanation for the score")
-
-# Initialize LLM
-# We use Groq as requested by user
-llm = ChatGroq(
-    temperature=0, 
-    model_name="llama-3.1-8b-instant", 
-    api_key=os.environ.get("GROQ_API_KEY") # Ensure this env var matches what user set
+SYSTEM_PROMPT = (
+    "You are an expert AI Technical Recruiter. Your job is to screen candidates for a Generic Senior Software Engineer role. "
+    "Look for mentions of: Python, JavaScript, React, FastAPI, SQL, System Design. "
+    "Be strict but fair. "
+    "Output MUST be strict JSON with keys: 'score' (integer 0-100) and 'reasoning' (string)."
 )
 
-# Create Prompt
-prompt = ChatPromptTemplate.from_messages([
-    ("system", "You are an expert AI Technical Recruiter. Your job is to screen candidates for a Generic Senior Software Engineer role. "
-               "Look for mentions of: Python, JavaScript, React, FastAPI, SQL, System Design. "
-               "Be strict but fair. "
-               "Output MUST be strict JSON with keys: 'score' (integer 0-100) and 'reasoning' (string)."),
-    ("user", "Candidate Name: {name}\nEmail: {email}\n\nCV Content:\n{cv_text}")
-])
-
-parser = JsonOutputParser(pydantic_object=Assessment)
+def score_candidate(name: str, email: str, cv_text: str):
+    """
+    Score a CV 0-100 with reasoning.
+    Raises LLMError if the model is unavailable or gives no usable score:
+    the caller retries later rather than recording a 0.
+    """
+    if not cv_text or len(cv_text) < 50:
+        return {"score": 0, "reasoning": "CV content too short or empty."}
 
-chain = prompt | llm | parser
+    # Fit the CV into the token budget: cheaper, faster calls and fewer TPM limit hits
+    compacted = compact_cv(cv_text)
+    print(f"CV compaction: ~{estimate_tokens(cv_text)} -> ~{estimate_tokens(compacted)} tokens")
 
-def score_candidate(name: str, email: str, cv_text: str):
+    result = get_llm_gateway().chat_json("cv_scoring", [
+        {"role": "system", "content": SYSTEM_PROMPT},
+        {"role": "user", "content": f"Candidate Name: {name}\nEmail: {email}\n\nCV Content:\n{compacted}"}
+    ])
     try:
-        if not cv_text or len(cv_text) < 50:
-            return {"score": 0, "reasoning": "CV content too short or empty."}
-            
-        result = chain.invoke({"name": name, "email": email, "cv_text": cv_text})
-        return result
-    except Exception as e:
-        print(f"AI Error: {e}")
-        return {"score": 0, "reasoning": "AI scoring failed due to error."}
+        score = max(0, min(100, int(result["score"])))
+    except (KeyError, TypeError, ValueError):
+        raise LLMError("AI response has no valid score")
+    return {"score": score, "reasoning": str(result.get("reasoning", ""))}
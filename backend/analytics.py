@@ -0,0 +1,80 @@
+"""
+Recruitment Analytics
+Turns applicant_stats counter rows (maintained by triggers, see
+migrations/add_applicant_stats.sql) into dashboard statistics.
+
+A project has a few dozen counter rows however many applicants it has, so
+stats cost one small indexed read instead of downloading every applicant.
+"""
+
+import datetime
+from typing import Dict, Iterable, List, Optional
+
+# Configuration
+STATS_DAYS = 30  # applications-per-day window, ending today (UTC)
+
+SCORE_BANDS = list(range(0, 100, 10))  # '0' = 0-9 ... '90' = 90-100
+# Upper bounds (seconds) of the time_to_score buckets; anything slower is 'inf'
+TIME_TO_SCORE_BOUNDS = [5, 10, 30, 60, 120, 300, 600, 1800, 3600, 21600, 86400]
+
+
+def stats_since(days: int = STATS_DAYS) -> str:
+    """First day (YYYY-MM-DD, UTC) of the applications-per-day window."""
+    today = datetime.datetime.now(datetime.timezone.utc).date()
+    return (today - datetime.timedelta(days=days - 1)).isoformat()
+
+
+def stats_filter(since: str) -> str:
+    """PostgREST or-filter: every counter except days before the window."""
+    return f"metric.neq.day,bucket.gte.{since}"
+
+
+def median_time_to_score(buckets: Dict[str, int]) -> Optional[float]:
+    """
+    Median seconds from application to AI score, estimated from the bucket
+    counts by interpolating inside the bucket holding the middle applicant.
+    """
+    total = sum(buckets.values())
+    if total == 0:
+        return None
+    half = total / 2
+    seen = 0
+    lower = 0
+    for upper in TIME_TO_SCORE_BOUNDS:
+        count = buckets.get(str(upper), 0)
+        if count and seen + count >= half:
+            return round(lower + (upper - lower) * (half - seen) / count, 1)
+        seen += count
+        lower = upper
+    return float(TIME_TO_SCORE_BOUNDS[-1])  # median is beyond the last bound
+
+
+def summarize(rows: Iterable[dict], since: str) -> dict:
+    """Fold counter rows (metric, bucket, count), from one or more projects, into stats."""
+    counters: Dict[str, Dict[str, int]] = {"status": {}, "score": {}, "day": {}, "time_to_score": {}}
+    for row in rows:
+        buckets = counters.setdefault(row["metric"], {})
+        buckets[row["bucket"]] = buckets.get(row["bucket"], 0) + row["count"]
+
+    by_status = {status: n for status, n in sorted(counters["status"].items()) if n}
+    scores = counters["score"]
+    histogram = [
+        {"min": band, "max": band + 9 if band < 90 else 100, "count": scores.get(str(band), 0)}
+        for band in SCORE_BANDS
+    ]
+
+    start = datetime.date.fromisoformat(since)
+    days = (datetime.datetime.now(datetime.timezone.utc).date() - start).days + 1
+    per_day: List[dict] = []
+    for offset in range(max(days, 0)):
+        day = (start + datetime.timedelta(days=offset)).isoformat()
+        per_day.append({"date": day, "count": counters["day"].get(day, 0)})
+
+    return {
+        "total": sum(by_status.values()),
+        "by_status": by_status,
+        "score_histogram": histogram,
+        "unscored": scores.get("unscored", 0),
+        "applications_per_day": per_day,
+        "median_time_to_score_seconds": median_time_to_score(counters["time_to_score"])
+    }
@@ -0,0 +1,41 @@
+"""
+Index existing CVs for full-text search (run once after migrations/add_cv_search.sql).
+The migration indexes uncompressed rows itself; this decompresses the rest.
+/apply indexes CVs best effort: re-run this to catch up any it logged as
+"index_cv_text failed". Safe to re-run: already indexed CVs are skipped.
+
+Usage: python backfill_cv_search.py
+"""
+
+from database import supabase
+from cv_search import SEARCH_MAX_CHARS
+from services.cv_store import decode_row
+
+BATCH_SIZE = 100
+
+
+def backfill() -> None:
+    last_hash, indexed = "", 0
+    while True:
+        res = supabase.table("cv_contents")\
+            .select("cv_hash, codec, body")\
+            .neq("codec", "none")\
+            .gt("cv_hash", last_hash)\
+            .order("cv_hash")\
+            .limit(BATCH_SIZE)\
+            .execute()
+        rows = res.data or []
+        for row in rows:
+            text = decode_row(row)
+            # No p_owner_id: indexed for every owner with an applicant holding this CV
+            supabase.rpc("index_cv_text", {"p_cv_hash": row["cv_hash"], "p_text": text[:SEARCH_MAX_CHARS]}).execute()
+            indexed += 1
+        if len(rows) < BATCH_SIZE:
+            break
+        last_hash = rows[-1]["cv_hash"]
+        print(f"   indexed {indexed} CVs...")
+    print(f"✅ Indexed {indexed} compressed CVs")
+
+
+if __name__ == "__main__":
+    backfill()
@@ -0,0 +1,144 @@
+"""
+Async Data Access Benchmark
+Throughput of list_applicants, /apply (duplicate path) and /employees/ under
+concurrency, with the same handlers querying through the sync client in the
+threadpool (the default) or the pooled async client (SUPABASE_ASYNC_CLIENT).
+
+Both run against the test suite's PostgREST stand-in (conftest.StubServer),
+in its own process, with a fixed latency per query (default 40 ms, roughly
+a Supabase round trip). Each model is run --rounds times, alternating, and
+the median is reported. Pool settings come from the environment
+(SUPABASE_POOL_SIZE, SUPABASE_HTTP2).
+
+Usage: python bench_async_db.py [--latency 0.04] [--concurrency 100] [--requests 1000] [--rounds 3]
+"""
+
+import argparse
+import asyncio
+import multiprocessing
+import os
+import statistics
+import threading
+import time
+import uuid
+
+from conftest import EPOCH, StubReply, StubServer
+
+ORG_ID = str(uuid.uuid4())
+PROJECT_ID = str(uuid.uuid4())
+USER_ID = str(uuid.uuid4())
+NOW = "2024-01-01T00:00:00+00:00"
+
+APPLICANTS = [{
+    "id": str(uuid.uuid4()), "project_id": PROJECT_ID, "name": f"Candidate {i}",
+    "email": f"c{i}@example.com", "ai_score": 100 - i, "ai_reasoning": "Solid backend experience.",
+    "status": "processing", "experience_years": 3, "key_skills": "python, sql",
+    "cv_valid": True, "created_at": NOW, "updated_at": NOW
+} for i in range(11)]
+
+EMPLOYEES = [{
+    "id": str(uuid.uuid4()), "name": f"Employee {i}", "email": f"e{i}@example.com",
+    "role": "Engineer", "department": "Tech", "join_date": NOW, "leave_remaining": 12,
+    "status": "active", "created_at": NOW, "updated_at": NOW
+} for i in range(10)]
+
+
+def route(server, request):
+    table = request.table
+    if table == "organizations":
+        rows = [{"id": ORG_ID, "name": "Bench Org", "owner_id": USER_ID}]
+    elif table == "projects":
+        rows = [{"id": PROJECT_ID, "org_id": ORG_ID, "owner_id": USER_ID, "name": "Backend Engineer",
+                 "is_active": True, "deleted_at": EPOCH}]
+    elif table == "applicants":
+        rows = APPLICANTS if "limit" in request.query else [{"id": APPLICANTS[0]["id"]}]
+    elif table == "employees":
+        rows = EMPLOYEES
+    else:
+        rows = []
+    return StubReply(rows, delay=server.latency)
+
+
+def build_app():
+    from fastapi import FastAPI
+    from routers import recruitment, employees
+
+    app = FastAPI()
+    app.include_router(recruitment.router)
+    app.include_router(employees.router, prefix="/employees")
+    return app
+
+
+def make_token() -> str:
+    import jwt
+    return jwt.encode({"sub": USER_ID}, "bench-secret", algorithm="HS256")
+
+
+async def drive(app, method: str, path: str, concurrency: int, total: int, **kwargs) -> float:
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        remaining = total
+
+        async def worker():
+            nonlocal remaining
+            while remaining > 0:
+                remaining -= 1
+                res = await client.request(method, path, **kwargs)
+                assert res.status_code == 200, res.text
+
+        start = time.perf_counter()
+        await asyncio.gather(*(worker() for _ in range(concurrency)))
+        return total / (time.perf_counter() - start)
+
+
+def serve(latency: float, urls) -> None:
+    urls.put(StubServer(route, latency=latency).url)
+    threading.Event().wait()
+
+
+async def main(latency: float, concurrency: int, total: int, rounds: int) -> None:
+    # In its own process, like the real database: its CPU time is not the app's
+    urls = multiprocessing.Queue()
+    server = multiprocessing.Process(target=serve, args=(latency, urls), daemon=True)
+    server.start()
+    os.environ["SUPABASE_URL"] = urls.get()
+    os.environ["SUPABASE_KEY"] = "bench-key"
+    os.environ.pop("SUPABASE_JWT_SECRET", None)  # unverified tokens, as in local dev
+    import database
+    app = build_app()
+
+    auth = {"Authorization": f"Bearer {make_token()}"}
+    cv = {"cv": ("cv.pdf", b"%PDF-1.4 benchmark resume", "application/pdf")}
+    scenarios = [
+        ("list_applicants", "GET", f"/applicants?project_id={PROJECT_ID}&limit=10", {"headers": auth}),
+        ("/apply (duplicate)", "POST", "/apply", {
+            "headers": {"X-PROJECT-ID": PROJECT_ID},
+            "data": {"name": "Bench", "email": "bench@example.com"}, "files": cv}),
+        ("/employees/", "GET", "/employees/", {"headers": auth}),
+    ]
+
+    print(f"PostgREST latency {latency * 1000:.0f} ms, concurrency {concurrency}, {total} requests each, "
+          f"median of {rounds}; async pool {database.SUPABASE_POOL_SIZE}, HTTP/2 {database.SUPABASE_HTTP2}\n")
+    print(f"{'endpoint':<22}{'sync + threadpool':>20}{'async pooled':>16}{'speedup':>10}")
+    for label, method, path, kwargs in scenarios:
+        results = {False: [], True: []}
+        for _ in range(rounds):
+            for use_async in (False, True):
+                database.SUPABASE_ASYNC_CLIENT = use_async
+                results[use_async].append(await drive(app, method, path, concurrency, total, **kwargs))
+        sync_rps, async_rps = statistics.median(results[False]), statistics.median(results[True])
+        print(f"{label:<22}{sync_rps:>15,.0f} rq/s{async_rps:>11,.0f} rq/s{async_rps / sync_rps:>9.1f}x")
+
+    await database.close_async_supabase()
+    server.terminate()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--latency", type=float, default=0.04)
+    parser.add_argument("--concurrency", type=int, default=100)
+    parser.add_argument("--requests", type=int, default=1000)
+    parser.add_argument("--rounds", type=int, default=3)
+    args = parser.parse_args()
+    asyncio.run(main(args.latency, args.concurrency, args.requests, args.rounds))
@@ -0,0 +1,63 @@
+-- CV Search Benchmark
+-- search_applicants latency with 100k indexed CVs across 50 organizations,
+-- 2,000 of them the caller's. Needs the migrations (add_cv_search.sql last)
+-- and at least one auth user, who plays the caller. Everything runs in one
+-- transaction and is rolled back.
+--
+-- Usage: psql "$DATABASE_URL" -f bench_cv_search.sql
+
+\timing on
+BEGIN;
+
+CREATE TEMP TABLE bench_owner AS SELECT id AS owner_id FROM auth.users LIMIT 1;
+CREATE TEMP TABLE bench_project (id uuid);
+
+WITH org AS (
+    INSERT INTO organizations (name, owner_id)
+    SELECT 'Bench Org', owner_id FROM bench_owner
+    RETURNING id, owner_id
+), project AS (
+    INSERT INTO projects (org_id, name, template_id, owner_id)
+    SELECT id, 'Bench Project', 'recruitment-ai-v1', owner_id FROM org
+    RETURNING id
+)
+INSERT INTO bench_project SELECT id FROM project;
+
+-- 300 words per CV from a mixed English / Indonesian vocabulary
+INSERT INTO cv_search (owner_id, cv_hash, tsv)
+SELECT CASE WHEN i <= 2000 THEN b.owner_id
+            ELSE ('00000000-0000-0000-0000-0000000000' || lpad((i % 49 + 1)::text, 2, '0'))::uuid END,
+       'bench-' || i,
+       to_tsvector('simple', (
+           SELECT string_agg((ARRAY[
+               'python', 'java', 'go', 'sql', 'postgres', 'react', 'docker', 'kubernetes', 'aws', 'fastapi',
+               'django', 'spring', 'rust', 'kotlin', 'swift', 'figma', 'excel', 'sales', 'marketing', 'finance',
+               'akuntansi', 'pemasaran', 'manajemen', 'engineer', 'analyst', 'designer', 'manager', 'intern',
+               'senior', 'junior'
+           ])[1 + floor(random() * 30)::int], ' ')
+           FROM generate_series(1, 300 + i * 0)  -- i * 0: a new CV per row, not one shared subquery result
+       ))
+FROM generate_series(1, 100000) AS i
+CROSS JOIN bench_owner b;
+
+INSERT INTO applicants (project_id, name, email, cv_hash, status)
+SELECT p.id, 'Candidate ' || i, 'c' || i || '@example.com', 'bench-' || i, 'processing'
+FROM generate_series(1, 2000) AS i
+CROSS JOIN bench_project p;
+
+ANALYZE cv_search;
+ANALYZE applicants;
+
+-- The match: one bitmap scan of idx_cv_search_owner_tsv on owner and terms together
+EXPLAIN (ANALYZE, BUFFERS)
+SELECT count(*)
+FROM cv_search
+WHERE owner_id = (SELECT owner_id FROM bench_owner)
+  AND tsv @@ websearch_to_tsquery('simple', 'python postgres');
+
+-- End to end (\timing): a common pair, a phrase with an exclusion, a rare term
+SELECT count(*) FROM search_applicants((SELECT owner_id FROM bench_owner), 'python postgres');
+SELECT count(*) FROM search_applicants((SELECT owner_id FROM bench_owner), '"senior engineer" -intern');
+SELECT count(*) FROM search_applicants((SELECT owner_id FROM bench_owner), 'akuntansi kotlin figma swift');
+
+ROLLBACK;
@@ -0,0 +1,89 @@
+"""
+Near-Duplicate Detection Benchmark
+Cost of MinHash signing, LSH insert and LSH query at --cvs indexed CVs, with
+a brute-force scan for comparison. The index is an in-memory dict of band key
+-> applicant ids, standing in for the GIN index on cv_signatures.bands.
+
+Background CVs get random signatures (unrelated CVs agree on ~0 bins, and
+signing 100k texts would only measure signing again); --planted real CV
+texts are signed and indexed, then queried with edited copies to measure
+recall at the threshold.
+
+Usage: python bench_near_duplicates.py [--cvs 100000] [--planted 200]
+"""
+
+import argparse
+import random
+import time
+from collections import defaultdict
+
+from near_duplicates import (
+    NEAR_DUPLICATE_THRESHOLD, SIGNATURE_SIZE, band_keys, best_match, estimate_similarity, minhash_signature
+)
+
+PROJECT_ID = "bench-project"
+VOCABULARY = [f"{stem}{i}" for stem in ("python", "sales", "ledger", "design", "client", "report", "team", "cloud") for i in range(60)]
+
+
+def make_cv(rng: random.Random, words: int = 600) -> str:
+    return " ".join(rng.choices(VOCABULARY, k=words))
+
+
+def edit(rng: random.Random, text: str) -> str:
+    """A resubmission: a couple of words changed and a contact line added."""
+    words = text.split()
+    for _ in range(2):
+        words[rng.randrange(len(words))] = rng.choice(VOCABULARY)
+    return " ".join(words + ["updated", "phone", str(rng.randint(10 ** 9, 10 ** 10))])
+
+
+def main(n: int, planted: int) -> None:
+    rng = random.Random(7)
+    texts = [make_cv(rng) for _ in range(planted)]
+    edits = [edit(rng, text) for text in texts]
+
+    start = time.perf_counter()
+    planted_sigs = [minhash_signature(text) for text in texts]
+    sign = (time.perf_counter() - start) / planted
+    print(f"sign (600-word CV){sign * 1e6:>22,.0f} us/CV")
+
+    signatures = [[rng.getrandbits(62) for _ in range(SIGNATURE_SIZE)] for _ in range(n - planted)] + planted_sigs
+    index = defaultdict(list)
+    start = time.perf_counter()
+    for i, signature in enumerate(signatures):
+        for key in band_keys(PROJECT_ID, signature):
+            index[key].append(i)
+    insert = (time.perf_counter() - start) / n
+    print(f"insert ({n:,} CVs){insert * 1e6:>23,.0f} us/CV   ({len(index):,} band keys)")
+
+    queries = [minhash_signature(text) for text in edits]
+    found = candidates = 0
+    similarities = []
+    start = time.perf_counter()
+    for expected, signature in zip(range(n - planted, n), queries):
+        ids = {i for key in band_keys(PROJECT_ID, signature) for i in index.get(key, ())}
+        candidates += len(ids)
+        match = best_match(signature, [{"id": i, "signature": signatures[i]} for i in ids])
+        found += bool(match and match[0]["id"] == expected)
+        similarities.append(estimate_similarity(signature, signatures[expected]))
+    query = (time.perf_counter() - start) / planted
+    print(f"query (LSH){query * 1e6:>29,.0f} us/CV   ({candidates / planted:.1f} candidates)")
+
+    brute_n = min(planted, 10)
+    start = time.perf_counter()
+    for signature in queries[:brute_n]:
+        best_match(signature, [{"id": i, "signature": s} for i, s in enumerate(signatures)])
+    brute = (time.perf_counter() - start) / brute_n
+    print(f"query (brute force){brute * 1e6:>21,.0f} us/CV   ({brute / query:,.0f}x slower)")
+
+    similarities.sort()
+    print(f"\nrecall at {NEAR_DUPLICATE_THRESHOLD}: {found}/{planted}, "
+          f"estimated similarity of edits: min {similarities[0]:.2f}, median {similarities[len(similarities) // 2]:.2f}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=100000)
+    parser.add_argument("--planted", type=int, default=200)
+    args = parser.parse_args()
+    main(args.cvs, args.planted)
@@ -0,0 +1,76 @@
+"""
+Rate Limiter Benchmark
+Compares the sliding-window counter against the old per-key timestamp lists
+at 100k distinct client IPs.
+
+Usage: python bench_rate_limiter.py
+"""
+
+import random
+import time
+import tracemalloc
+from collections import defaultdict
+
+from rate_limit_backends import SlidingWindowCounter
+from rate_limiter import RATE_LIMIT_PER_IP, RATE_LIMIT_PER_PROJECT, RATE_LIMIT_WINDOW
+
+N_CLIENTS = 100_000
+N_PROJECTS = 200
+N_REQUESTS = 500_000
+
+
+def legacy_check(store, key: str, limit: int, window: int, now: float) -> bool:
+    """The previous implementation: rebuild the timestamp list on every check."""
+    store[key] = [t for t in store[key] if now - t < window]
+    if len(store[key]) >= limit:
+        return False
+    store[key].append(now)
+    return True
+
+
+def make_keys(prefix: str, n_keys: int):
+    rng = random.Random(42)
+    names = [f"{prefix}:{i}" for i in range(n_keys)]
+    # Skewed traffic: a few hot keys, a long tail of one-off visitors
+    return [names[min(int(rng.paretovariate(1.2)) - 1, n_keys - 1)] if rng.random() < 0.5
+            else rng.choice(names) for _ in range(N_REQUESTS)]
+
+
+def run(label: str, check, store, keys, limit: int) -> None:
+    now = 1_700_000_000.0
+
+    start = time.perf_counter()
+    for i, key in enumerate(keys):
+        check(key, limit, RATE_LIMIT_WINDOW, now + i * 0.01)
+    elapsed = time.perf_counter() - start
+
+    # Second pass (one window later) under tracemalloc for resident memory
+    tracemalloc.start()
+    for i, key in enumerate(keys):
+        check(key, limit, RATE_LIMIT_WINDOW, now + RATE_LIMIT_WINDOW + i * 0.01)
+    _, peak = tracemalloc.get_traced_memory()
+    tracemalloc.stop()
+
+    print(f"{label:<26} {N_REQUESTS / elapsed:>12,.0f} checks/s   "
+          f"{elapsed / N_REQUESTS * 1e6:>6.2f} us/check   "
+          f"{len(store):>7,} keys   +{peak / 1e6:.1f} MB on second window")
+
+
+def compare(title: str, keys, limit: int) -> None:
+    print(f"{title}: {N_REQUESTS:,} checks, limit {limit}/window")
+
+    legacy_store = defaultdict(list)
+    run("  timestamp lists (old)", lambda k, l, w, n: legacy_check(legacy_store, k, l, w, n),
+        legacy_store, keys, limit)
+
+    counter = SlidingWindowCounter()
+    run("  sliding window counter", counter.hit, counter, keys, limit)
+
+    bounded = SlidingWindowCounter(capacity=10_000)
+    run("  sliding window, 10k cap", bounded.hit, bounded, keys, limit)
+    print()
+
+
+if __name__ == "__main__":
+    compare(f"Per-IP ({N_CLIENTS:,} distinct IPs)", make_keys("ip", N_CLIENTS), RATE_LIMIT_PER_IP)
+    compare(f"Per-project ({N_PROJECTS} projects)", make_keys("project", N_PROJECTS), RATE_LIMIT_PER_PROJECT)
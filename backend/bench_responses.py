@@ -0,0 +1,115 @@
+"""
+Response Serialization Benchmark
+A 5,000-applicant listing served four ways: the previous response_model path
+(validate every row, then serialize), trusted rows through orjson, and orjson
+plus gzip / brotli compression. Reports CPU per request and bytes on the
+wire. CPU is measured in-process, so the compressed rows also include the
+test client's decompression.
+
+Usage: python bench_responses.py [--rows 5000] [--requests 20]
+"""
+
+import argparse
+import asyncio
+import os
+import random
+import time
+import uuid
+from typing import List
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "bench-key")
+
+from fastapi import FastAPI, Response
+from models import Applicant
+from responses import CompressionMiddleware, trusted_json, brotli
+
+SKILLS = ["python", "sql", "react", "docker", "kubernetes", "go", "typescript", "aws", "figma", "excel"]
+
+
+def make_rows(n: int) -> List[dict]:
+    rng = random.Random(7)
+    project_id = str(uuid.uuid4())
+    return [{
+        "id": str(uuid.uuid4()),
+        "project_id": project_id,
+        "name": f"Candidate {i}",
+        "email": f"candidate{i}@example.com",
+        "ai_score": rng.randint(0, 100),
+        "ai_reasoning": "Relevant backend experience; strong SQL and API design, limited cloud exposure.",
+        "status": rng.choice(["processing", "approved", "rejected", "interview_approved"]),
+        "experience_years": rng.randint(0, 15),
+        "key_skills": ", ".join(rng.sample(SKILLS, 4)),
+        "cv_valid": True,
+        "created_at": "2024-05-01T10:00:00.123456+00:00",
+        "updated_at": "2024-05-02T11:30:00.654321+00:00"
+    } for i in range(n)]
+
+
+def build_apps(rows: List[dict]):
+    validated = FastAPI()
+
+    @validated.get("/applicants", response_model=List[Applicant])
+    async def list_validated():
+        return rows
+
+    trusted = FastAPI()
+
+    @trusted.get("/applicants", response_model=List[Applicant])
+    async def list_trusted(response: Response):
+        return trusted_json(rows, response)
+
+    compressed = FastAPI()
+
+    @compressed.get("/applicants", response_model=List[Applicant])
+    async def list_compressed(response: Response):
+        return trusted_json(rows, response)
+
+    compressed.add_middleware(CompressionMiddleware)
+    return validated, trusted, compressed
+
+
+async def measure(app, encoding: str, n_requests: int):
+    import httpx
+    transport = httpx.ASGITransport(app=app)
+    headers = {"Accept-Encoding": encoding} if encoding else {"Accept-Encoding": "identity"}
+    async with httpx.AsyncClient(transport=transport, base_url="http://bench") as client:
+        await client.get("/applicants", headers=headers)  # warm-up
+        cpu = time.process_time()
+        wire = 0
+        for _ in range(n_requests):
+            res = await client.get("/applicants", headers=headers)
+            assert res.status_code == 200
+            wire = int(res.headers["content-length"])
+        cpu = (time.process_time() - cpu) / n_requests
+    return cpu, wire
+
+
+async def main(n_rows: int, n_requests: int) -> None:
+    rows = make_rows(n_rows)
+    validated, trusted, compressed = build_apps(rows)
+    scenarios = [
+        ("response_model (before)", validated, ""),
+        ("trusted rows + orjson", trusted, ""),
+        ("orjson + gzip", compressed, "gzip"),
+    ]
+    if brotli is not None:
+        scenarios.append(("orjson + brotli", compressed, "br"))
+
+    print(f"{n_rows:,} applicants, {n_requests} requests each\n")
+    print(f"{'variant':<26}{'CPU / request':>15}{'bytes on wire':>16}")
+    base_cpu = None
+    for label, app, encoding in scenarios:
+        cpu, wire = await measure(app, encoding, n_requests)
+        base_cpu = base_cpu or cpu
+        print(f"{label:<26}{cpu * 1000:>12.1f} ms{wire:>16,}   ({base_cpu / cpu:.1f}x CPU)")
+    if brotli is None:
+        print("\n(brotli not installed: pip install brotli)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--rows", type=int, default=5000)
+    parser.add_argument("--requests", type=int, default=20)
+    args = parser.parse_args()
+    asyncio.run(main(args.rows, args.requests))
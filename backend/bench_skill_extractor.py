@@ -0,0 +1,78 @@
+"""
+CV Profile Extraction Benchmark
+Throughput (CVs/second) of the local /apply extraction stage on synthetic
+CVs: skill matching with pyahocorasick, with the pure-Python automaton, and
+with a naive one-regex-per-alias scan for comparison; then the date-range
+experience parser and the full extract_profile().
+
+Usage: python bench_skill_extractor.py [--cvs 2000]
+"""
+
+import argparse
+import random
+import re
+import time
+
+from skill_extractor import SKILL_TAXONOMY, SkillMatcher, _Automaton, ahocorasick, extract_experience_years, extract_profile
+
+FILLER = ("responsible for delivering features across the platform, working closely with product and design, "
+          "mentoring junior colleagues and improving reliability of production systems. ").split()
+MONTHS = ["Jan", "Feb", "Mar", "Apr", "May", "Jun", "Jul", "Aug", "Sep", "Oct", "Nov", "Dec"]
+
+
+def make_cv(rng: random.Random) -> str:
+    aliases = [alias for aliases in SKILL_TAXONOMY.values() for alias in aliases]
+    lines = ["Summary", " ".join(rng.choices(FILLER, k=60)), "Experience"]
+    year = 2026 - rng.randint(1, 4)
+    for _ in range(rng.randint(2, 5)):
+        start = year - rng.randint(1, 4)
+        lines.append(f"Engineer, Company {rng.randint(1, 999)} | {rng.choice(MONTHS)} {start} - {rng.choice(MONTHS)} {year}")
+        for _ in range(6):
+            words = rng.choices(FILLER, k=25) + rng.sample(aliases, 3)
+            rng.shuffle(words)
+            lines.append(" ".join(words))
+        year = start
+    lines += ["Education", f"BSc Computer Science, {year - 5} - {year - 1}", "Skills", ", ".join(rng.sample(aliases, 12))]
+    return "\n".join(lines)
+
+
+def naive_skills(text: str, patterns) -> list:
+    text = text.lower()
+    return [skill for skill, regex in patterns if regex.search(text)]
+
+
+def measure(label: str, fn, cvs) -> None:
+    start = time.perf_counter()
+    for cv in cvs:
+        fn(cv)
+    elapsed = time.perf_counter() - start
+    print(f"{label:<34}{len(cvs) / elapsed:>12,.0f} CVs/s{elapsed / len(cvs) * 1e6:>12,.0f} us/CV")
+
+
+def main(n: int) -> None:
+    rng = random.Random(11)
+    cvs = [make_cv(rng) for _ in range(n)]
+    avg = sum(len(cv) for cv in cvs) // n
+    aliases = sum(len(a) for a in SKILL_TAXONOMY.values())
+    print(f"{n:,} synthetic CVs (avg {avg:,} chars), {len(SKILL_TAXONOMY)} skills / {aliases} aliases\n")
+
+    naive = [(skill, re.compile(r"(?<![a-z0-9])" + re.escape(alias) + r"(?![a-z0-9])"))
+             for skill, aliases in SKILL_TAXONOMY.items() for alias in aliases]
+    pure = SkillMatcher.__new__(SkillMatcher)
+    pure._iter = _Automaton({a: s for s, al in SKILL_TAXONOMY.items() for a in al}).iter
+
+    measure("skills: regex per alias (naive)", lambda cv: naive_skills(cv, naive), cvs)
+    measure("skills: pure-Python Aho-Corasick", pure.find, cvs)
+    if ahocorasick is not None:
+        measure("skills: pyahocorasick", SkillMatcher(SKILL_TAXONOMY).find, cvs)
+    measure("experience: date ranges", extract_experience_years, cvs)
+    measure("extract_profile (full stage)", extract_profile, cvs)
+    if ahocorasick is None:
+        print("\n(pyahocorasick not installed: pip install pyahocorasick)")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser()
+    parser.add_argument("--cvs", type=int, default=2000)
+    args = parser.parse_args()
+    main(args.cvs)
@@ -0,0 +1,91 @@
+"""
+Cold Start Benchmark
+Time from a fresh interpreter to a ready app, in three steps measured in
+separate processes: `import main`, the lifespan startup (async client and
+background workers) and the warm-up that runs after it (sync client, pypdf,
+python-magic). Also lists the slowest modules by `python -X importtime`.
+
+No network is needed: clients are created but never connect.
+
+Usage: python bench_startup.py [--runs 5] [--top 10]
+"""
+
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+HERE = os.path.dirname(os.path.abspath(__file__))
+
+PROBE = """
+import asyncio, json, time
+started = time.perf_counter()
+import main
+imported = time.perf_counter()
+
+async def startup():
+    async with main.lifespan(main.app):
+        return time.perf_counter()
+
+ready = asyncio.run(startup())
+before_warm_up = time.perf_counter()
+main.warm_up()
+print(json.dumps({
+    "import": imported - started,
+    "lifespan": ready - imported,
+    "warm_up": time.perf_counter() - before_warm_up,
+}))
+"""
+
+
+def env() -> dict:
+    values = dict(os.environ)
+    values.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    values.setdefault("SUPABASE_KEY", "bench-key")
+    values["WARM_UP_ON_START"] = "false"  # measured separately
+    return values
+
+
+def run_probe() -> dict:
+    out = subprocess.run([sys.executable, "-c", PROBE], cwd=HERE, env=env(),
+                         capture_output=True, text=True, check=True).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def slowest_imports(top: int) -> list:
+    """(cumulative ms, module) for the top-level-ish imports of main."""
+    err = subprocess.run([sys.executable, "-X", "importtime", "-c", "import main"], cwd=HERE, env=env(),
+                         capture_output=True, text=True, check=True).stderr
+    rows = []
+    for line in err.splitlines():
+        if not line.startswith("import time:") or "cumulative" in line:
+            continue
+        _, cumulative, name = line[len("import time:"):].split("|")
+        depth = (len(name) - len(name.lstrip())) // 2
+        if depth <= 2:
+            rows.append((int(cumulative) / 1000, name.strip()))
+    return sorted(rows, reverse=True)[:top]
+
+
+def main(runs: int, top: int) -> None:
+    results = [run_probe() for _ in range(runs)]
+    print(f"{runs} cold starts (median / min):")
+    for step in ("import", "lifespan", "warm_up"):
+        values = [r[step] * 1000 for r in results]
+        print(f"  {step:<9} {statistics.median(values):7.0f} ms  {min(values):7.0f} ms")
+    total = [sum(r[step] for step in ("import", "lifespan")) * 1000 for r in results]
+    print(f"  ready     {statistics.median(total):7.0f} ms  {min(total):7.0f} ms  (import + lifespan)")
+
+    print(f"\nSlowest imports under main (cumulative):")
+    for ms, name in slowest_imports(top):
+        print(f"  {ms:7.1f} ms  {name}")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description=__doc__.split("\n")[1])
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument("--top", type=int, default=10)
+    args = parser.parse_args()
+    main(args.runs, args.top)
@@ -0,0 +1,190 @@
+"""
+Shared test fixtures: local stand-ins for the services the backend talks to.
+
+StubServer is a real HTTP server on 127.0.0.1 that answers through a route
+function and records every request, so the backend's own clients (supabase,
+httpx, resend) are exercised end to end. redis_url points at a server that
+runs the rate limit backend's Lua script itself: a real Redis, or fakeredis.
+Timestamps in fake PostgREST rows use ISO 8601, as PostgREST returns them;
+use same_instant() to compare them.
+"""
+
+import datetime
+import json
+import os
+import threading
+import time
+from dataclasses import dataclass, field
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Callable, Dict, List, Mapping, Optional
+from urllib.parse import parse_qs, urlparse
+
+import pytest
+
+# EPOCH_SENTINEL as PostgREST returns it
+EPOCH = "1970-01-01T00:00:00+00:00"
+
+
+@dataclass
+class StubRequest:
+    method: str
+    path: str
+    query: Dict[str, List[str]]
+    headers: Mapping[str, str]  # case-insensitive
+    body: Any
+
+    @property
+    def table(self) -> str:
+        """Last path segment: the table, or the function name of an /rpc/ call."""
+        return self.path.rsplit("/", 1)[-1]
+
+
+@dataclass
+class StubReply:
+    body: Any = None
+    status: int = 200
+    headers: Dict[str, str] = field(default_factory=dict)
+    delay: float = 0.0
+
+
+def postgrest_error(message: str, code: str = "P0001", status: int = 400) -> StubReply:
+    return StubReply({"code": code, "message": message, "details": None, "hint": None}, status)
+
+
+def same_instant(value: Optional[str], other: str) -> bool:
+    """timestamptz equality as Postgres applies it: by instant, not by text."""
+    if value is None:
+        return False
+    return datetime.datetime.fromisoformat(value) == datetime.datetime.fromisoformat(other)
+
+
+def deleted_at_matches(row: dict, condition: Optional[List[str]]) -> bool:
+    """Apply a `deleted_at=eq.<timestamp>` query parameter to a fake row."""
+    if not condition:
+        return True
+    op, _, value = condition[0].partition(".")
+    assert op == "eq", condition
+    return same_instant(row.get("deleted_at"), value)
+
+
+Route = Callable[["StubServer", StubRequest], StubReply]
+
+
+class _HTTPServer(ThreadingHTTPServer):
+    daemon_threads = True
+    request_queue_size = 1024  # read by listen() in __init__: concurrent tests must not overflow it
+
+
+class _StubHandler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"  # keep-alive, like the real services
+    # Headers and body go out in separate writes: with Nagle on, each reply
+    # waits out the client's delayed ACK (~40 ms) and benchmarks measure that.
+    disable_nagle_algorithm = True
+
+    def log_message(self, *args):
+        pass
+
+    def _handle(self):
+        url = urlparse(self.path)
+        length = int(self.headers.get("Content-Length") or 0)
+        raw = self.rfile.read(length) if length else b""
+        request = StubRequest(self.command, url.path, parse_qs(url.query), self.headers,
+                              json.loads(raw) if raw else None)
+        stub = self.server.stub
+        with stub.lock:
+            stub.requests.append(request)
+        reply = stub.route(stub, request)
+        if reply.delay:
+            time.sleep(reply.delay)
+        payload = b"" if reply.body is None else json.dumps(reply.body).encode()
+        try:
+            self.send_response(reply.status)
+            self.send_header("Content-Type", "application/json")
+            self.send_header("Content-Length", str(len(payload)))
+            for name, value in reply.headers.items():
+                self.send_header(name, value)
+            self.end_headers()
+            if self.command != "HEAD":
+                self.wfile.write(payload)
+        except (BrokenPipeError, ConnectionResetError):
+            pass  # the client gave up (deadline tests)
+
+    do_GET = do_POST = do_PATCH = do_DELETE = do_HEAD = _handle
+
+
+class StubServer:
+    """HTTP server answering every request with route(server, request).
+
+    Extra state for the route function goes in attributes on the server
+    (e.g. `server.script`); every request is kept in `server.requests`.
+    """
+
+    def __init__(self, route: Route, **state):
+        self.route = route
+        self.requests: List[StubRequest] = []
+        self.lock = threading.Lock()
+        self.__dict__.update(state)
+        self._server = _HTTPServer(("127.0.0.1", 0), _StubHandler)
+        self._server.stub = self
+        threading.Thread(target=self._server.serve_forever, daemon=True).start()
+
+    @property
+    def url(self) -> str:
+        return f"http://127.0.0.1:{self._server.server_address[1]}"
+
+    def close(self) -> None:
+        self._server.shutdown()
+        self._server.server_close()
+
+
+@pytest.fixture
+def stub_server():
+    """Factory: stub_server(route, **state) starts a StubServer, closed after the test."""
+    servers = []
+
+    def start(route: Route, **state) -> StubServer:
+        servers.append(StubServer(route, **state))
+        return servers[-1]
+
+    yield start
+    for server in servers:
+        server.close()
+
+
+@pytest.fixture
+def fake_postgrest(stub_server, monkeypatch):
+    """Factory: fake_postgrest(route, **state) starts a StubServer and points
+    the database module (sync and async clients) at it for the test."""
+    import database
+
+    def start(route: Route, **state) -> StubServer:
+        server = stub_server(route, **state)
+        monkeypatch.setattr(database, "url", server.url)
+        monkeypatch.setattr(database, "key", "test-key")
+        monkeypatch.setattr(database, "_supabase", None)
+        monkeypatch.setattr(database, "_async_supabase", None)
+        monkeypatch.setattr(database, "_async_http", None)
+        monkeypatch.setattr(database, "_async_lock", None)
+        monkeypatch.setattr(database, "_query_slots", None)
+        monkeypatch.delenv("SUPABASE_JWT_SECRET", raising=False)  # unverified test tokens
+        return server
+
+    return start
+
+
+@pytest.fixture
+def redis_url(monkeypatch):
+    """A Redis-protocol server that runs Lua: TEST_REDIS_URL if set (a real
+    Redis or Valkey; tests keep to their own key prefix), else fakeredis,
+    which every redis.Redis.from_url client then shares. Skips when neither
+    is available."""
+    url = os.getenv("TEST_REDIS_URL")
+    if url:
+        return url
+    fakeredis = pytest.importorskip("fakeredis")
+    pytest.importorskip("lupa")  # fakeredis runs EVAL/EVALSHA through lupa
+    import redis
+    server = fakeredis.FakeServer()
+    monkeypatch.setattr(redis.Redis, "from_url",
+                        lambda url, **kwargs: fakeredis.FakeRedis.from_url(url, server=server, **kwargs))
+    return "redis://fakeredis:6379/0"
@@ -0,0 +1,148 @@
+"""
+CV Compaction for LLM Scoring
+Shrinks extracted CV text to a token budget before it goes into the scoring
+prompt: whitespace and bullet glyphs are normalized, page headers / footers
+and repeated lines are dropped, and when the CV is still too long each
+section is cut to its share of the budget, experience and skills first.
+Section order and the first lines of every section are kept.
+"""
+
+import math
+import os
+import re
+from collections import defaultdict
+from typing import Dict, List, Tuple
+
+# Configuration
+CV_TOKEN_BUDGET = int(os.getenv("CV_TOKEN_BUDGET", "1500"))  # 0 disables the budget (cleanup only)
+CHARS_PER_TOKEN = 4  # rough average for Llama-family tokenizers on English / Indonesian text
+MIN_SECTION_TOKENS = 40  # a truncated section still keeps its opening lines
+
+SECTION_HEADINGS = {
+    "summary": {"summary", "profile", "professional summary", "about me", "objective", "career objective",
+                "ringkasan", "profil", "tentang saya"},
+    "experience": {"experience", "work experience", "professional experience", "employment",
+                   "employment history", "work history", "pengalaman", "pengalaman kerja", "riwayat pekerjaan"},
+    "skills": {"skills", "technical skills", "core skills", "competencies", "keahlian", "kemampuan", "tools"},
+    "projects": {"projects", "personal projects", "portfolio", "proyek"},
+    "education": {"education", "academic background", "pendidikan", "riwayat pendidikan"},
+    "certifications": {"certifications", "certificates", "licenses", "sertifikasi", "training", "pelatihan"},
+    "other": {"organizational experience", "volunteer", "achievements", "awards", "languages", "bahasa",
+              "interests", "hobbies", "references", "referensi", "publications"},
+}
+_HEADING_KIND = {heading: kind for kind, headings in SECTION_HEADINGS.items() for heading in headings}
+
+# Share of the budget each kind of section may use before spare budget is handed
+# out; spare goes to truncated sections in priority order. "header" is the text
+# before the first heading (name, title, contact details).
+SECTION_SHARES = {
+    "experience": 0.40, "skills": 0.15, "summary": 0.10, "projects": 0.10,
+    "education": 0.08, "certifications": 0.05, "header": 0.05, "other": 0.07,
+}
+SECTION_PRIORITY = ["experience", "skills", "summary", "projects", "education", "certifications", "header", "other"]
+
+_BULLET_RE = re.compile(r"^[•▪●◦‣⁃∙·*\-–—>➢✓✔]+\s*")
+_PAGE_LINE_RE = re.compile(
+    r"^(?:-\s*)?(?:(?:page|halaman|hal\.?)\s*)?\d{1,3}(?:\s*(?:/|of|dari)\s*\d{1,3})?(?:\s*-)?$"
+    r"|\b(?:page|halaman)\s+\d{1,3}(?:\s*(?:/|of|dari)\s*\d{1,3})?\b",
+    re.IGNORECASE
+)
+_BOILERPLATE_RE = re.compile(
+    r"^(?:references?\s+(?:are\s+)?available\s+(?:up)?on\s+request|curriculum\s+vitae|resume|daftar\s+riwayat\s+hidup"
+    r"|i\s+hereby\s+declare\b|saya\s+yang\s+bertanda\s+tangan\b|demikian\s+(?:cv|daftar\s+riwayat\s+hidup)\b)",
+    re.IGNORECASE
+)
+_SPACE_RE = re.compile(r"[ \t\u00a0\u2000-\u200b\u3000]+")
+_CONTROL_RE = re.compile(r"[\x00-\x08\x0b\x0c\x0e-\x1f\x7f\ufffd]")
+
+
+def estimate_tokens(text: str) -> int:
+    """Approximate prompt tokens of a text (no tokenizer dependency)."""
+    return math.ceil(len(text) / CHARS_PER_TOKEN)
+
+
+def heading_kind(line: str) -> str:
+    """The section kind a line opens, or "" if it is not a section heading."""
+    if len(line) > 40:
+        return ""
+    return _HEADING_KIND.get(line.strip(" :-").lower(), "")
+
+
+def clean_lines(text: str) -> List[str]:
+    """Normalized, non-empty lines without page furniture, boilerplate or repeats."""
+    lines, seen = [], set()
+    for raw in _CONTROL_RE.sub("", text).splitlines():
+        line = _SPACE_RE.sub(" ", raw).strip()
+        if _BULLET_RE.match(line):
+            line = "- " + _BULLET_RE.sub("", line)
+        if not line.strip("- "):
+            continue
+        if len(line) <= 80 and (_PAGE_LINE_RE.search(line) or _BOILERPLATE_RE.match(line)):
+            continue
+        # Running headers (name, contact line) repeat on every page; bullets rarely repeat verbatim
+        key = line.lower()
+        if key in seen and not heading_kind(line):
+            continue
+        seen.add(key)
+        lines.append(line)
+    return lines
+
+
+def split_sections(lines: List[str]) -> List[Tuple[str, List[str]]]:
+    """[(kind, lines)] in document order; each section's first line is its heading (except the header)."""
+    sections: List[Tuple[str, List[str]]] = [("header", [])]
+    for line in lines:
+        kind = heading_kind(line)
+        if kind:
+            sections.append((kind, [line]))
+        else:
+            sections[-1][1].append(line)
+    return [section for section in sections if section[1]]
+
+
+def _allocate(needs: Dict[str, int], budget: int) -> Dict[str, int]:
+    """Token allowance per section kind: its share first, then spare budget by priority."""
+    allowance = {kind: min(need, max(MIN_SECTION_TOKENS, int(SECTION_SHARES[kind] * budget)))
+                 for kind, need in needs.items()}
+    spare = budget - sum(allowance.values())
+    for kind in SECTION_PRIORITY:
+        if spare <= 0:
+            break
+        if kind in needs:
+            extra = min(spare, needs[kind] - allowance[kind])
+            allowance[kind] += extra
+            spare -= extra
+    return allowance
+
+
+def compact_cv(text: str, budget: int = CV_TOKEN_BUDGET) -> str:
+    """CV text cleaned up and, if still over `budget` tokens, cut section by section."""
+    lines = clean_lines(text)
+    compacted = "\n".join(lines)
+    if budget <= 0 or estimate_tokens(compacted) <= budget:
+        return compacted
+
+    sections = split_sections(lines)
+    needs: Dict[str, int] = defaultdict(int)
+    for kind, section_lines in sections:
+        needs[kind] += sum(estimate_tokens(line + "\n") for line in section_lines)
+    allowance = _allocate(dict(needs), budget)
+
+    out: List[str] = []
+    for kind, section_lines in sections:
+        body = section_lines if kind == "header" else section_lines[1:]
+        if kind != "header":
+            out.append(section_lines[0])
+            allowance[kind] -= estimate_tokens(section_lines[0] + "\n")
+        for line in body:
+            cost = estimate_tokens(line + "\n")
+            if cost > allowance[kind]:
+                room = allowance[kind] * CHARS_PER_TOKEN
+                if room >= 40:  # a useful part of the line fits
+                    out.append(line[:room - 4].rsplit(" ", 1)[0] + " ...")
+                    allowance[kind] = 0
+                out.append("[...]")
+                break
+            out.append(line)
+            allowance[kind] -= cost
+    return "\n".join(out)
@@ -0,0 +1,69 @@
+"""
+CV Full-Text Search Helpers
+Matching and ranking run in Postgres (cv_search table + search_applicants RPC,
+see migrations/add_cv_search.sql). CV bodies are stored compressed, so snippets
+are cut here from the decompressed text of the returned page only.
+"""
+
+import html
+import re
+from typing import List, Optional, Set
+
+# Configuration
+SEARCH_MAX_CHARS = 200_000  # text sent to to_tsvector (tsvector values are capped at 1 MB)
+SEARCH_DEFAULT_LIMIT = 20
+SEARCH_MAX_LIMIT = 100
+SNIPPET_WORDS = 30
+
+_QUERY_RE = re.compile(r'(-?)"([^"]*)"|(-?)(\S+)')
+_WORD_RE = re.compile(r"[a-z0-9]+")
+_TEXT_WORD_RE = re.compile(r"\S+")
+
+
+def query_terms(q: str) -> Set[str]:
+    """
+    The words a web-search query looks for, for highlighting: quoted phrases
+    are split into words, OR is an operator, and -excluded words are dropped.
+    """
+    terms: Set[str] = set()
+    for match in _QUERY_RE.finditer(q.lower()):
+        negated = match.group(1) or match.group(3)
+        chunk = match.group(2) if match.group(2) is not None else match.group(4)
+        if negated or chunk == "or":
+            continue
+        terms.update(_WORD_RE.findall(chunk))
+    return terms
+
+
+def make_snippet(text: Optional[str], terms: Set[str], width: int = SNIPPET_WORDS) -> Optional[str]:
+    """
+    The `width`-word window of the CV with the most distinct query terms,
+    HTML-escaped with the matching words wrapped in <mark>.
+    """
+    if not text or not terms:
+        return None
+    words = _TEXT_WORD_RE.findall(text)
+    hits = [set(_WORD_RE.findall(word.lower())) & terms for word in words]
+    positions = [i for i, found in enumerate(hits) if found]
+    if not positions:
+        return None
+
+    best_start, best_count = 0, -1
+    for pos in positions:
+        start = max(0, pos - width // 4)
+        found: Set[str] = set()
+        for i in range(start, min(len(words), start + width)):
+            found |= hits[i]
+        if len(found) > best_count:
+            best_start, best_count = start, len(found)
+            if best_count == len(terms):
+                break
+
+    end = min(len(words), best_start + width)
+    parts: List[str] = []
+    for i in range(best_start, end):
+        word = html.escape(words[i])
+        parts.append(f"<mark>{word}</mark>" if hits[i] else word)
+    prefix = "… " if best_start > 0 else ""
+    suffix = " …" if end < len(words) else ""
+    return prefix + " ".join(parts) + suffix
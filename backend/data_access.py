@@ -0,0 +1,176 @@
+"""
+Request-Scoped Data Access
+DataLoader-style batching and memoization over the async Supabase client.
+
+Within one request, loads by key issued in the same event-loop tick are
+coalesced into one `in.(...)` query, and every key is fetched at most once.
+Loaders for applicants embed their project, so the usual
+"load applicant, then check its project" path costs one round trip.
+
+The project and employee loaders return active rows only: the soft-delete
+filter runs in the query (`deleted_at = EPOCH_SENTINEL`), never as a string
+comparison here, since PostgREST returns timestamps in ISO 8601 form.
+
+Queries run on the sync client in the threadpool, or on the async client
+with SUPABASE_ASYNC_CLIENT (see database.py). Every query made through
+RequestData is counted; the count is returned in the X-DB-Queries response
+header.
+"""
+
+import asyncio
+import inspect
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Dict, Hashable, Iterable, List, Optional, Tuple, Union
+
+from fastapi import Depends, Request
+from starlette.concurrency import run_in_threadpool
+from database import get_request_client, query_slot, EPOCH_SENTINEL
+from metrics import DB_QUERY_DURATION, timed
+
+if TYPE_CHECKING:
+    from supabase import AsyncClient, Client
+
+# Configuration
+LOADER_MAX_BATCH = 200  # keys per query (ids travel in the URL)
+QUERY_COUNT_HEADER = "X-DB-Queries"
+
+# Applicant columns for listings. cv_text is deliberately excluded; see get_applicant_cv.
+APPLICANT_COLUMNS = (
+    "id, project_id, name, email, ai_score, ai_reasoning, scoring_status, relevance_score, duplicate_of, status, "
+    "experience_years, key_skills, cv_valid, created_at, updated_at"
+)
+
+# Filter for an embedded projects(*) resource: archived projects embed as null
+ACTIVE_PROJECT_FILTER = ("projects.deleted_at", EPOCH_SENTINEL)
+
+BatchFn = Callable[[List[Hashable]], Awaitable[Dict[Hashable, Any]]]
+
+
+class DataLoader:
+    """
+    Coalesce and memoize lookups by key.
+
+    `batch_fn(keys)` returns {key: value}; keys it leaves out resolve to None.
+    A failed batch is not cached, so a later load retries.
+    """
+
+    def __init__(self, batch_fn: BatchFn, max_batch_size: int = LOADER_MAX_BATCH):
+        self._batch_fn = batch_fn
+        self._max_batch_size = max_batch_size
+        self._cache: Dict[Hashable, asyncio.Future] = {}
+        self._queue: List[Tuple[Hashable, asyncio.Future]] = []
+
+    def load(self, key: Hashable) -> "asyncio.Future":
+        future = self._cache.get(key)
+        if future is not None:
+            return future
+        loop = asyncio.get_running_loop()
+        future = loop.create_future()
+        self._cache[key] = future
+        if not self._queue:
+            # Runs after the tasks already scheduled this tick, so their loads join the batch
+            loop.create_task(self._dispatch())
+        self._queue.append((key, future))
+        return future
+
+    async def load_many(self, keys: Iterable[Hashable]) -> List[Any]:
+        return list(await asyncio.gather(*(self.load(key) for key in keys)))
+
+    def prime(self, key: Hashable, value: Any) -> None:
+        """Seed the cache with a row fetched by some other query."""
+        if key not in self._cache:
+            future = asyncio.get_running_loop().create_future()
+            future.set_result(value)
+            self._cache[key] = future
+
+    def clear(self, key: Hashable) -> None:
+        """Forget a key, e.g. after the row was written."""
+        self._cache.pop(key, None)
+
+    async def _dispatch(self) -> None:
+        queued, self._queue = self._queue, []
+        for start in range(0, len(queued), self._max_batch_size):
+            chunk = queued[start:start + self._max_batch_size]
+            try:
+                found = await self._batch_fn([key for key, _ in chunk])
+            except Exception as e:
+                for key, future in chunk:
+                    if self._cache.get(key) is future:
+                        del self._cache[key]
+                    future.set_exception(e)
+                continue
+            for key, future in chunk:
+                future.set_result(found.get(key))
+
+
+class RequestData:
+    """Loaders and a query counter for one request."""
+
+    def __init__(self, db: Union["Client", "AsyncClient"]):
+        self.db = db
+        self.query_count = 0
+        self.projects = DataLoader(self._by_key("projects", "*", "id", active_only=True))
+        self.orgs_by_owner = DataLoader(self._by_key("organizations", "*", "owner_id", active_only=True))
+        self.applicants = DataLoader(self._by_key(
+            "applicants", f"{APPLICANT_COLUMNS}, cv_hash, deleted_at, projects(*)", "id",
+            embedded=True
+        ))
+        self.employees = DataLoader(self._by_key("employees", "*", "id", active_only=True))
+        self.versions = DataLoader(self._by_key("data_versions", "scope, version", "scope"))
+
+    async def execute(self, query):
+        """Run a PostgREST query builder, counting the round trip."""
+        self.query_count += 1
+        with timed(DB_QUERY_DURATION, "db"):
+            if not inspect.iscoroutinefunction(query.execute):
+                return await run_in_threadpool(query.execute)
+            async with query_slot():
+                return await query.execute()
+
+    def prime_projects(self, rows: List[dict]) -> None:
+        """
+        Move embedded `projects` objects (selected with ACTIVE_PROJECT_FILTER)
+        from rows with a project_id into the project loader. An empty embed
+        means the project is archived, and primes None.
+        """
+        for row in rows:
+            project = row.pop("projects", None)
+            if isinstance(project, list):
+                project = project[0] if project else None
+            project_id = row.get("project_id") or (project or {}).get("id")
+            if project_id:
+                self.projects.prime(project_id, project or None)
+
+    def _by_key(self, table: str, columns: str, key_column: str, active_only: bool = False, embedded: bool = False) -> BatchFn:
+        async def batch(keys: List[Hashable]) -> Dict[Hashable, Any]:
+            query = self.db.table(table).select(columns).in_(key_column, keys)
+            if active_only:
+                query = query.eq("deleted_at", EPOCH_SENTINEL)
+            if embedded:
+                query = query.eq(*ACTIVE_PROJECT_FILTER)
+            res = await self.execute(query)
+            rows = res.data or []
+            if embedded:
+                self.prime_projects(rows)
+            found: Dict[Hashable, Any] = {}
+            for row in rows:
+                found.setdefault(row[key_column], row)
+            return found
+        return batch
+
+
+async def get_request_data(request: Request, db: Union["Client", "AsyncClient"] = Depends(get_request_client)) -> RequestData:
+    """FastAPI dependency: the request's data-access context."""
+    data = getattr(request.state, "data", None)
+    if data is None:
+        data = RequestData(db)
+        request.state.data = data
+    return data
+
+
+async def query_count_middleware(request: Request, call_next):
+    """Report the number of database round trips a request made."""
+    response = await call_next(request)
+    data: Optional[RequestData] = getattr(request.state, "data", None)
+    if data is not None:
+        response.headers[QUERY_COUNT_HEADER] = str(data.query_count)
+    return response
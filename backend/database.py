@@ -1,12 +1,121 @@
+import asyncio
 import os
-from supabase import create_client, Client
+import threading
+from typing import TYPE_CHECKING, Optional
 from dotenv import load_dotenv
 
+if TYPE_CHECKING:
+    import httpx
+    from supabase import AsyncClient, Client
+
 load_dotenv()
 
 url: str = os.environ.get("SUPABASE_URL")
 key: str = os.environ.get("SUPABASE_KEY")
 
-supabase: Client = create_client(url, key)
+# Clients are created on first use (or in the app lifespan), not at import:
+# importing supabase and building a client is a large part of cold start.
+_supabase: Optional["Client"] = None
+_supabase_lock = threading.Lock()
+
+
+def get_supabase() -> "Client":
+    """The shared sync client (background tasks, scripts), created on first use."""
+    global _supabase
+    if _supabase is None:
+        with _supabase_lock:
+            if _supabase is None:
+                from supabase import create_client
+                _supabase = create_client(url, key)
+    return _supabase
+
+
+def __getattr__(name: str):
+    # `from database import supabase` keeps working for scripts
+    if name == "supabase":
+        return get_supabase()
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
 
 EPOCH_SENTINEL = "1970-01-01 00:00:00+00"
+
+# Request handlers query through the sync client in the threadpool by default:
+# in bench_async_db.py the async client was slower on every endpoint, since
+# both models are CPU-bound long before the threadpool runs out of threads.
+SUPABASE_ASYNC_CLIENT = os.getenv("SUPABASE_ASYNC_CLIENT", "false").lower() == "true"
+
+# Async client: one pooled keep-alive connection set shared by all requests.
+# httpcore scans every pooled connection for every waiting request, so a big
+# pool or a long wait queue costs CPU on each query: keep the pool small and
+# queue queries on a semaphore of the same size instead (see query_slot).
+SUPABASE_POOL_SIZE = int(os.getenv("SUPABASE_POOL_SIZE", "16"))
+SUPABASE_KEEPALIVE = int(os.getenv("SUPABASE_KEEPALIVE", str(SUPABASE_POOL_SIZE)))
+# HTTP/2 multiplexes over fewer connections but costs more CPU per request in httpcore
+SUPABASE_HTTP2 = os.getenv("SUPABASE_HTTP2", "false").lower() == "true"
+SUPABASE_CONNECT_TIMEOUT = float(os.getenv("SUPABASE_CONNECT_TIMEOUT", "5"))
+SUPABASE_TIMEOUT = float(os.getenv("SUPABASE_TIMEOUT", "15"))
+
+_async_supabase: Optional["AsyncClient"] = None
+_async_http: Optional["httpx.AsyncClient"] = None
+_async_lock: Optional[asyncio.Lock] = None  # created lazily: asyncio locks bind to a loop on Python 3.9
+_query_slots: Optional[asyncio.Semaphore] = None
+
+
+def _lock() -> asyncio.Lock:
+    global _async_lock
+    if _async_lock is None:
+        _async_lock = asyncio.Lock()
+    return _async_lock
+
+
+def query_slot() -> asyncio.Semaphore:
+    """One slot per pooled connection: hold it around each async query."""
+    global _query_slots
+    if _query_slots is None:
+        _query_slots = asyncio.Semaphore(SUPABASE_POOL_SIZE)
+    return _query_slots
+
+
+async def init_async_supabase() -> "AsyncClient":
+    """Create the async client and its connection pool (idempotent)."""
+    global _async_supabase, _async_http
+    async with _lock():
+        if _async_supabase is None:
+            import httpx
+            from supabase import acreate_client, AsyncClientOptions
+            _async_http = httpx.AsyncClient(
+                http2=SUPABASE_HTTP2,
+                limits=httpx.Limits(
+                    max_connections=SUPABASE_POOL_SIZE,
+                    max_keepalive_connections=SUPABASE_KEEPALIVE
+                ),
+                timeout=httpx.Timeout(SUPABASE_TIMEOUT, connect=SUPABASE_CONNECT_TIMEOUT)
+            )
+            _async_supabase = await acreate_client(url, key, options=AsyncClientOptions(httpx_client=_async_http))
+    return _async_supabase
+
+
+async def close_async_supabase() -> None:
+    """Close pooled connections. Called from the app lifespan on shutdown."""
+    global _async_supabase, _async_http, _async_lock, _query_slots
+    async with _lock():
+        if _async_http is not None:
+            await _async_http.aclose()
+        _async_supabase = None
+        _async_http = None
+    _async_lock = None
+    _query_slots = None
+
+
+async def get_async_supabase() -> "AsyncClient":
+    """FastAPI dependency returning the shared async client."""
+    if _async_supabase is not None:
+        return _async_supabase
+    return await init_async_supabase()
+
+
+async def get_request_client():
+    """FastAPI dependency: the client request handlers query through (SUPABASE_ASYNC_CLIENT)."""
+    if SUPABASE_ASYNC_CLIENT:
+        return await get_async_supabase()
+    return get_supabase()
@@ -1,28 +1,37 @@
+import logging
 import os
+import re
 import jwt
-from fastapi import Depends, HTTPException
+from typing import Optional
+from fastapi import Depends, HTTPException, Query
 from fastapi.security import HTTPBearer, HTTPAuthorizationCredentials
 from cryptography.hazmat.primitives import serialization
 
 security = HTTPBearer()
 
+def decode_access_token(token: str) -> dict:
+    """
+    Decode a Supabase access token.
+    Raises jwt.InvalidTokenError (or a subclass) if the token is not acceptable.
+    """
+    # Get Supabase JWT secret from environment
+    jwt_secret = os.getenv("SUPABASE_JWT_SECRET")
+    if not jwt_secret:
+        # Fallback to unverified for local dev ONLY
+        return jwt.decode(token, options={"verify_signature": False})
+    # Proper verification with secret
+    return jwt.decode(
+        token,
+        jwt_secret,
+        algorithms=["HS256", "HS384", "HS512", "ES256", "ES384", "ES512", "RS256", "RS384", "RS512"],
+        options={"verify_aud": False, "verify_signature": True},
+        leeway=120
+    )
+
 def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(security)):
     token = credentials.credentials
     try:
-        # Get Supabase JWT secret from environment
-        jwt_secret = os.getenv("SUPABASE_JWT_SECRET")
-        if not jwt_secret:
-            # Fallback to unverified for local dev ONLY
-            payload = jwt.decode(token, options={"verify_signature": False})
-        else:
-            # Proper verification with secret
-            payload = jwt.decode(
-                token,
-                jwt_secret,
-                algorithms=["HS256", "HS384", "HS512", "ES256", "ES384", "ES512", "RS256", "RS384", "RS512"],
-                options={"verify_aud": False, "verify_signature": True},
-                leeway=120
-            )
+        payload = decode_access_token(token)
         
         user_id = payload.get("sub")
         if not user_id:
@@ -34,3 +43,30 @@ def get_current_user(credentials: HTTPAuthorizationCredentials = Depends(securit
         raise HTTPException(status_code=401, detail=f"Invalid token: {str(e)}")
     except Exception as e:
         raise HTTPException(status_code=401, detail="Authentication failed")
+
+stream_security = HTTPBearer(auto_error=False)
+
+def get_stream_user(
+    access_token: Optional[str] = Query(None),
+    credentials: Optional[HTTPAuthorizationCredentials] = Depends(stream_security)
+):
+    """
+    Auth for server-sent event streams. Browsers' EventSource cannot set
+    headers, so the token may also be passed as ?access_token=.
+    """
+    if credentials is None and not access_token:
+        raise HTTPException(status_code=401, detail="Not authenticated")
+    token = credentials.credentials if credentials else access_token
+    return get_current_user(HTTPAuthorizationCredentials(scheme="Bearer", credentials=token))
+
+
+ACCESS_TOKEN_PARAM = re.compile(r"([?&]access_token=)[^&\s]*")
+
+class AccessTokenLogFilter(logging.Filter):
+    """Redact ?access_token= (event stream auth) from access log lines."""
+
+    def filter(self, record: logging.LogRecord) -> bool:
+        if isinstance(record.args, tuple):
+            record.args = tuple(ACCESS_TOKEN_PARAM.sub(r"\1[redacted]", arg) if isinstance(arg, str) else arg
+                                for arg in record.args)
+        return True
@@ -1,18 +1,26 @@
 import os
-import resend
 from dotenv import load_dotenv
 
 load_dotenv()
 
 RESEND_API_KEY = os.getenv("RESEND_API_KEY")
-if RESEND_API_KEY:
-    resend.api_key = RESEND_API_KEY
+_resend = None
 
-def send_decision_email(to_email: str, candidate_name: str, status: str, project_name: str):
-    if not RESEND_API_KEY:
-        print(f"[MOCK EMAIL] To: {to_email}, Status: {status} (No API Key)")
-        return
 
+def get_resend():
+    """The resend module, configured with RESEND_API_KEY (imported on first send: it is slow to import)."""
+    global _resend
+    if _resend is None:
+        import resend
+        if RESEND_API_KEY:
+            resend.api_key = RESEND_API_KEY
+        _resend = resend
+    return _resend
+
+EMAIL_FROM = "Acme HR <onboarding@resend.dev>"
+
+def build_decision_email(to_email: str, candidate_name: str, status: str, project_name: str):
+    """Return Resend send params for a decision email, or None if the status has no email."""
     subject = ""
     html_content = ""
 
@@ -36,15 +44,11 @@ def send_decision_email(to_email: str, candidate_name: str, status: str, project
         <p>Best regards,<br>Recruitment Team</p>
         """
     else:
-        return
-
-    try:
-        r = resend.Emails.send({
-            "from": "Acme HR <onboarding@resend.dev>",
-            "to": to_email,
-            "subject": subject,
-            "html": html_content
-        })
-        print(f"Email sent to {to_email}: {r}")
-    except Exception as e:
-        print(f"Failed to send email: {e}")
+        return None
+
+    return {
+        "from": EMAIL_FROM,
+        "to": to_email,
+        "subject": subject,
+        "html": html_content
+    }
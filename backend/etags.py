@@ -0,0 +1,66 @@
+"""
+Conditional GET (ETag / If-None-Match)
+Strong ETags derived from per-scope version markers (data_versions table,
+bumped by triggers on every write; see migrations/add_data_versions.sql).
+
+The version is read before the data, so a tag can only ever be older than
+the body it is sent with, never newer. A matching If-None-Match is answered
+with 304 before the listing query runs, so unchanged views cost one primary
+key lookup and no serialization.
+"""
+
+import hashlib
+from typing import Optional
+
+from fastapi import Request, Response
+from postgrest.exceptions import APIError
+from data_access import RequestData
+from metrics import record_cache
+
+EMPLOYEES_SCOPE = "employees"
+CACHE_CONTROL = "private, no-cache"  # browsers revalidate with If-None-Match on every poll
+
+
+def recruitment_scope(user_id: str) -> str:
+    """Projects and applicants owned by one HR user."""
+    return f"recruitment:{user_id}"
+
+
+def make_etag(scope: str, version: int, request: Request) -> str:
+    """Tag for one view (path + query) of a scope at a version."""
+    key = f"{scope}:{version}:{request.url.path}?{request.url.query}"
+    return '"' + hashlib.sha256(key.encode()).hexdigest()[:32] + '"'
+
+
+def etag_matches(if_none_match: Optional[str], etag: str) -> bool:
+    """If-None-Match uses weak comparison: W/ prefixes are ignored."""
+    if not if_none_match:
+        return False
+    if if_none_match.strip() == "*":
+        return True
+    candidates = (tag.strip() for tag in if_none_match.split(","))
+    return any((tag[2:] if tag.startswith("W/") else tag) == etag for tag in candidates)
+
+
+def cache_headers(etag: str) -> dict:
+    return {"ETag": etag, "Cache-Control": CACHE_CONTROL, "Vary": "Authorization"}
+
+
+async def check_not_modified(request: Request, response: Response, data: RequestData, scope: str) -> Optional[Response]:
+    """
+    Resolve the ETag for this request. Returns a 304 response if the client's
+    copy is current; otherwise sets the validator headers on `response`.
+    """
+    try:
+        marker = await data.versions.load(scope)
+    except APIError as e:
+        # Missing migration or transient error: serve the full response without validators
+        print(f"ETag version lookup failed: {e}")
+        return None
+    etag = make_etag(scope, marker["version"] if marker else 0, request)
+    if etag_matches(request.headers.get("if-none-match"), etag):
+        record_cache("etag", True)
+        return Response(status_code=304, headers=cache_headers(etag))
+    record_cache("etag", False)
+    response.headers.update(cache_headers(etag))
+    return None
@@ -7,8 +7,8 @@ Validates text quality before sending to AI.
 import io
 import re
 from typing import Tuple
-from pypdf import PdfReader
 from fastapi import HTTPException
+from metrics import EXTRACTION_DURATION, timed
 
 
 # Quality thresholds
@@ -35,6 +35,8 @@ def extract_text_from_pdf(content: bytes) -> str:
     Raises:
         ExtractionError: If extraction fails
     """
+    from pypdf import PdfReader  # deferred: a large import that only /apply needs
+
     try:
         reader = PdfReader(io.BytesIO(content))
         
@@ -112,7 +114,8 @@ def extract_and_validate_cv_text(content: bytes, mime_type: str) -> str:
     try:
         # Extract text from PDF
         if mime_type == "application/pdf":
-            text = extract_text_from_pdf(content)
+            with timed(EXTRACTION_DURATION, "pdf", step="pdf"):
+                text = extract_text_from_pdf(content)
         else:
             raise ExtractionError(f"Unsupported MIME type: {mime_type}. PDF only allowed.")
         
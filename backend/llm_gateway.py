@@ -0,0 +1,286 @@
+"""
+LLM Gateway
+One client for every LLM call in the backend (CV scoring, policy chat), over
+Groq's OpenAI-compatible chat completions API.
+
+- one pooled keep-alive HTTP client, shared by all callers and threads
+- a deadline per call, covering queueing, retries and backoff
+- retries with full-jitter exponential backoff on 429, 5xx and network errors
+  (Retry-After is honored when it fits the deadline)
+- a circuit breaker: after LLM_BREAKER_THRESHOLD calls in a row fail with 429,
+  5xx or network errors, calls fail fast for LLM_BREAKER_RESET seconds, then
+  one trial call is let through (a rejected request, e.g. a 400 for an
+  oversized prompt, says nothing about the provider and is not counted)
+- a cap on concurrent calls
+- per-feature counters: calls, failures, retries, tokens and latency (also
+  exported at /metrics, see metrics.py)
+
+Callers are synchronous (background tasks and sync routes run in threads),
+so the gateway is thread-safe and blocking.
+"""
+
+import json
+import os
+import random
+import threading
+import time
+from typing import Dict, List, Optional
+
+import httpx
+
+from metrics import LLM_DURATION, LLM_RETRIES, LLM_TOKENS, add_timing
+
+# Configuration
+LLM_BASE_URL = os.getenv("LLM_BASE_URL", "https://api.groq.com/openai/v1")
+LLM_MODEL = os.getenv("LLM_MODEL", "llama-3.1-8b-instant")
+LLM_DEADLINE = float(os.getenv("LLM_DEADLINE", "30"))  # seconds per call, all attempts included
+LLM_MAX_RETRIES = int(os.getenv("LLM_MAX_RETRIES", "3"))
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "4"))
+LLM_BREAKER_THRESHOLD = int(os.getenv("LLM_BREAKER_THRESHOLD", "5"))
+LLM_BREAKER_RESET = float(os.getenv("LLM_BREAKER_RESET", "30"))
+LLM_BACKOFF_BASE = 0.5  # seconds; attempt n sleeps up to base * 2**n
+LLM_BACKOFF_MAX = 8.0
+LLM_POOL_SIZE = 20
+
+RETRY_STATUSES = {429, 500, 502, 503, 504}
+
+
+class LLMError(Exception):
+    """The call failed (after retries, or without retrying for 4xx errors)."""
+
+
+class LLMProviderError(LLMError):
+    """429, 5xx, network error or timeout: the failures the circuit breaker counts."""
+
+
+class LLMUnavailable(LLMError):
+    """Failed fast: the circuit is open or no call slot freed up before the deadline."""
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with a single half-open trial call."""
+
+    def __init__(self, threshold: int = LLM_BREAKER_THRESHOLD, reset_after: float = LLM_BREAKER_RESET):
+        self.threshold = threshold
+        self.reset_after = reset_after
+        self.failures = 0
+        self.opened_at: Optional[float] = None
+        self._trial_running = False
+        self._lock = threading.Lock()
+
+    @property
+    def state(self) -> str:
+        if self.opened_at is None:
+            return "closed"
+        return "half_open" if time.monotonic() - self.opened_at >= self.reset_after else "open"
+
+    def allow(self) -> bool:
+        with self._lock:
+            state = self.state
+            if state == "closed":
+                return True
+            if state == "half_open" and not self._trial_running:
+                self._trial_running = True
+                return True
+            return False
+
+    def cancel_trial(self) -> None:
+        """The allowed call was never sent: let another caller make the trial."""
+        with self._lock:
+            self._trial_running = False
+
+    def record(self, ok: bool) -> None:
+        with self._lock:
+            self._trial_running = False
+            if ok:
+                self.failures = 0
+                self.opened_at = None
+                return
+            self.failures += 1
+            if self.opened_at is not None or self.failures >= self.threshold:
+                self.opened_at = time.monotonic()
+
+
+class LLMGateway:
+    def __init__(
+        self,
+        base_url: str = LLM_BASE_URL,
+        api_key: Optional[str] = None,
+        model: str = LLM_MODEL,
+        deadline: float = LLM_DEADLINE,
+        max_retries: int = LLM_MAX_RETRIES,
+        max_concurrency: int = LLM_MAX_CONCURRENCY,
+        breaker: Optional[CircuitBreaker] = None,
+        backoff_base: float = LLM_BACKOFF_BASE
+    ):
+        self.model = model
+        self.deadline = deadline
+        self.max_retries = max_retries
+        self.backoff_base = backoff_base
+        self.breaker = breaker or CircuitBreaker()
+        self._slots = threading.BoundedSemaphore(max_concurrency)
+        self._client = httpx.Client(
+            base_url=base_url.rstrip("/"),
+            headers={"Authorization": f"Bearer {api_key if api_key is not None else os.environ.get('GROQ_API_KEY', '')}"},
+            limits=httpx.Limits(max_connections=LLM_POOL_SIZE, max_keepalive_connections=LLM_POOL_SIZE)
+        )
+        self._stats: Dict[str, Dict[str, float]] = {}
+        self._stats_lock = threading.Lock()
+
+    def chat(self, feature: str, messages: List[dict], temperature: float = 0,
+             json_mode: bool = False, deadline: Optional[float] = None) -> str:
+        """
+        Run one chat completion and return the message content.
+        `feature` names the caller in the counters (e.g. "cv_scoring").
+
+        Raises:
+            LLMUnavailable: Circuit open, or no free call slot before the deadline
+            LLMError: The call failed
+        """
+        started = time.monotonic()
+        until = started + (deadline or self.deadline)
+        if not self.breaker.allow():
+            self._count(feature, rejected=1)
+            self._observe(feature, "rejected", started)
+            raise LLMUnavailable("LLM circuit open: failing fast")
+        if not self._slots.acquire(timeout=max(0.0, until - time.monotonic())):
+            self.breaker.cancel_trial()
+            self._count(feature, rejected=1)
+            self._observe(feature, "rejected", started)
+            raise LLMUnavailable("No LLM call slot free before the deadline")
+
+        body = {"model": self.model, "messages": messages, "temperature": temperature}
+        if json_mode:
+            body["response_format"] = {"type": "json_object"}
+        try:
+            data, retries = self._post(body, until)
+            content = _content(data)
+        except LLMError as e:
+            self.breaker.record(not isinstance(e, LLMProviderError))
+            self._count(feature, calls=1, failures=1, seconds=time.monotonic() - started)
+            self._observe(feature, "error", started)
+            raise
+        finally:
+            self._slots.release()
+
+        self.breaker.record(True)
+        usage = data.get("usage") or {}
+        self._count(
+            feature, calls=1, retries=retries,
+            prompt_tokens=usage.get("prompt_tokens", 0),
+            completion_tokens=usage.get("completion_tokens", 0),
+            seconds=time.monotonic() - started
+        )
+        self._observe(feature, "ok", started)
+        LLM_TOKENS.inc(usage.get("prompt_tokens", 0), feature=feature, kind="prompt")
+        LLM_TOKENS.inc(usage.get("completion_tokens", 0), feature=feature, kind="completion")
+        if retries:
+            LLM_RETRIES.inc(retries, feature=feature)
+        return content
+
+    def chat_json(self, feature: str, messages: List[dict], **kwargs) -> dict:
+        """chat() in JSON mode, parsed. Tolerates a JSON object wrapped in prose or a code fence."""
+        content = self.chat(feature, messages, json_mode=True, **kwargs)
+        try:
+            return json.loads(content)
+        except ValueError:
+            start, end = content.find("{"), content.rfind("}") + 1
+            if start < 0 or end <= start:
+                raise LLMError("LLM response is not JSON")
+            try:
+                return json.loads(content[start:end])
+            except ValueError:
+                raise LLMError("LLM response is not JSON")
+
+    def _post(self, body: dict, until: float):
+        """POST with retries until the deadline. Returns (response JSON, retries used)."""
+        attempt = 0
+        while True:
+            remaining = until - time.monotonic()
+            if remaining <= 0:
+                raise LLMProviderError("LLM deadline exceeded")
+            retry_after = None
+            try:
+                res = self._client.post("/chat/completions", json=body, timeout=remaining)
+                if res.status_code < 400:
+                    try:
+                        return res.json(), attempt
+                    except ValueError:
+                        raise LLMError("Malformed LLM response")
+                if res.status_code not in RETRY_STATUSES:
+                    raise LLMError(f"LLM HTTP {res.status_code}: {res.text[:200]}")
+                error = LLMProviderError(f"LLM HTTP {res.status_code}: {res.text[:200]}")
+                retry_after = _retry_after(res)
+            except httpx.TimeoutException:
+                error = LLMProviderError("LLM deadline exceeded")
+            except httpx.TransportError as e:
+                error = LLMProviderError(f"LLM connection error: {e}")
+
+            if attempt >= self.max_retries:
+                raise error
+            delay = random.uniform(0, min(LLM_BACKOFF_MAX, self.backoff_base * 2 ** attempt))
+            if retry_after is not None:
+                delay = max(delay, retry_after)
+            if time.monotonic() + delay >= until:
+                raise error
+            time.sleep(delay)
+            attempt += 1
+
+    def _observe(self, feature: str, outcome: str, started: float) -> None:
+        elapsed = time.monotonic() - started
+        LLM_DURATION.observe(elapsed, feature=feature, outcome=outcome)
+        add_timing("llm", elapsed)
+
+    def _count(self, feature: str, **values: float) -> None:
+        with self._stats_lock:
+            stats = self._stats.setdefault(feature, {
+                "calls": 0, "failures": 0, "rejected": 0, "retries": 0,
+                "prompt_tokens": 0, "completion_tokens": 0, "seconds": 0.0
+            })
+            for name, value in values.items():
+                stats[name] += value
+
+    def stats(self) -> Dict[str, Dict[str, float]]:
+        """Per-feature counters (cumulative since start), plus the breaker state."""
+        with self._stats_lock:
+            snapshot = {feature: dict(values) for feature, values in self._stats.items()}
+        return {"breaker": self.breaker.state, "features": snapshot}
+
+    def close(self) -> None:
+        self._client.close()
+
+
+def _content(data: dict) -> str:
+    try:
+        return data["choices"][0]["message"]["content"]
+    except (KeyError, IndexError, TypeError):
+        raise LLMError("Malformed LLM response")
+
+
+def _retry_after(res: httpx.Response) -> Optional[float]:
+    try:
+        return float(res.headers["Retry-After"])
+    except (KeyError, ValueError):
+        return None
+
+
+_gateway: Optional[LLMGateway] = None
+_gateway_lock = threading.Lock()
+
+
+def get_llm_gateway() -> LLMGateway:
+    """The shared gateway (created on first use)."""
+    global _gateway
+    if _gateway is None:
+        with _gateway_lock:
+            if _gateway is None:
+                _gateway = LLMGateway()
+    return _gateway
+
+
+def close_llm_gateway() -> None:
+    """Close the shared gateway's connections (app shutdown)."""
+    global _gateway
+    if _gateway is not None:
+        _gateway.close()
+        _gateway = None
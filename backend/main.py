@@ -1,19 +1,85 @@
-from fastapi import FastAPI
+import asyncio
+import contextlib
+import logging
+import secrets
+from fastapi import FastAPI, HTTPException, Request
+from fastapi.responses import Response
 from fastapi.middleware.cors import CORSMiddleware
 import os
 from dotenv import load_dotenv
 
 from rate_limiter import rate_limit_middleware
+from data_access import query_count_middleware
+from metrics import metrics_middleware, render as render_metrics, CONTENT_TYPE as METRICS_CONTENT_TYPE
+from responses import CompressionMiddleware
 from routers import recruitment, policy, employees, admin_policy
+from database import init_async_supabase, close_async_supabase, get_supabase, SUPABASE_ASYNC_CLIENT
+from services.email_outbox import run_dispatcher
+from services.ai_service import run_scoring_retries
+from llm_gateway import close_llm_gateway, get_llm_gateway
+from dependencies import AccessTokenLogFilter
 
 load_dotenv()
 
+# Heavy clients and libraries are not created at import (cold start); the
+# lifespan creates what requests need and warms the rest in the background.
+WARM_UP_ON_START = os.getenv("WARM_UP_ON_START", "true").lower() != "false"
+
+
+def warm_up() -> None:
+    """Create the sync and LLM clients and load the CV parsing libraries ahead of the first /apply."""
+    try:
+        get_supabase()
+        get_llm_gateway()
+        import pypdf  # noqa: F401
+        import magic  # noqa: F401
+    except Exception as e:
+        print(f"Warm-up failed: {e}")
+
+
+@contextlib.asynccontextmanager
+async def lifespan(app: FastAPI):
+    # Supabase client for request handlers
+    if SUPABASE_ASYNC_CLIENT:
+        await init_async_supabase()
+    else:
+        await asyncio.to_thread(get_supabase)
+    # Background workers
+    workers = [asyncio.create_task(run_dispatcher()), asyncio.create_task(run_scoring_retries())]
+    if WARM_UP_ON_START:
+        workers.append(asyncio.create_task(asyncio.to_thread(warm_up)))
+    yield
+    for task in workers:
+        task.cancel()
+    for task in workers:
+        with contextlib.suppress(asyncio.CancelledError):
+            await task
+    await close_async_supabase()
+    close_llm_gateway()
+
 app = FastAPI(
     title="HRIS Cloud API",
     description="AI-Powered HRIS Hackathon MVP",
-    version="2.0.0"
+    version="2.0.0",
+    lifespan=lifespan
 )
 
+# Event streams may authenticate with ?access_token=: keep it out of uvicorn's access log
+logging.getLogger("uvicorn.access").addFilter(AccessTokenLogFilter())
+
+# gzip / brotli for large responses (COMPRESS_MIN_SIZE)
+app.add_middleware(CompressionMiddleware)
+
+# Per-request database round trips (X-DB-Queries)
+app.middleware("http")(query_count_middleware)
+
+# Rate Limiting & Load Shedding Middleware
+# Registered before CORS so that CORS stays outermost and 429/503 responses keep their CORS headers.
+app.middleware("http")(rate_limit_middleware)
+
+# Latency histograms, round trips per request and Server-Timing (outside the rate limiter, so 429s are timed too)
+app.middleware("http")(metrics_middleware)
+
 # CORS Configuration
 ALLOWED_ORIGINS = [
     "http://localhost:3000",
@@ -27,11 +93,9 @@ app.add_middleware(
     allow_credentials=True,
     allow_methods=["*"],
     allow_headers=["*"],
+    expose_headers=["X-Next-Cursor", "Retry-After", "X-DB-Queries", "ETag", "Server-Timing"],
 )
 
-# Rate Limiting Middleware
-app.middleware("http")(rate_limit_middleware)
-
 # Root Endpoint
 @app.get("/")
 def read_root():
@@ -42,6 +106,17 @@ def read_root():
         "docs": "/docs"
     }
 
+# Prometheus scrape endpoint, "Authorization: Bearer <METRICS_TOKEN>"; off (404) without a token
+METRICS_TOKEN = os.getenv("METRICS_TOKEN")
+
+@app.get("/metrics", include_in_schema=False)
+def metrics(request: Request):
+    if not METRICS_TOKEN:
+        raise HTTPException(status_code=404, detail="Not Found")
+    if not secrets.compare_digest(request.headers.get("Authorization", ""), f"Bearer {METRICS_TOKEN}"):
+        raise HTTPException(status_code=401, detail="Invalid metrics token")
+    return Response(render_metrics(), media_type=METRICS_CONTENT_TYPE)
+
 # Include Routers
 app.include_router(recruitment.router, tags=["Recruitment"])
 app.include_router(employees.router, prefix="/employees", tags=["Employee Data"])
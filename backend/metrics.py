@@ -0,0 +1,220 @@
+"""
+Performance Instrumentation
+Counters and histograms for request latency, database round trips, CV
+extraction, LLM calls and caches, exposed at /metrics in the Prometheus text
+format. Metrics are per process: with several workers, scrape each one (or
+run one worker per container).
+
+Each request also gets a Server-Timing header with its own breakdown, e.g.
+`db;dur=41.2;desc="3 queries", pdf;dur=85.0, app;dur=160.3`, which shows
+up in the browser's network panel.
+
+No client library: the exposition format is a few lines of text, and the
+metrics here are fixed at import.
+"""
+
+import bisect
+import contextlib
+import contextvars
+import threading
+import time
+from typing import Dict, Iterator, List, Optional, Sequence, Tuple
+
+from fastapi import Request
+
+# Configuration
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0)  # seconds
+LLM_BUCKETS = (0.25, 0.5, 1.0, 2.0, 4.0, 8.0, 15.0, 30.0, 60.0)  # seconds
+QUERY_COUNT_BUCKETS = (0, 1, 2, 3, 5, 8, 13, 21)  # round trips per request
+SERVER_TIMING_HEADER = "Server-Timing"
+UNMATCHED_ROUTE = "unmatched"  # 404s, and requests refused before routing (rate limits)
+
+CONTENT_TYPE = "text/plain; version=0.0.4; charset=utf-8"
+
+REGISTRY: List[object] = []  # metrics rendered at /metrics
+
+
+def _escape(value: str) -> str:
+    return value.replace("\\", "\\\\").replace("\"", "\\\"").replace("\n", "\\n")
+
+
+def _format_labels(names: Sequence[str], values: Sequence[str], extra: str = "") -> str:
+    parts = [f'{name}="{_escape(str(value))}"' for name, value in zip(names, values)]
+    if extra:
+        parts.append(extra)
+    return "{" + ",".join(parts) + "}" if parts else ""
+
+
+def _format_value(value: float) -> str:
+    if value == float("inf"):
+        return "+Inf"
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+class Counter:
+    """Monotonic counter with labels; rendered with a `_total` suffix."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), registry: list = REGISTRY):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self._values: Dict[Tuple[str, ...], float] = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def inc(self, amount: float = 1, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        with self._lock:
+            self._values[key] = self._values.get(key, 0) + amount
+
+    def value(self, **labels: str) -> float:
+        return self._values.get(tuple(str(labels[name]) for name in self.labels), 0)
+
+    def render(self) -> List[str]:
+        with self._lock:
+            values = sorted(self._values.items())
+        lines = [f"# HELP {self.name}_total {self.help}", f"# TYPE {self.name}_total counter"]
+        lines += [f"{self.name}_total{_format_labels(self.labels, key)} {_format_value(value)}" for key, value in values]
+        return lines
+
+
+class Histogram:
+    """Cumulative-bucket histogram with labels (`_bucket`, `_sum` and `_count` series)."""
+
+    def __init__(self, name: str, help_text: str, labels: Sequence[str] = (), buckets: Sequence[float] = LATENCY_BUCKETS,
+                 registry: list = REGISTRY):
+        self.name = name
+        self.help = help_text
+        self.labels = tuple(labels)
+        self.buckets = tuple(sorted(buckets))
+        # per label set: [count per bucket (last one is +Inf), sum]
+        self._series: Dict[Tuple[str, ...], Tuple[List[int], List[float]]] = {}
+        self._lock = threading.Lock()
+        registry.append(self)
+
+    def observe(self, value: float, **labels: str) -> None:
+        key = tuple(str(labels[name]) for name in self.labels)
+        index = bisect.bisect_left(self.buckets, value)
+        with self._lock:
+            counts, total = self._series.setdefault(key, ([0] * (len(self.buckets) + 1), [0.0]))
+            counts[index] += 1
+            total[0] += value
+
+    def count(self, **labels: str) -> int:
+        series = self._series.get(tuple(str(labels[name]) for name in self.labels))
+        return sum(series[0]) if series else 0
+
+    def render(self) -> List[str]:
+        with self._lock:
+            series = sorted((key, list(counts), total[0]) for key, (counts, total) in self._series.items())
+        lines = [f"# HELP {self.name} {self.help}", f"# TYPE {self.name} histogram"]
+        for key, counts, total in series:
+            cumulative = 0
+            for bound, count in zip(self.buckets + (float("inf"),), counts):
+                cumulative += count
+                le = f'le="{_format_value(float(bound))}"'
+                lines.append(f"{self.name}_bucket{_format_labels(self.labels, key, le)} {cumulative}")
+            lines.append(f"{self.name}_sum{_format_labels(self.labels, key)} {_format_value(total)}")
+            lines.append(f"{self.name}_count{_format_labels(self.labels, key)} {cumulative}")
+        return lines
+
+
+REQUEST_DURATION = Histogram(
+    "http_request_duration_seconds", "Time to the response start, by route template.",
+    ("method", "route", "status")
+)
+DB_QUERIES_PER_REQUEST = Histogram(
+    "db_queries_per_request", "Supabase round trips made by one request.",
+    ("route",), QUERY_COUNT_BUCKETS
+)
+DB_QUERIES = Counter("db_queries", "Supabase round trips made by requests.", ("route",))
+DB_QUERY_DURATION = Histogram("db_query_duration_seconds", "Duration of one Supabase round trip from a request.")
+EXTRACTION_DURATION = Histogram(
+    "cv_extraction_duration_seconds", "CV processing step duration (mime: libmagic, pdf: pypdf text extraction).",
+    ("step",)
+)
+LLM_DURATION = Histogram(
+    "llm_request_duration_seconds", "LLM gateway call duration, retries and queueing included.",
+    ("feature", "outcome"), LLM_BUCKETS
+)
+LLM_TOKENS = Counter("llm_tokens", "LLM tokens used.", ("feature", "kind"))
+LLM_RETRIES = Counter("llm_retries", "LLM calls retried after 429, 5xx or network errors.", ("feature",))
+CACHE_LOOKUPS = Counter(
+    "cache_lookups", "Cache lookups by result (hit / miss); hit rate = hit / all.",
+    ("cache", "result")
+)
+
+
+def render() -> str:
+    """All metrics in the Prometheus text exposition format."""
+    lines: List[str] = []
+    for metric in REGISTRY:
+        lines += metric.render()
+    return "\n".join(lines) + "\n"
+
+
+def record_cache(cache: str, hit: bool) -> None:
+    CACHE_LOOKUPS.inc(cache=cache, result="hit" if hit else "miss")
+
+
+# --- Per-request Server-Timing ---
+# The middleware puts a fresh dict in the context; threadpool calls
+# (run_in_threadpool, sync routes) copy the context, so they add to the same dict.
+_timings: contextvars.ContextVar[Optional[Dict[str, List[float]]]] = contextvars.ContextVar("server_timings", default=None)
+
+
+def add_timing(name: str, seconds: float) -> None:
+    """Add to the current request's Server-Timing entry `name` (no-op outside requests)."""
+    timings = _timings.get()
+    if timings is not None:
+        entry = timings.setdefault(name, [0.0, 0])
+        entry[0] += seconds
+        entry[1] += 1
+
+
+@contextlib.contextmanager
+def timed(histogram: Histogram, timing: str, **labels: str) -> Iterator[None]:
+    """Observe the block's duration in `histogram` and the request's Server-Timing."""
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        elapsed = time.perf_counter() - started
+        histogram.observe(elapsed, **labels)
+        add_timing(timing, elapsed)
+
+
+def server_timing(timings: Dict[str, List[float]], total: float, queries: Optional[int]) -> str:
+    entries = []
+    for name, (seconds, count) in timings.items():
+        entry = f"{name};dur={seconds * 1000:.1f}"
+        if name == "db" and queries is not None:
+            entry += f';desc="{queries} queries"'
+        elif count > 1:
+            entry += f';desc="{count} calls"'
+        entries.append(entry)
+    entries.append(f"app;dur={total * 1000:.1f}")
+    return ", ".join(entries)
+
+
+async def metrics_middleware(request: Request, call_next):
+    """Route latency, round trips per request and the Server-Timing header."""
+    timings: Dict[str, List[float]] = {}
+    token = _timings.set(timings)
+    started = time.perf_counter()
+    status = 500
+    try:
+        response = await call_next(request)
+        status = response.status_code
+    finally:
+        elapsed = time.perf_counter() - started
+        _timings.reset(token)
+        route = getattr(request.scope.get("route"), "path", UNMATCHED_ROUTE)
+        REQUEST_DURATION.observe(elapsed, method=request.method, route=route, status=status)
+        data = getattr(request.state, "data", None)
+        queries = data.query_count if data is not None else None
+        if queries is not None:
+            DB_QUERIES_PER_REQUEST.observe(queries, route=route)
+            DB_QUERIES.inc(queries, route=route)
+    response.headers[SERVER_TIMING_HEADER] = server_timing(timings, elapsed, queries)
+    return response
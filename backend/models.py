@@ -1,5 +1,5 @@
-from pydantic import BaseModel, EmailStr
-from typing import Optional, List, Dict, Any
+from pydantic import BaseModel, EmailStr, Field
+from typing import Optional, List, Dict, Any, Literal
 from uuid import UUID
 from datetime import datetime
 
@@ -22,6 +22,8 @@ class ProjectUpdate(BaseModel):
     requirements: Optional[str] = None
     benefits: Optional[str] = None
     is_active: Optional[bool] = None
+    llm_min_relevance: Optional[int] = Field(None, ge=0, le=100)  # 0 turns the gate off
+    llm_top_n: Optional[int] = Field(None, ge=0)  # 0 turns the gate off
 
 class Project(BaseModel):
     id: UUID
@@ -32,6 +34,8 @@ class Project(BaseModel):
     description: Optional[str]
     requirements: Optional[str]
     benefits: Optional[str]
+    llm_min_relevance: Optional[int] = None
+    llm_top_n: Optional[int] = None
     org_name: Optional[str] = None
     created_at: datetime
 
@@ -51,9 +55,12 @@ class Applicant(BaseModel):
     project_id: UUID
     name: str
     email: str
-    cv_text: str
+    cv_text: Optional[str] = None  # Lazy: fetch via GET /applicants/{id}/cv
     ai_score: Optional[int]
     ai_reasoning: Optional[str]
+    scoring_status: Optional[str] = None  # "retry" / "failed" while AI scoring is unavailable, else None
+    relevance_score: Optional[int] = None  # local pre-ranking against the project text (relevance.py)
+    duplicate_of: Optional[UUID] = None  # near-duplicate of this applicant, whose score was reused
     status: str
     experience_years: Optional[int] = None
     key_skills: Optional[str] = None
@@ -62,6 +69,20 @@ class Applicant(BaseModel):
     created_at: datetime
     updated_at: Optional[datetime] = None
 
+class ApplicantSearchResult(BaseModel):
+    """A full-text CV search hit (search_applicants RPC), best match first."""
+    id: UUID
+    project_id: UUID
+    project_name: Optional[str] = None
+    name: str
+    email: str
+    ai_score: Optional[int] = None
+    relevance_score: Optional[int] = None
+    status: str
+    created_at: datetime
+    rank: float
+    snippet: Optional[str] = None  # HTML-escaped CV excerpt, matches wrapped in <mark>
+
 class EmployeeBase(BaseModel):
     name: str
     email: EmailStr
@@ -87,11 +108,53 @@ class Employee(EmployeeBase):
     created_at: datetime
     updated_at: datetime
 
+class EmployeeDirectoryEntry(BaseModel):
+    """Columns shown in the employee directory (see DIRECTORY_COLUMNS)."""
+    id: UUID
+    name: str
+    email: EmailStr
+    role: str
+    department: Optional[str] = None
+    leave_remaining: int = 12
+    status: str = "active"
+
+# Statuses a recruiter decision can set; "hired" is only set by the hire RPC (/convert, /verify)
+DecisionStatus = Literal["processing", "interview_pending", "interview_approved", "approved", "rejected"]
+
 class ApplicantUpdate(BaseModel):
-    status: str
+    status: DecisionStatus
+
+class BulkApplicantUpdate(BaseModel):
+    applicant_ids: List[UUID]
+    status: DecisionStatus
 
 class VerifyApplicantRequest(BaseModel):
     department: str
     role: str
     join_date: str
     leave_remaining: int = 12
+
+class ScoreBucket(BaseModel):
+    min: int
+    max: int
+    count: int
+
+class DailyCount(BaseModel):
+    date: str
+    count: int
+
+class RecruitmentStats(BaseModel):
+    """Dashboard aggregates, read from trigger-maintained counters (see analytics.py)."""
+    total: int
+    by_status: Dict[str, int]
+    score_histogram: List[ScoreBucket]
+    unscored: int
+    applications_per_day: List[DailyCount]
+    median_time_to_score_seconds: Optional[float] = None
+
+class ProjectStatsSummary(BaseModel):
+    total: int
+    by_status: Dict[str, int]
+
+class OrganizationStats(RecruitmentStats):
+    projects: Dict[str, ProjectStatsSummary] = {}
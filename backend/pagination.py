@@ -0,0 +1,118 @@
+"""
+Keyset Pagination Helpers
+Opaque cursors and PostgREST filter builders for stable, index-backed paging.
+Offsets get slower the deeper you page; keysets stay flat.
+"""
+
+import base64
+import json
+from typing import Any, List, Optional, Tuple
+
+from fastapi import HTTPException
+
+# Configuration
+DEFAULT_PAGE_SIZE = 50
+MAX_PAGE_SIZE = 200
+
+# Characters that would break a PostgREST logical filter expression, and
+# LIKE wildcards (a search for "_" or "%" would otherwise match every row)
+_SEARCH_STRIP_CHARS = set(',()*"\\%_')
+
+
+def encode_cursor(values: List[Any]) -> str:
+    """Encode the sort key of the last row on a page into an opaque cursor."""
+    raw = json.dumps(values, separators=(",", ":")).encode()
+    return base64.urlsafe_b64encode(raw).decode().rstrip("=")
+
+
+def decode_cursor(cursor: str, size: int) -> List[Any]:
+    """
+    Decode a cursor produced by encode_cursor.
+
+    Raises:
+        HTTPException: If the cursor is malformed (400 Bad Request)
+    """
+    try:
+        padded = cursor + "=" * (-len(cursor) % 4)
+        values = json.loads(base64.urlsafe_b64decode(padded.encode()))
+    except Exception:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+
+    if not isinstance(values, list) or len(values) != size:
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return values
+
+
+def _quote(value: Any) -> str:
+    """Quote a value for use inside a PostgREST or=(...) expression."""
+    text = str(value).replace("\\", "\\\\").replace('"', '\\"')
+    return f'"{text}"'
+
+
+def score_keyset_filter(cursor: str, column: str = "ai_score") -> str:
+    """
+    Build the `or` filter selecting rows after the cursor for
+    ORDER BY <column> DESC NULLS LAST, id DESC (ai_score or relevance_score).
+    Unscored applicants (NULL) sort after every scored one.
+    """
+    score, row_id = decode_cursor(cursor, 2)
+    if score is None:
+        return f"and({column}.is.null,id.lt.{_quote(row_id)})"
+    if not isinstance(score, int):
+        raise HTTPException(status_code=400, detail="Invalid cursor")
+    return (
+        f"{column}.lt.{score},"
+        f"and({column}.eq.{score},id.lt.{_quote(row_id)}),"
+        f"{column}.is.null"
+    )
+
+
+def created_keyset_filter(cursor: str) -> str:
+    """
+    Build the `or` filter selecting rows after the cursor for
+    ORDER BY created_at DESC, id DESC.
+    """
+    created_at, row_id = decode_cursor(cursor, 2)
+    return (
+        f"created_at.lt.{_quote(created_at)},"
+        f"and(created_at.eq.{_quote(created_at)},id.lt.{_quote(row_id)})"
+    )
+
+
+def name_keyset_filter(cursor: str) -> str:
+    """
+    Build the `or` filter selecting rows after the cursor for
+    ORDER BY name ASC, id ASC.
+    """
+    name, row_id = decode_cursor(cursor, 2)
+    return (
+        f"name.gt.{_quote(name)},"
+        f"and(name.eq.{_quote(name)},id.gt.{_quote(row_id)})"
+    )
+
+
+def search_term(term: str) -> str:
+    """A user search term with filter syntax and LIKE wildcards stripped."""
+    return "".join(c for c in term if c not in _SEARCH_STRIP_CHARS).strip()
+
+
+def search_filter(term: str, columns: Tuple[str, ...]) -> Optional[str]:
+    """
+    Build a case-insensitive substring `or` filter over the given columns.
+    Returns None if nothing searchable is left after sanitizing.
+    """
+    cleaned = search_term(term)
+    if not cleaned:
+        return None
+    return ",".join(f"{col}.ilike.*{cleaned}*" for col in columns)
+
+
+def next_cursor(rows: List[dict], limit: int, keys: Tuple[str, ...]) -> Optional[str]:
+    """
+    Return the cursor for the page after `rows`, or None on the last page.
+    Callers fetch limit + 1 rows; the extra row only signals that more exist.
+    """
+    if len(rows) <= limit:
+        return None
+    last = rows[limit - 1]
+    return encode_cursor([last.get(k) for k in keys])
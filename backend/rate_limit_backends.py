@@ -0,0 +1,278 @@
+"""
+Rate Limit Backends
+Storage for the sliding-window-counter rate limiter.
+
+- SlidingWindowCounter: in-process memory (default, single worker)
+- SQLiteRateLimitBackend: WAL-mode SQLite file shared by workers on one host
+- RedisRateLimitBackend: any Redis-protocol server shared by replicas
+
+Every backend implements hit_all(checks, now=None), which admits a request
+against several (key, limit, window) limits at once: either every counter is
+incremented or none is. All apply the same estimate:
+previous * (unelapsed fraction) + current.
+"""
+
+from collections import OrderedDict
+import os
+import sqlite3
+import threading
+import time
+from typing import List, Optional, Sequence, Tuple
+
+# Configuration
+RATE_LIMIT_MAX_KEYS = 100_000  # hard cap on tracked clients (memory / sqlite)
+SQLITE_SWEEP_EVERY = 1000  # hits between idle-key sweeps
+
+
+def sliding_window_estimate(previous: int, current: int, now: float, index: int, window: int) -> float:
+    """Approximate request count over the trailing window."""
+    return previous * (1 - (now - index * window) / window) + current
+
+
+# (key, limit, window) for each limit a request counts against
+Check = Tuple[str, int, int]
+
+
+class RateLimitBackend:
+    """Interface for rate limit storage. hit_all() must be atomic across its keys."""
+
+    # True if hit_all does I/O (files, network): callers run it off the event loop
+    blocking = True
+
+    def hit_all(self, checks: Sequence[Check], now: Optional[float] = None) -> Optional[int]:
+        """
+        Record a request against every check if all of them allow it.
+        Returns None when recorded, else the index of the first check over its
+        limit (and nothing is recorded).
+        """
+        raise NotImplementedError
+
+    def hit(self, key: str, limit: int, window: int, now: Optional[float] = None) -> bool:
+        """Record a request for `key` if allowed. Returns False when over limit."""
+        return self.hit_all([(key, limit, window)], now) is None
+
+    def clear(self) -> None:
+        raise NotImplementedError
+
+
+class SlidingWindowCounter(RateLimitBackend):
+    """
+    In-memory sliding-window counter with bounded memory.
+
+    Each key keeps only two counters (current and previous fixed window),
+    so every check is O(1) regardless of traffic.
+
+    Keys live in an LRU-ordered dict capped at `capacity`. Keys idle for two
+    full windows carry no state worth keeping and are evicted first.
+    """
+
+    blocking = False  # a short critical section, fine on the event loop
+
+    def __init__(self, capacity: int = RATE_LIMIT_MAX_KEYS):
+        self.capacity = capacity
+        # key -> [window_index, previous_count, current_count, window, idle_at]
+        self._entries: "OrderedDict[str, list]" = OrderedDict()
+        self._lock = threading.Lock()
+
+    def __len__(self) -> int:
+        return len(self._entries)
+
+    def _evict_idle(self, now: float) -> None:
+        """Drop least-recently-used keys whose counters have fully expired."""
+        entries = self._entries
+        while entries:
+            entry = entries[next(iter(entries))]
+            if now < entry[4]:
+                break
+            entries.popitem(last=False)
+
+    def _entry(self, key: str, window: int, now: float) -> list:
+        """The key's counters rolled forward to `now` (called with the lock held)."""
+        index = int(now // window)
+        entries = self._entries
+        entry = entries.get(key)
+        if entry is None or entry[3] != window:
+            # New key: reclaim idle keys first, then enforce the hard cap
+            self._evict_idle(now)
+            entry = [index, 0, 0, window, 0.0]
+            entries[key] = entry
+            while len(entries) > self.capacity:
+                entries.popitem(last=False)
+        else:
+            entries.move_to_end(key)
+            if index != entry[0]:
+                # Roll windows: the old current becomes previous if adjacent
+                entry[1] = entry[2] if index - entry[0] == 1 else 0
+                entry[2] = 0
+                entry[0] = index
+        # Both counters are worthless two windows from now
+        entry[4] = (index + 2) * window
+        return entry
+
+    def hit_all(self, checks: Sequence[Check], now: Optional[float] = None) -> Optional[int]:
+        now = time.time() if now is None else now
+
+        with self._lock:
+            entries = [self._entry(key, window, now) for key, _, window in checks]
+            for i, ((_, limit, window), entry) in enumerate(zip(checks, entries)):
+                if sliding_window_estimate(entry[1], entry[2], now, entry[0], window) >= limit:
+                    return i
+            for entry in entries:
+                entry[2] += 1
+            return None
+
+    def clear(self) -> None:
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteRateLimitBackend(RateLimitBackend):
+    """
+    Shared state for several uvicorn workers on one host.
+
+    Each hit_all runs in a BEGIN IMMEDIATE transaction, which takes SQLite's
+    write lock up front, so concurrent workers serialize per check.
+    WAL mode keeps those transactions short and readers unblocked.
+    Idle keys are swept periodically; the table is capped at `capacity`.
+    """
+
+    def __init__(self, path: str, capacity: int = RATE_LIMIT_MAX_KEYS):
+        self.path = path
+        self.capacity = capacity
+        self._local = threading.local()
+        self._hits = 0
+        conn = self._connect()
+        conn.execute("PRAGMA journal_mode=WAL")
+        conn.execute(
+            "CREATE TABLE IF NOT EXISTS rate_limits ("
+            " key TEXT PRIMARY KEY,"
+            " window_index INTEGER NOT NULL,"
+            " previous INTEGER NOT NULL,"
+            " current INTEGER NOT NULL,"
+            " window INTEGER NOT NULL,"
+            " idle_at REAL NOT NULL)"
+        )
+        conn.execute("CREATE INDEX IF NOT EXISTS idx_rate_limits_idle_at ON rate_limits(idle_at)")
+
+    def _connect(self) -> sqlite3.Connection:
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            # isolation_level=None: transactions are managed explicitly below
+            conn = sqlite3.connect(self.path, timeout=5.0, isolation_level=None)
+            conn.execute("PRAGMA synchronous=NORMAL")
+            self._local.conn = conn
+        return conn
+
+    def _sweep(self, conn: sqlite3.Connection, now: float) -> None:
+        conn.execute("DELETE FROM rate_limits WHERE idle_at <= ?", (now,))
+        conn.execute(
+            "DELETE FROM rate_limits WHERE key IN ("
+            " SELECT key FROM rate_limits ORDER BY idle_at"
+            " LIMIT max((SELECT count(*) FROM rate_limits) - ?, 0))",
+            (self.capacity,)
+        )
+
+    def hit_all(self, checks: Sequence[Check], now: Optional[float] = None) -> Optional[int]:
+        now = time.time() if now is None else now
+        conn = self._connect()
+
+        conn.execute("BEGIN IMMEDIATE")
+        try:
+            rows = []
+            for i, (key, limit, window) in enumerate(checks):
+                index = int(now // window)
+                row = conn.execute(
+                    "SELECT window_index, previous, current, window FROM rate_limits WHERE key = ?",
+                    (key,)
+                ).fetchone()
+                previous, current = 0, 0
+                if row and row[3] == window:
+                    if row[0] == index:
+                        previous, current = row[1], row[2]
+                    elif index - row[0] == 1:
+                        previous = row[2]
+                if sliding_window_estimate(previous, current, now, index, window) >= limit:
+                    conn.execute("ROLLBACK")
+                    return i
+                rows.append((key, index, previous, current + 1, window, (index + 2) * window))
+
+            conn.executemany("INSERT OR REPLACE INTO rate_limits VALUES (?, ?, ?, ?, ?, ?)", rows)
+            self._hits += 1
+            if self._hits % SQLITE_SWEEP_EVERY == 0:
+                self._sweep(conn, now)
+            conn.execute("COMMIT")
+        except Exception:
+            conn.execute("ROLLBACK")
+            raise
+        return None
+
+    def clear(self) -> None:
+        self._connect().execute("DELETE FROM rate_limits")
+
+
+# Check-and-increment for RedisRateLimitBackend, run atomically by the server.
+# KEYS: current and previous window counter, per check
+# ARGV: limit, window (seconds) and weight of the previous window, per check
+# Returns 0 when every check passed (all counted), else the 1-based check over its limit.
+REDIS_HIT_SCRIPT = """
+for i = 1, #KEYS / 2 do
+    local current = tonumber(redis.call('GET', KEYS[2 * i - 1]) or '0')
+    local previous = tonumber(redis.call('GET', KEYS[2 * i]) or '0')
+    if previous * tonumber(ARGV[3 * i]) + current >= tonumber(ARGV[3 * i - 2]) then
+        return i
+    end
+end
+for i = 1, #KEYS / 2 do
+    redis.call('INCR', KEYS[2 * i - 1])
+    redis.call('EXPIRE', KEYS[2 * i - 1], tonumber(ARGV[3 * i - 1]) * 2)
+end
+return 0
+"""
+
+
+class RedisRateLimitBackend(RateLimitBackend):
+    """
+    Shared state for multiple hosts/containers via any Redis-protocol server.
+
+    Counters live in per-window keys (`{prefix}{key}:{window}:{index}`) that
+    expire after two windows, so idle clients cost nothing. The checks and the
+    increments run as one Lua script (EVALSHA), so concurrent requests never
+    see each other's tentative counts and rejected requests write nothing.
+    Redis, Valkey and KeyDB all run it.
+    """
+
+    def __init__(self, url: str, prefix: str = "rl:"):
+        import redis  # optional dependency, only needed for this backend
+        # RESP2: spoken by every Redis-compatible server
+        self.client = redis.Redis.from_url(
+            url, protocol=2, socket_timeout=1.0, socket_connect_timeout=1.0
+        )
+        self.prefix = prefix
+        self._hit = self.client.register_script(REDIS_HIT_SCRIPT)
+
+    def hit_all(self, checks: Sequence[Check], now: Optional[float] = None) -> Optional[int]:
+        now = time.time() if now is None else now
+        keys: List[str] = []
+        args: List[object] = []
+        for key, limit, window in checks:
+            index = int(now // window)
+            keys += [f"{self.prefix}{key}:{window}:{index}", f"{self.prefix}{key}:{window}:{index - 1}"]
+            # Weight of the previous window, as in sliding_window_estimate
+            args += [limit, window, repr(1 - (now - index * window) / window)]
+        rejected = self._hit(keys=keys, args=args)
+        return rejected - 1 if rejected else None
+
+    def clear(self) -> None:
+        for key in self.client.scan_iter(f"{self.prefix}*"):
+            self.client.delete(key)
+
+
+def create_backend(kind: str) -> RateLimitBackend:
+    """Build a backend from its RATE_LIMIT_BACKEND name."""
+    if kind == "sqlite":
+        return SQLiteRateLimitBackend(os.getenv("RATE_LIMIT_SQLITE_PATH", "/tmp/hris_rate_limits.db"))
+    if kind == "redis":
+        return RedisRateLimitBackend(os.getenv("RATE_LIMIT_REDIS_URL", "redis://localhost:6379/0"))
+    if kind == "memory":
+        return SlidingWindowCounter()
+    raise ValueError(f"Unknown RATE_LIMIT_BACKEND: {kind}")
@@ -1,20 +1,100 @@
 """
-Rate Limiting Middleware
-Prevents cost attacks and abuse on CV upload endpoint.
+Rate Limiting & Load Shedding Middleware
+Prevents cost attacks and abuse on the CV upload and LLM-backed endpoints.
+Limits are declared per route in ROUTE_POLICIES.
 """
 
-from fastapi import Request, HTTPException
-from typing import Dict
+from dataclasses import dataclass
+from fastapi import Request
+from fastapi.responses import JSONResponse
+from starlette.concurrency import run_in_threadpool
+import os
 import time
-from collections import defaultdict
+from typing import Dict, FrozenSet, List, Optional, Tuple
 
-# In-memory rate limit store (use Redis in production)
-rate_limit_store: Dict[str, list] = defaultdict(list)
+from dependencies import decode_access_token
+from rate_limit_backends import Check, RateLimitBackend, create_backend
 
 # Configuration
 RATE_LIMIT_PER_IP = 10  # requests per hour
 RATE_LIMIT_PER_PROJECT = 100  # requests per hour
+RATE_LIMIT_CHAT_PER_USER = 60  # policy chat questions per hour
 RATE_LIMIT_WINDOW = 3600  # 1 hour in seconds
+RATE_LIMIT_BACKEND = os.getenv("RATE_LIMIT_BACKEND", "memory")  # memory, sqlite or redis
+LLM_MAX_IN_FLIGHT = int(os.getenv("LLM_MAX_IN_FLIGHT", "8"))  # concurrent LLM-backed requests
+LOAD_SHED_RETRY_AFTER = 5  # seconds
+
+# Rate limit store. "memory" is per process: with several workers or replicas
+# use "sqlite" (one host) or "redis" so limits are shared.
+rate_limit_store: RateLimitBackend = create_backend(RATE_LIMIT_BACKEND)
+
+
+@dataclass(frozen=True)
+class RateLimitRule:
+    """One limit on a route. scope: "ip", "user" (JWT sub, else IP) or "project"."""
+    scope: str
+    limit: int
+    message: str
+    window: int = RATE_LIMIT_WINDOW
+
+
+@dataclass(frozen=True)
+class RoutePolicy:
+    """Limits applied to one method + path. concurrency_group names a shared in-flight cap."""
+    methods: FrozenSet[str]
+    path: str
+    rules: Tuple[RateLimitRule, ...] = ()
+    concurrency_group: Optional[str] = None
+
+
+ROUTE_POLICIES = [
+    RoutePolicy(
+        methods=frozenset({"POST"}),
+        path="/apply",
+        rules=(
+            RateLimitRule("ip", RATE_LIMIT_PER_IP, f"Maximum {RATE_LIMIT_PER_IP} applications per hour from your IP"),
+            RateLimitRule("project", RATE_LIMIT_PER_PROJECT, f"Maximum {RATE_LIMIT_PER_PROJECT} applications per hour for this project"),
+        ),
+    ),
+    RoutePolicy(
+        methods=frozenset({"GET"}),
+        path="/policy/chat",
+        rules=(
+            RateLimitRule("user", RATE_LIMIT_CHAT_PER_USER, f"Maximum {RATE_LIMIT_CHAT_PER_USER} policy questions per hour"),
+        ),
+        concurrency_group="llm",
+    ),
+]
+
+_policy_index: Dict[Tuple[str, str], RoutePolicy] = {
+    (method, policy.path): policy for policy in ROUTE_POLICIES for method in policy.methods
+}
+
+
+class ConcurrencyLimiter:
+    """
+    Caps in-flight requests for a group of expensive routes.
+    Over the cap, requests are shed immediately instead of queueing until they time out.
+    Only touched from the event loop, so a plain counter is enough.
+    """
+
+    def __init__(self, max_in_flight: int):
+        self.max_in_flight = max_in_flight
+        self.in_flight = 0
+
+    def try_acquire(self) -> bool:
+        if self.in_flight >= self.max_in_flight:
+            return False
+        self.in_flight += 1
+        return True
+
+    def release(self) -> None:
+        self.in_flight -= 1
+
+
+concurrency_limiters: Dict[str, ConcurrencyLimiter] = {
+    "llm": ConcurrencyLimiter(LLM_MAX_IN_FLIGHT),
+}
 
 
 def get_client_ip(request: Request) -> str:
@@ -25,68 +105,93 @@ def get_client_ip(request: Request) -> str:
     return request.client.host if request.client else "unknown"
 
 
-def check_rate_limit(key: str, limit: int, window: int = RATE_LIMIT_WINDOW) -> bool:
+async def check_rate_limits(checks: List[Check]) -> Optional[int]:
     """
-    Check if request is within rate limit.
-    
-    Args:
-        key: Unique identifier (IP or project_id)
-        limit: Maximum requests allowed
-        window: Time window in seconds
-        
-    Returns:
-        True if within limit, False if exceeded
+    Count the request against all of its limits at once. Returns None if it is
+    within every limit, else the index of the first exceeded one (nothing is
+    counted then). Backends that do I/O run in the threadpool.
     """
-    now = time.time()
-    
-    # Clean old entries
-    rate_limit_store[key] = [
-        timestamp for timestamp in rate_limit_store[key]
-        if now - timestamp < window
-    ]
-    
-    # Check limit
-    if len(rate_limit_store[key]) >= limit:
-        return False
-    
-    # Record this request
-    rate_limit_store[key].append(now)
-    return True
+    if not rate_limit_store.blocking:
+        return rate_limit_store.hit_all(checks)
+    return await run_in_threadpool(rate_limit_store.hit_all, checks)
+
+
+def get_user_id(request: Request) -> Optional[str]:
+    """JWT `sub` of the caller, or None if the request is not (validly) authenticated."""
+    auth = request.headers.get("Authorization", "")
+    if not auth.lower().startswith("bearer "):
+        return None
+    try:
+        return decode_access_token(auth[7:].strip()).get("sub")
+    except Exception:
+        return None
+
+
+def rate_limit_key(rule: RateLimitRule, request: Request) -> Optional[str]:
+    """Build the store key for a rule, or None if the rule does not apply."""
+    if rule.scope == "project":
+        project_id = request.headers.get("x-project-id")
+        return f"project:{project_id}" if project_id else None
+    if rule.scope == "user":
+        user_id = get_user_id(request)
+        if user_id:
+            return f"user:{user_id}:{request.url.path}"
+    return f"ip:{get_client_ip(request)}:{request.url.path}"
+
+
+def too_many_requests(message: str, retry_after: int) -> JSONResponse:
+    return JSONResponse(
+        status_code=429,
+        content={"detail": {
+            "error": "Rate limit exceeded",
+            "message": message,
+            "retry_after": retry_after
+        }},
+        headers={"Retry-After": str(retry_after)}
+    )
+
+
+def service_overloaded(retry_after: int = LOAD_SHED_RETRY_AFTER) -> JSONResponse:
+    return JSONResponse(
+        status_code=503,
+        content={"detail": {
+            "error": "Service busy",
+            "message": "Too many requests are being processed. Please try again shortly.",
+            "retry_after": retry_after
+        }},
+        headers={"Retry-After": str(retry_after)}
+    )
 
 
 async def rate_limit_middleware(request: Request, call_next):
     """
-    Rate limiting middleware for FastAPI.
-    Only applies to /apply endpoint.
+    Route-aware rate limiting and load shedding for FastAPI.
+    Routes without a policy pass straight through.
     """
-    if request.url.path == "/apply":
-        # Check IP-based rate limit
-        client_ip = get_client_ip(request)
-        ip_key = f"ip:{client_ip}"
-        
-        if not check_rate_limit(ip_key, RATE_LIMIT_PER_IP):
-            raise HTTPException(
-                status_code=429,
-                detail={
-                    "error": "Rate limit exceeded",
-                    "message": f"Maximum {RATE_LIMIT_PER_IP} applications per hour from your IP",
-                    "retry_after": 3600
-                }
-            )
-        
-        # Check project-based rate limit (if project_id in headers)
-        project_id = request.headers.get("x-project-id")
-        if project_id:
-            project_key = f"project:{project_id}"
-            if not check_rate_limit(project_key, RATE_LIMIT_PER_PROJECT):
-                raise HTTPException(
-                    status_code=429,
-                    detail={
-                        "error": "Rate limit exceeded",
-                        "message": f"Maximum {RATE_LIMIT_PER_PROJECT} applications per hour for this project",
-                        "retry_after": 3600
-                    }
-                )
-    
-    response = await call_next(request)
-    return response
+    policy = _policy_index.get((request.method, request.url.path))
+    if policy is None:
+        return await call_next(request)
+
+    rules, checks = [], []
+    for rule in policy.rules:
+        key = rate_limit_key(rule, request)
+        if key:
+            rules.append(rule)
+            checks.append((key, rule.limit, rule.window))
+    # A request rejected by one rule does not use up the others
+    rejected = await check_rate_limits(checks) if checks else None
+    if rejected is not None:
+        rule = rules[rejected]
+        retry_after = int(rule.window - time.time() % rule.window) + 1
+        return too_many_requests(rule.message, retry_after)
+
+    limiter = concurrency_limiters.get(policy.concurrency_group) if policy.concurrency_group else None
+    if limiter is None:
+        return await call_next(request)
+
+    if not limiter.try_acquire():
+        return service_overloaded()
+    try:
+        return await call_next(request)
+    finally:
+        limiter.release()
@@ -0,0 +1,151 @@
+"""
+Local Relevance Pre-Ranking
+Scores a CV against its project's description and requirements (0-100),
+locally (about a millisecond per CV), before any LLM call.
+
+The project side is a term-weight vector, computed when the project text
+changes and stored on the project row (projects.relevance_vector). The CV
+side uses BM25 term saturation and length normalization: a requirement term
+mentioned once in an average-length CV gets full credit, and longer CVs need
+more mentions. The score is the weighted share of requirement terms covered.
+Skills from the taxonomy (skill_extractor) are matched as whole phrases and
+weigh double, so "React Native" is not credited by "react" alone.
+"""
+
+import hashlib
+import math
+import re
+from collections import Counter, OrderedDict
+from typing import Dict, Optional, Tuple
+
+from skill_extractor import skill_matcher
+
+# Configuration
+BM25_K1 = 1.2
+BM25_B = 0.75
+AVG_CV_TERMS = 350  # typical CV length in terms (after stopwords); stands in for the corpus average
+SKILL_WEIGHT = 2.0
+MAX_QUERY_TERMS = 200  # keep the heaviest terms of very long job descriptions
+VECTOR_VERSION = 1  # bump when tokenization or weighting changes; stale vectors are recomputed
+VECTOR_CACHE_SIZE = 256
+
+TOKEN_RE = re.compile(r"[a-z][a-z0-9+#]*")
+
+# English and Indonesian function words, plus words every CV and job ad share
+STOPWORDS = frozenset("""
+a about above after all also an and any are as at be been being both but by can could do does
+etc for from has have having he her his i in into is it its may more most must of on or our
+over per she should so such than that the their them then there these they this those through
+to under up us very was we were what when where which while who will with within would you your
+dan di ke dari yang untuk dengan atau pada dalam ini itu adalah sebagai akan oleh juga serta
+ability able candidate candidates experience experienced good great job knowledge looking
+minimum plus preferred required requirement requirements responsibilities responsible role
+skill skills strong team understanding work working year years
+""".split())
+
+
+def tokenize(text: str) -> Counter:
+    """Term counts: lowercase words minus stopwords, plural -s folded, plus skill:<name> features."""
+    text = text.lower()
+    counts: Counter = Counter()
+    for token in TOKEN_RE.findall(text):
+        if token in STOPWORDS or len(token) < 2:
+            continue
+        if len(token) > 4 and token.endswith("s") and not token.endswith("ss"):
+            token = token[:-1]
+        counts[token] += 1
+    for skill in skill_matcher.find(text):
+        counts[f"skill:{skill}"] += 1
+    return counts
+
+
+def text_fingerprint(description: Optional[str], requirements: Optional[str]) -> str:
+    return hashlib.sha256(f"{description or ''}\x00{requirements or ''}".encode()).hexdigest()[:16]
+
+
+def build_project_vector(description: Optional[str], requirements: Optional[str]) -> Optional[dict]:
+    """
+    Term weights for a project (stored in projects.relevance_vector).
+    Returns None if the project has no descriptive text to rank against.
+    Requirements weigh more than the description.
+    """
+    counts: Counter = Counter()
+    for text, factor in ((description, 1), (requirements, 2)):
+        if text:
+            for term, n in tokenize(text).items():
+                counts[term] += n * factor
+    if not counts:
+        return None
+
+    weights = {}
+    for term, n in counts.items():
+        weight = 1 + math.log(n)
+        if term.startswith("skill:"):
+            weight *= SKILL_WEIGHT
+        weights[term] = round(weight, 3)
+    top = sorted(weights.items(), key=lambda item: -item[1])[:MAX_QUERY_TERMS]
+    return {
+        "version": VECTOR_VERSION,
+        "fingerprint": text_fingerprint(description, requirements),
+        "terms": dict(top)
+    }
+
+
+def score_relevance(cv_text: str, vector: Optional[dict]) -> Optional[int]:
+    """BM25-saturated, weighted coverage of the project's terms by the CV (0-100)."""
+    if not vector or not cv_text:
+        return None
+    terms: Dict[str, float] = vector["terms"]
+    cv = tokenize(cv_text)
+    length = sum(cv.values())
+    norm = BM25_K1 * (1 - BM25_B + BM25_B * length / AVG_CV_TERMS)
+
+    total = covered = 0.0
+    for term, weight in terms.items():
+        total += weight
+        tf = cv.get(term, 0)
+        if tf:
+            covered += weight * min(1.0, tf * (BM25_K1 + 1) / (tf + norm))
+    return round(100 * covered / total) if total else None
+
+
+# In-process cache for projects whose stored vector is missing or stale
+_vector_cache: "OrderedDict[Tuple[str, str], Optional[dict]]" = OrderedDict()
+
+
+def project_vector(project: dict) -> Optional[dict]:
+    """The project's term vector: the stored one if current, else computed once and cached."""
+    description, requirements = project.get("description"), project.get("requirements")
+    fingerprint = text_fingerprint(description, requirements)
+    stored = project.get("relevance_vector")
+    if stored and stored.get("version") == VECTOR_VERSION and stored.get("fingerprint") == fingerprint:
+        return stored
+
+    key = (str(project.get("id")), fingerprint)
+    if key in _vector_cache:
+        _vector_cache.move_to_end(key)
+        return _vector_cache[key]
+    vector = build_project_vector(description, requirements)
+    _vector_cache[key] = vector
+    if len(_vector_cache) > VECTOR_CACHE_SIZE:
+        _vector_cache.popitem(last=False)
+    return vector
+
+
+def llm_gate(project: dict, relevance: Optional[int], higher_ranked: Optional[int] = None) -> Optional[str]:
+    """
+    Decide whether an application goes to LLM scoring under the project's
+    optional gates. Returns None to score it, or the reason it was held back.
+      llm_min_relevance  minimum relevance score (0 or unset: no minimum)
+      llm_top_n          only the N most relevant applicants (0 or unset: no cap);
+                         `higher_ranked` is the number of applicants ranked above this one
+    """
+    if relevance is None:
+        return None  # nothing to rank against: score as before
+    min_relevance = project.get("llm_min_relevance") or 0
+    if relevance < min_relevance:
+        return f"Not sent to AI scoring: relevance {relevance} is below this project's threshold of {min_relevance}."
+    top_n = project.get("llm_top_n") or 0
+    if top_n and higher_ranked is not None and higher_ranked >= top_n:
+        return f"Not sent to AI scoring: relevance {relevance} is outside this project's top {top_n}."
+    return None
@@ -0,0 +1,144 @@
+"""
+Fast Responses
+orjson serialization for trusted database rows, and gzip/brotli compression.
+
+Listing endpoints select explicit columns from our own database, so running
+every row back through its Pydantic response model only burns CPU (EmailStr
+alone re-runs IDNA checks per row). trusted_json() returns the rows as-is;
+the response_model stays on the route for the OpenAPI schema.
+"""
+
+import gzip
+import os
+from typing import Any, Optional
+
+from fastapi.responses import JSONResponse, Response
+from starlette.datastructures import Headers, MutableHeaders
+
+try:
+    import orjson
+except ImportError:  # stdlib json fallback keeps responses working without the wheel
+    orjson = None
+
+try:
+    import brotli
+except ImportError:  # gzip only
+    brotli = None
+
+# Configuration
+COMPRESS_MIN_SIZE = int(os.getenv("COMPRESS_MIN_SIZE", "1024"))  # bytes; smaller bodies go out as-is
+# Low levels: on JSON listings they already give ~10x; higher levels mostly add CPU
+GZIP_LEVEL = 3
+BROTLI_QUALITY = 1
+
+# Headers the endpoint's own Response object must not pass on to the real one
+_SUB_RESPONSE_SKIP = {"content-length", "content-type"}
+
+
+class FastJSONResponse(JSONResponse):
+    """JSONResponse rendered with orjson (datetimes, UUIDs and dataclasses natively)."""
+
+    def render(self, content: Any) -> bytes:
+        if orjson is None:
+            return super().render(content)
+        return orjson.dumps(content, option=orjson.OPT_NON_STR_KEYS)
+
+
+def trusted_json(content: Any, response: Optional[Response] = None, status_code: int = 200) -> FastJSONResponse:
+    """
+    Return DB rows without response-model re-validation.
+    Headers set on the endpoint's `response` parameter (cursor, ETag) are carried over.
+    """
+    headers = None
+    if response is not None:
+        headers = {k: v for k, v in response.headers.items() if k not in _SUB_RESPONSE_SKIP}
+    return FastJSONResponse(content, status_code=status_code, headers=headers)
+
+
+def choose_encoding(accept_encoding: str) -> Optional[str]:
+    """Pick br or gzip from an Accept-Encoding header (q=0 means refused)."""
+    accepted = {}
+    for part in accept_encoding.split(","):
+        name, _, params = part.strip().partition(";")
+        q = 1.0
+        if params.strip().startswith("q="):
+            try:
+                q = float(params.strip()[2:])
+            except ValueError:
+                q = 0.0
+        accepted[name.strip().lower()] = q
+    if brotli is not None and accepted.get("br", 0) > 0:
+        return "br"
+    if accepted.get("gzip", 0) > 0:
+        return "gzip"
+    return None
+
+
+def compress(body: bytes, encoding: str) -> bytes:
+    if encoding == "br":
+        return brotli.compress(body, quality=BROTLI_QUALITY)
+    return gzip.compress(body, compresslevel=GZIP_LEVEL)
+
+
+class CompressionMiddleware:
+    """
+    Compress complete (non-streaming) responses above COMPRESS_MIN_SIZE.
+    Streaming bodies (e.g. server-sent events) and already-encoded
+    responses pass through untouched.
+    """
+
+    def __init__(self, app, minimum_size: int = COMPRESS_MIN_SIZE):
+        self.app = app
+        self.minimum_size = minimum_size
+
+    async def __call__(self, scope, receive, send):
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        encoding = choose_encoding(Headers(scope=scope).get("accept-encoding", ""))
+        if encoding is None:
+            await self.app(scope, receive, send)
+            return
+
+        start_message = None
+        passthrough = False
+
+        async def send_compressed(message):
+            nonlocal start_message, passthrough
+            if passthrough:
+                await send(message)
+                return
+            if message["type"] == "http.response.start":
+                headers = Headers(raw=message["headers"])
+                if "content-encoding" in headers or headers.get("content-type", "").startswith("text/event-stream"):
+                    passthrough = True
+                    await send(message)
+                else:
+                    start_message = message  # held until the body is known
+                return
+            if message["type"] != "http.response.body":
+                await send(message)
+                return
+
+            body = message.get("body", b"")
+            if message.get("more_body", False) or len(body) < self.minimum_size:
+                # Streaming or small: send as-is
+                passthrough = True
+                await send(start_message)
+                await send(message)
+                return
+
+            payload = compress(body, encoding)
+            headers = MutableHeaders(raw=start_message["headers"])
+            headers["Content-Encoding"] = encoding
+            headers["Content-Length"] = str(len(payload))
+            headers.add_vary_header("Accept-Encoding")
+            etag = headers.get("etag")
+            if etag and not etag.startswith("W/"):
+                # A strong tag names one exact byte sequence; the encoded body is another
+                headers["ETag"] = "W/" + etag
+            await send(start_message)
+            await send({"type": "http.response.body", "body": payload})
+
+        await self.app(scope, receive, send_compressed)
@@ -2,7 +2,7 @@ import os
 import shutil
 from typing import List, Optional
 from fastapi import APIRouter, Depends, HTTPException, UploadFile, File
-from database import supabase
+from database import get_supabase
 from dependencies import get_current_user
 from services.policy_service import POLICY_DIR
 
@@ -59,7 +59,7 @@ def delete_policy_file(filename: str, user_id: str = Depends(get_current_user)):
 @router.get("/logs")
 def get_policy_logs(user_id: str = Depends(get_current_user), limit: int = 50):
     """View Q&A logs for audit."""
-    res = supabase.table("policy_logs")\
+    res = get_supabase().table("policy_logs")\
         .select("*")\
         .order("created_at", desc=True)\
         .limit(limit)\
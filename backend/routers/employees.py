@@ -1,75 +1,142 @@
 import datetime
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException
-from database import supabase, EPOCH_SENTINEL
+from typing import List, Optional
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, Query
+from postgrest.exceptions import APIError
+from database import EPOCH_SENTINEL
+from data_access import RequestData, get_request_data
+from etags import check_not_modified, EMPLOYEES_SCOPE
+from responses import trusted_json
 from dependencies import get_current_user
-from models import Employee, EmployeeCreate, EmployeeUpdate
+from models import Employee, EmployeeCreate, EmployeeUpdate, EmployeeDirectoryEntry
+from pagination import DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, name_keyset_filter, search_filter, search_term, next_cursor
 
 router = APIRouter()
 
+# Columns the directory view renders; full records come from GET /employees/{id}
+DIRECTORY_COLUMNS = "id, name, email, role, department, leave_remaining, status"
+
+
 @router.post("/", response_model=Employee)
-def create_employee(employee: EmployeeCreate, user_id: str = Depends(get_current_user)):
+async def create_employee(employee: EmployeeCreate, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
     """Manual creation of employee record by HR."""
     # Check for duplicate email
-    existing = supabase.table("employees")\
+    existing = await data.execute(data.db.table("employees")\
         .select("id")\
         .eq("email", employee.email)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
+        .eq("deleted_at", EPOCH_SENTINEL))
     
     if existing.data:
         raise HTTPException(status_code=400, detail="Employee with this email already exists")
 
-    data = employee.dict()
+    record = employee.dict()
     # Ensure join_date is ISO format if present, else default handled by DB or Pydantic
-    if data.get('join_date'):
-         data['join_date'] = data['join_date'].isoformat()
+    if record.get('join_date'):
+         record['join_date'] = record['join_date'].isoformat()
     
-    res = supabase.table("employees").insert(data).execute()
+    res = await data.execute(data.db.table("employees").insert(record))
     
     if not res.data:
         raise HTTPException(status_code=400, detail="Could not create employee")
     return res.data[0]
 
-@router.get("/", response_model=List[Employee])
-def list_employees(user_id: str = Depends(get_current_user)):
-    """List all active employees for HR Dashboard."""
-    res = supabase.table("employees")\
-        .select("*")\
+async def search_employees(data: RequestData, term: str, department: Optional[str], status: Optional[str], limit: int) -> List[dict]:
+    """
+    Ranked prefix / substring / fuzzy search (search_employees RPC, pg_trgm).
+    Falls back to a substring match if the RPC has not been created yet; its
+    ILIKE on the bare columns can still use the trigram indexes.
+    """
+    try:
+        res = await data.execute(data.db.rpc("search_employees", {
+            "p_query": term,
+            "p_department": department,
+            "p_status": status,
+            "p_limit": limit
+        }))
+        return res.data or []
+    except APIError as e:
+        if e.code != "PGRST202":  # function not found
+            raise
+        print("search_employees RPC missing, using substring search (run migrations/add_employee_directory_search.sql)")
+
+    query = data.db.table("employees")\
+        .select(DIRECTORY_COLUMNS)\
         .eq("deleted_at", EPOCH_SENTINEL)\
-        .order("name")\
-        .execute()
-    return res.data
+        .or_(search_filter(term, ("name", "email")))
+    if department:
+        query = query.eq("department", department)
+    if status:
+        query = query.eq("status", status)
+    res = await data.execute(query.order("name").order("id").limit(limit))
+    return res.data or []
+
+@router.get("/", response_model=List[EmployeeDirectoryEntry])
+async def list_employees(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user),
+    data: RequestData = Depends(get_request_data),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    department: Optional[str] = None,
+    status: Optional[str] = None,
+    q: Optional[str] = Query(None, max_length=100)
+):
+    """
+    Employee directory for the HR Dashboard, by name.
+    Keyset-paginated on (name, id); the next page cursor is returned in X-Next-Cursor.
+    With `q`, returns the best `limit` matches (prefix, then substring, then fuzzy) instead.
+    """
+    not_modified = await check_not_modified(request, response, data, EMPLOYEES_SCOPE)
+    if not_modified:
+        return not_modified
+
+    term = search_term(q) if q else ""
+    if term:
+        return trusted_json(await search_employees(data, term, department, status, limit), response)
+
+    query = data.db.table("employees")\
+        .select(DIRECTORY_COLUMNS)\
+        .eq("deleted_at", EPOCH_SENTINEL)
+    if department:
+        query = query.eq("department", department)
+    if status:
+        query = query.eq("status", status)
+    if cursor:
+        query = query.or_(name_keyset_filter(cursor))
+
+    res = await data.execute(query.order("name").order("id").limit(limit + 1))
+    rows = res.data or []
+    cursor_out = next_cursor(rows, limit, ("name", "id"))
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
+    return trusted_json(rows[:limit], response)
 
 @router.get("/{employee_id}", response_model=Employee)
-def get_employee(employee_id: str, user_id: str = Depends(get_current_user)):
-    res = supabase.table("employees")\
-        .select("*")\
-        .eq("id", employee_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
-    
-    if not res.data:
+async def get_employee(employee_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    employee = await data.employees.load(employee_id)  # active employees only
+    if not employee:
         raise HTTPException(status_code=404, detail="Employee not found")
-    return res.data[0]
+    return employee
 
 @router.patch("/{employee_id}", response_model=Employee)
-def update_employee(employee_id: str, updates: EmployeeUpdate, user_id: str = Depends(get_current_user)):
+async def update_employee(employee_id: str, updates: EmployeeUpdate, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
     """Manual update of employee data (e.g. leave balance adjustment)."""
     update_data = {k: v for k, v in updates.dict().items() if v is not None}
     update_data["updated_at"] = datetime.datetime.now(datetime.timezone.utc).isoformat()
     
-    res = supabase.table("employees").update(update_data).eq("id", employee_id).execute()
+    res = await data.execute(data.db.table("employees").update(update_data).eq("id", employee_id))
+    data.employees.clear(employee_id)
     
     if not res.data:
         raise HTTPException(status_code=404, detail="Employee not found or update failed")
     return res.data[0]
 
 @router.delete("/{employee_id}")
-def delete_employee(employee_id: str, user_id: str = Depends(get_current_user)):
+async def delete_employee(employee_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
     """Soft delete employee record."""
     now = datetime.datetime.now(datetime.timezone.utc).isoformat()
     
-    res = supabase.table("employees").update({"deleted_at": now}).eq("id", employee_id).execute()
+    await data.execute(data.db.table("employees").update({"deleted_at": now}, returning="minimal").eq("id", employee_id))
+    data.employees.clear(employee_id)
     
     return {"status": "success", "message": "Employee archived"}
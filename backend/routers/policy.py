@@ -12,8 +12,8 @@ def chat_with_policy(query: str, user_id: str = Depends(get_current_user), emplo
     """
     emp_context = None
     if employee_id:
-        from database import supabase, EPOCH_SENTINEL
-        res = supabase.table("employees").select("*").eq("id", employee_id).eq("deleted_at", EPOCH_SENTINEL).execute()
+        from database import get_supabase, EPOCH_SENTINEL
+        res = get_supabase().table("employees").select("*").eq("id", employee_id).eq("deleted_at", EPOCH_SENTINEL).execute()
         if res.data:
             emp_context = res.data[0]
 
@@ -1,403 +1,820 @@
+import asyncio
 import secrets
 import datetime
-from typing import List
-from fastapi import APIRouter, Depends, HTTPException, BackgroundTasks, Request, UploadFile, File, Form
+from typing import Dict, List, Optional, Set
+from starlette.concurrency import run_in_threadpool
+from fastapi import APIRouter, Depends, HTTPException, Request, Response, UploadFile, File, Form, Query
+from fastapi.responses import StreamingResponse
 from pydantic import EmailStr
-from database import supabase, EPOCH_SENTINEL
-from dependencies import get_current_user
+from postgrest.exceptions import APIError
+from database import EPOCH_SENTINEL
+from data_access import RequestData, get_request_data, APPLICANT_COLUMNS, ACTIVE_PROJECT_FILTER
+from etags import check_not_modified, recruitment_scope
+from responses import trusted_json
+from analytics import stats_since, stats_filter, summarize
+from dependencies import get_current_user, get_stream_user
 from models import (
     Organization, OrganizationCreate, Project, ProjectCreate, ProjectUpdate, 
-    Applicant, ApplicantUpdate, APIKey, VerifyApplicantRequest
+    Applicant, ApplicantUpdate, BulkApplicantUpdate, APIKey, VerifyApplicantRequest,
+    RecruitmentStats, OrganizationStats, ApplicantSearchResult
 )
 from services.ai_service import process_ai_score
+from services.cv_store import get_cv_store
+from services.events import (
+    event_stream, publish_event,
+    APPLICANT_CREATED, APPLICANT_STATUS_CHANGED, APPLICANT_DELETED
+)
 from validators import validate_cv_file, is_professional_cv
 from extractors import extract_and_validate_cv_text
+from skill_extractor import extract_profile
+from relevance import build_project_vector, project_vector, score_relevance, llm_gate
+from cv_search import SEARCH_MAX_CHARS, SEARCH_DEFAULT_LIMIT, SEARCH_MAX_LIMIT, query_terms, make_snippet
+from near_duplicates import (
+    NEAR_DUPLICATE_THRESHOLD, NEAR_DUPLICATE_MAX_CANDIDATES, minhash_signature, band_keys, best_match
+)
 from utils import calculate_cv_hash
-from email_service import send_decision_email
+from single_flight import SingleFlight
+from metrics import record_cache
+from services.email_outbox import outbox_message
+from email_service import build_decision_email
+from pagination import (
+    DEFAULT_PAGE_SIZE, MAX_PAGE_SIZE, score_keyset_filter, created_keyset_filter,
+    search_filter, next_cursor
+)
 
 router = APIRouter()
 
+# Project columns for listings (the Project response model)
+PROJECT_COLUMNS = "id, org_id, name, template_id, is_active, description, requirements, benefits, llm_min_relevance, llm_top_n, created_at"
+
+# In-flight /apply submissions by (project_id, cv_hash)
+apply_flights = SingleFlight()
+# Scoring runs started by /apply, referenced until done (the loop keeps only weak references)
+scoring_tasks: Set[asyncio.Task] = set()
+
+# Bulk decisions: max ids per request, and per PostgREST call (ids travel in the URL)
+BULK_MAX_APPLICANTS = 1000
+BULK_CHUNK_SIZE = 200
+
 # --- Organizations ---
 @router.post("/organizations", response_model=Organization)
-def create_organization(org: OrganizationCreate, user_id: str = Depends(get_current_user)):
-    res = supabase.table("organizations").insert({
+async def create_organization(org: OrganizationCreate, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    res = await data.execute(data.db.table("organizations").insert({
         "name": org.name,
         "owner_id": user_id
-    }).execute()
+    }))
     if not res.data:
         raise HTTPException(status_code=400, detail="Could not create organization")
     return res.data[0]
 
 @router.get("/organizations", response_model=List[Organization])
-def list_organizations(user_id: str = Depends(get_current_user)):
-    res = supabase.table("organizations")\
+async def list_organizations(user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    res = await data.execute(data.db.table("organizations")\
         .select("*")\
         .eq("owner_id", user_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
+        .eq("deleted_at", EPOCH_SENTINEL))
     return res.data
 
+@router.get("/organizations/events")
+async def stream_organization_events(
+    request: Request,
+    last_event_id: Optional[str] = None,
+    user_id: str = Depends(get_stream_user)
+):
+    """
+    Server-sent events for the user's organization: applicant.created,
+    applicant.scored, applicant.status_changed and applicant.deleted.
+    Resumes after the Last-Event-ID header (or ?last_event_id= when a client
+    reopens the stream itself, e.g. with a refreshed token).
+    """
+    return StreamingResponse(
+        event_stream(user_id, request.headers.get("last-event-id") or last_event_id),
+        media_type="text/event-stream",
+        headers={"Cache-Control": "no-cache", "X-Accel-Buffering": "no"}
+    )
+
 # --- Projects ---
-def get_or_create_org(user_id: str) -> str:
+async def get_or_create_org(data: RequestData, user_id: str) -> str:
     """Helper to ensure 1 HR = 1 Org."""
-    res = supabase.table("organizations").select("id").eq("owner_id", user_id).eq("deleted_at", EPOCH_SENTINEL).execute()
-    if res.data:
-        return res.data[0]["id"]
+    org = await data.orgs_by_owner.load(user_id)
+    if org:
+        return org["id"]
     
     # Auto-create if not exists
-    new_org = supabase.table("organizations").insert({
+    new_org = await data.execute(data.db.table("organizations").insert({
         "name": "My Organization",
         "owner_id": user_id
-    }).execute()
+    }))
     
     if not new_org.data:
         raise HTTPException(status_code=500, detail="Failed to initialize organization")
+    data.orgs_by_owner.clear(user_id)
+    data.orgs_by_owner.prime(user_id, new_org.data[0])
     return new_org.data[0]["id"]
 
+
+def is_owned_project(project: Optional[dict], user_id: str) -> bool:
+    """Ownership check on a row from data.projects (which only loads active projects)."""
+    return bool(project) and project["owner_id"] == user_id
+
 # --- Projects ---
 @router.post("/projects", response_model=Project)
-def create_project(project: ProjectCreate, user_id: str = Depends(get_current_user)):
+async def create_project(project: ProjectCreate, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
     # Auto-resolve Org
-    org_id = get_or_create_org(user_id)
+    org_id = await get_or_create_org(data, user_id)
 
-    res = supabase.table("projects").insert({
+    res = await data.execute(data.db.table("projects").insert({
         "org_id": org_id,
         "name": project.name,
         "template_id": project.template_id,
         "owner_id": user_id
-    }).execute()
+    }))
     if not res.data:
         raise HTTPException(status_code=400, detail="Could not create project")
     return res.data[0]
 
 @router.get("/projects", response_model=List[Project])
-def list_projects(user_id: str = Depends(get_current_user)):
-    # Auto-resolve Org (Implicit ownership check via org_id)
-    org_id = get_or_create_org(user_id)
+async def list_projects(request: Request, response: Response, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    # Auto-resolve Org (Implicit ownership check via org_id), alongside the ETag check
+    not_modified, org_id = await asyncio.gather(
+        check_not_modified(request, response, data, recruitment_scope(user_id)),
+        get_or_create_org(data, user_id)
+    )
+    if not_modified:
+        return not_modified
     
-    res = supabase.table("projects")\
-        .select("*")\
+    res = await data.execute(data.db.table("projects")\
+        .select(PROJECT_COLUMNS)\
         .eq("org_id", org_id)\
         .eq("owner_id", user_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
-    return res.data
+        .eq("deleted_at", EPOCH_SENTINEL))
+    return trusted_json(res.data, response)
 
 @router.get("/projects/{project_id}", response_model=Project)
-def get_project(project_id: str):
-    res = supabase.table("projects")\
-        .select("*")\
+async def get_project(project_id: str, data: RequestData = Depends(get_request_data)):
+    # Organization name embedded: one round trip
+    res = await data.execute(data.db.table("projects")\
+        .select("*, organizations(name)")\
         .eq("id", project_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
+        .eq("deleted_at", EPOCH_SENTINEL))
     if not res.data:
         raise HTTPException(status_code=404, detail="Project not found")
     
     project = res.data[0]
-    org_res = supabase.table("organizations").select("name").eq("id", project['org_id']).execute()
-    if org_res.data:
-        project['org_name'] = org_res.data[0]['name']
+    org = project.pop("organizations", None)
+    if org:
+        project['org_name'] = org['name']
     return project
 
 @router.patch("/projects/{project_id}", response_model=Project)
-def update_project(project_id: str, updates: ProjectUpdate, user_id: str = Depends(get_current_user)):
-    proj_check = supabase.table("projects")\
-        .select("id")\
-        .eq("id", project_id)\
-        .eq("owner_id", user_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
-    if not proj_check.data:
+async def update_project(project_id: str, updates: ProjectUpdate, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    project = await data.projects.load(project_id)
+    if not is_owned_project(project, user_id):
         raise HTTPException(status_code=403, detail="Not authorized")
     
     update_data = {k: v for k, v in updates.dict().items() if v is not None}
-    res = supabase.table("projects").update(update_data).eq("id", project_id).execute()
+    if "description" in update_data or "requirements" in update_data:
+        # Ranking vector computed once per edit, not once per application
+        update_data["relevance_vector"] = build_project_vector(
+            update_data.get("description", project.get("description")),
+            update_data.get("requirements", project.get("requirements"))
+        )
+    res = await data.execute(data.db.table("projects").update(update_data).eq("id", project_id))
+    data.projects.clear(project_id)
     return res.data[0]
 
 @router.delete("/projects/{project_id}")
-def delete_project(project_id: str, user_id: str = Depends(get_current_user)):
+async def delete_project(project_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
     """Soft delete a project."""
     now = datetime.datetime.now(datetime.timezone.utc).isoformat()
-    proj_check = supabase.table("projects").select("id").eq("id", project_id).eq("owner_id", user_id).execute()
-    if not proj_check.data:
+    project = await data.projects.load(project_id)
+    if not project or project["owner_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    supabase.table("projects").update({"deleted_at": now}).eq("id", project_id).execute()
-    supabase.table("applicants").update({"deleted_at": now}).eq("project_id", project_id).execute()
+    # Independent writes: issue both at once
+    await asyncio.gather(
+        data.execute(data.db.table("projects").update({"deleted_at": now}, returning="minimal").eq("id", project_id)),
+        data.execute(data.db.table("applicants").update({"deleted_at": now}, returning="minimal").eq("project_id", project_id))
+    )
+    data.projects.clear(project_id)
     return {"status": "success", "message": "Project archived"}
 
 # --- API Keys ---
 @router.post("/projects/{project_id}/keys", response_model=APIKey)
-def generate_api_key(project_id: str, user_id: str = Depends(get_current_user)):
-    proj_check = supabase.table("projects")\
-        .select("id")\
-        .eq("id", project_id)\
-        .eq("owner_id", user_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
-    if not proj_check.data:
+async def generate_api_key(project_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    if not is_owned_project(await data.projects.load(project_id), user_id):
          raise HTTPException(status_code=403, detail="Not authorized")
 
     new_key = f"hris_{secrets.token_urlsafe(24)}"
-    res = supabase.table("api_keys").insert({
+    res = await data.execute(data.db.table("api_keys").insert({
         "project_id": project_id,
         "key_value": new_key,
         "owner_id": user_id
-    }).execute()
+    }))
     return res.data[0]
 
+# --- Analytics ---
+@router.get("/projects/{project_id}/stats", response_model=RecruitmentStats)
+async def get_project_stats(project_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    """Counts by status, score histogram, applications per day and median time-to-score."""
+    if not is_owned_project(await data.projects.load(project_id), user_id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+
+    since = stats_since()
+    res = await data.execute(data.db.table("applicant_stats")\
+        .select("metric, bucket, count")\
+        .eq("project_id", project_id)\
+        .or_(stats_filter(since)))
+    return summarize(res.data or [], since)
+
+@router.get("/organizations/stats", response_model=OrganizationStats)
+async def get_organization_stats(user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    """Stats across all of the user's active projects, plus per-project status counts."""
+    since = stats_since()
+    res = await data.execute(data.db.table("applicant_stats")\
+        .select("project_id, metric, bucket, count, projects!inner(owner_id)")\
+        .eq("projects.owner_id", user_id)\
+        .eq("projects.deleted_at", EPOCH_SENTINEL)\
+        .or_(stats_filter(since)))
+    rows = res.data or []
+
+    stats = summarize(rows, since)
+    projects = {}
+    for row in rows:
+        if row["metric"] != "status" or not row["count"]:
+            continue
+        summary = projects.setdefault(row["project_id"], {"total": 0, "by_status": {}})
+        summary["total"] += row["count"]
+        summary["by_status"][row["bucket"]] = row["count"]
+    stats["projects"] = projects
+    return stats
+
 # --- Applicants (Recruitment Logic) ---
+def apply_applicant_filters(query, status: Optional[str], min_score: Optional[int], max_score: Optional[int], q: Optional[str]):
+    """Shared server-side filters for applicant listings. `status` may list several, comma-separated."""
+    statuses = [s for s in status.split(",") if s] if status else []
+    if len(statuses) == 1:
+        query = query.eq("status", statuses[0])
+    elif statuses:
+        query = query.in_("status", statuses)
+    if min_score is not None:
+        query = query.gte("ai_score", min_score)
+    if max_score is not None:
+        query = query.lte("ai_score", max_score)
+    if q:
+        search = search_filter(q, ("name", "email"))
+        if search:
+            query = query.or_(search)
+    return query
+
 @router.get("/applicants/all", response_model=List[Applicant])
-def list_all_applicants(user_id: str = Depends(get_current_user)):
-    """List all applicants across all projects for the user's organization."""
-    org_id = get_or_create_org(user_id)
-    
-    org_check = supabase.table("organizations")\
-        .select("id")\
-        .eq("id", org_id)\
-        .eq("owner_id", user_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
-    if not org_check.data:
-         # Should catch inconsistent state if get_or_create failed logic
-         raise HTTPException(status_code=403, detail="Not authorized")
-    
-    proj_res = supabase.table("projects")\
-        .select("id")\
-        .eq("org_id", org_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
-    proj_ids = [p["id"] for p in proj_res.data]
+async def list_all_applicants(
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user),
+    data: RequestData = Depends(get_request_data),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    min_score: Optional[int] = Query(None, ge=0, le=100),
+    max_score: Optional[int] = Query(None, ge=0, le=100),
+    q: Optional[str] = Query(None, max_length=100)
+):
+    """
+    List applicants across all projects for the user's organization, newest first.
+    Keyset-paginated on (created_at, id); the next page cursor is returned in X-Next-Cursor.
+    """
+    # The org is looked up by owner, which is also the ownership check
+    not_modified, org_id = await asyncio.gather(
+        check_not_modified(request, response, data, recruitment_scope(user_id)),
+        get_or_create_org(data, user_id)
+    )
+    if not_modified:
+        return not_modified
     
-    if not proj_ids:
-        return []
+    # Inner-joined project filter: no separate round trip for the org's project ids
+    query = data.db.table("applicants")\
+        .select(f"{APPLICANT_COLUMNS}, projects!inner(name)")\
+        .eq("projects.org_id", org_id)\
+        .eq("projects.deleted_at", EPOCH_SENTINEL)\
+        .eq("deleted_at", EPOCH_SENTINEL)
+    query = apply_applicant_filters(query, status, min_score, max_score, q)
+    if cursor:
+        query = query.or_(created_keyset_filter(cursor))
     
-    res = supabase.table("applicants")\
-        .select("*, projects(name)")\
-        .in_("project_id", proj_ids)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
+    res = await data.execute(query\
         .order("created_at", desc=True)\
-        .execute()
+        .order("id", desc=True)\
+        .limit(limit + 1))
+    
+    rows = res.data or []
+    cursor_out = next_cursor(rows, limit, ("created_at", "id"))
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
     
     flattened = []
-    if res.data:
-        for item in res.data:
-            project_info = item.get("projects")
-            p_name = "Unknown Project"
-            if isinstance(project_info, dict):
-                p_name = project_info.get("name", "Unknown")
-            elif isinstance(project_info, list) and len(project_info) > 0:
-                p_name = project_info[0].get("name", "Unknown")
-            item["project_name"] = p_name
-            if "projects" in item:
-                del item["projects"]
-            flattened.append(item)
-    return flattened
+    for item in rows[:limit]:
+        project_info = item.get("projects")
+        p_name = "Unknown Project"
+        if isinstance(project_info, dict):
+            p_name = project_info.get("name", "Unknown")
+        elif isinstance(project_info, list) and len(project_info) > 0:
+            p_name = project_info[0].get("name", "Unknown")
+        item["project_name"] = p_name
+        if "projects" in item:
+            del item["projects"]
+        flattened.append(item)
+    return trusted_json(flattened, response)
+
+@router.get("/applicants/search", response_model=List[ApplicantSearchResult])
+async def search_applicants(
+    response: Response,
+    q: str = Query(..., min_length=1, max_length=200),
+    project_id: Optional[str] = None,
+    limit: int = Query(SEARCH_DEFAULT_LIMIT, ge=1, le=SEARCH_MAX_LIMIT),
+    user_id: str = Depends(get_current_user),
+    data: RequestData = Depends(get_request_data)
+):
+    """
+    Full-text search over the CVs of the user's organization (optionally one project),
+    best match first. `q` takes web search syntax: words, "exact phrases", OR, -excluded.
+    Each hit carries a snippet of the CV around the matching words.
+    """
+    # Owner-scoped inside the RPC: another org's project_id just matches nothing
+    res = await data.execute(data.db.rpc("search_applicants", {
+        "p_owner_id": user_id,
+        "p_query": q,
+        "p_project_id": project_id,
+        "p_limit": limit
+    }))
+    rows = res.data or []
+
+    texts = await run_in_threadpool(get_cv_store().get_many, [row["cv_hash"] for row in rows if row.get("cv_hash")])
+    terms = query_terms(q)
+    for row in rows:
+        row["snippet"] = make_snippet(texts.get(row.pop("cv_hash", None)), terms)
+    return trusted_json(rows, response)
 
 @router.get("/applicants", response_model=List[Applicant])
-def list_applicants(project_id: str, user_id: str = Depends(get_current_user)):
-    proj_check = supabase.table("projects")\
-        .select("id")\
-        .eq("id", project_id)\
-        .eq("owner_id", user_id)\
-        .eq("deleted_at", EPOCH_SENTINEL)\
-        .execute()
-    if not proj_check.data:
+async def list_applicants(
+    project_id: str,
+    request: Request,
+    response: Response,
+    user_id: str = Depends(get_current_user),
+    data: RequestData = Depends(get_request_data),
+    limit: int = Query(DEFAULT_PAGE_SIZE, ge=1, le=MAX_PAGE_SIZE),
+    cursor: Optional[str] = None,
+    status: Optional[str] = None,
+    min_score: Optional[int] = Query(None, ge=0, le=100),
+    max_score: Optional[int] = Query(None, ge=0, le=100),
+    q: Optional[str] = Query(None, max_length=100),
+    sort: str = Query("score", pattern="^(score|relevance)$")
+):
+    """
+    List a project's applicants, best AI score first (sort=score) or most
+    relevant to the project text first (sort=relevance); unscored last.
+    Keyset-paginated on (score, id); the next page cursor is returned in X-Next-Cursor.
+    """
+    sort_column = "relevance_score" if sort == "relevance" else "ai_score"
+    # Ownership and ETag checks are independent: run both, then list only if changed
+    project, not_modified = await asyncio.gather(
+        data.projects.load(project_id),
+        check_not_modified(request, response, data, recruitment_scope(user_id))
+    )
+    if not is_owned_project(project, user_id):
          raise HTTPException(status_code=403, detail="Not authorized for this Project")
+    if not_modified:
+        return not_modified
 
-    res = supabase.table("applicants")\
-        .select("*")\
+    query = data.db.table("applicants")\
+        .select(APPLICANT_COLUMNS)\
         .eq("project_id", project_id)\
+        .eq("deleted_at", EPOCH_SENTINEL)
+    query = apply_applicant_filters(query, status, min_score, max_score, q)
+    if cursor:
+        query = query.or_(score_keyset_filter(cursor, sort_column))
+
+    res = await data.execute(query\
+        .order(sort_column, desc=True, nullsfirst=False)\
+        .order("id", desc=True)\
+        .limit(limit + 1))
+    
+    rows = res.data or []
+    cursor_out = next_cursor(rows, limit, (sort_column, "id"))
+    if cursor_out:
+        response.headers["X-Next-Cursor"] = cursor_out
+    return trusted_json(rows[:limit], response)
+
+@router.get("/applicants/{applicant_id}/cv")
+async def get_applicant_cv(applicant_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    """Lazily fetch the extracted CV text for one applicant."""
+    app_res = await data.execute(data.db.table("applicants")\
+        .select("project_id, cv_hash, cv_text, projects(*)")\
+        .eq("id", applicant_id)\
         .eq("deleted_at", EPOCH_SENTINEL)\
-        .order("ai_score", desc=True)\
-        .execute()
-    return res.data
+        .eq(*ACTIVE_PROJECT_FILTER))
+    if not app_res.data:
+        raise HTTPException(status_code=404, detail="Applicant not found")
+    
+    data.prime_projects(app_res.data)
+    applicant = app_res.data[0]
+    if not is_owned_project(await data.projects.load(applicant["project_id"]), user_id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    
+    # Rows created before the CV store keep their text inline
+    cv_text = applicant.get("cv_text")
+    if not cv_text and applicant.get("cv_hash"):
+        cv_text = await run_in_threadpool(get_cv_store().get, applicant["cv_hash"])
+    if cv_text is None:
+        raise HTTPException(status_code=404, detail="CV content not found")
+    return {"id": applicant_id, "cv_text": cv_text}
+
+async def decide_applicants(data: RequestData, user_id: str, status: str, emails: Dict[str, dict]) -> Dict[str, dict]:
+    """
+    Set `status` on the applicants in `emails` (id -> decision email or None)
+    and queue their emails in one transaction (one round trip).
+    Returns {id: {"changed", "email_queued"}} for live applicants the user owns;
+    applicants already in `status` are left alone and get no second email.
+    """
+    res = await data.execute(data.db.rpc("decide_applicants", {
+        "p_applicant_ids": list(emails),
+        "p_owner_id": user_id,
+        "p_status": status,
+        "p_emails": {applicant_id: outbox_message(message) for applicant_id, message in emails.items() if message}
+    }))
+    for applicant_id in emails:
+        data.applicants.clear(applicant_id)
+    return {str(row["applicant_id"]): row for row in res.data or []}
 
 @router.patch("/applicants/{applicant_id}", response_model=Applicant)
-def update_applicant(applicant_id: str, update: ApplicantUpdate, user_id: str = Depends(get_current_user)):
-    app_data = supabase.table("applicants").select("project_id, name, email").eq("id", applicant_id).execute()
-    if not app_data.data:
+async def update_applicant(applicant_id: str, update: ApplicantUpdate, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    # One round trip: the applicant loader embeds the project
+    applicant = await data.applicants.load(applicant_id)
+    if not applicant:
         raise HTTPException(status_code=404, detail="Applicant not found")
         
-    applicant = app_data.data[0]
-    proj_check = supabase.table("projects").select("id, name").eq("id", applicant['project_id']).eq("owner_id", user_id).eq("deleted_at", EPOCH_SENTINEL).execute()
-    if not proj_check.data:
+    project = await data.projects.load(applicant['project_id'])
+    if not is_owned_project(project, user_id):
          raise HTTPException(status_code=403, detail="Not authorized")
     
-    project_name = proj_check.data[0]['name']
-    send_decision_email(applicant['email'], applicant['name'], update.status, project_name)
-    res = supabase.table("applicants").update({"status": update.status}).eq("id", applicant_id).execute()
-    return res.data[0]
+    # The status change and its email (delivered by the outbox dispatcher) commit together
+    message = build_decision_email(applicant['email'], applicant['name'], update.status, project['name'])
+    decided = await decide_applicants(data, user_id, update.status, {applicant_id: message})
+    if applicant_id not in decided:
+        # Deleted or archived since the read
+        raise HTTPException(status_code=404, detail="Applicant not found")
+    if decided[applicant_id]["changed"]:
+        publish_event(user_id, APPLICANT_STATUS_CHANGED, {"ids": [applicant_id], "status": update.status})
+    return dict(applicant, status=update.status)
+
+@router.post("/applicants/bulk-status")
+async def bulk_update_applicants(update: BulkApplicantUpdate, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    """
+    Apply one decision to many applicants.
+    Ownership is checked with one embedded query, then the status change and
+    the notification emails are written by one decide_applicants call (per
+    BULK_CHUNK_SIZE ids). Returns a result per requested id.
+    """
+    ids = list(dict.fromkeys(str(i) for i in update.applicant_ids))
+    if not ids:
+        raise HTTPException(status_code=400, detail="No applicants given")
+    if len(ids) > BULK_MAX_APPLICANTS:
+        raise HTTPException(status_code=400, detail=f"At most {BULK_MAX_APPLICANTS} applicants per request")
+
+    results = {applicant_id: "not_found" for applicant_id in ids}
+    changed_ids = []
+    emails_queued = 0
+    for start in range(0, len(ids), BULK_CHUNK_SIZE):
+        chunk = ids[start:start + BULK_CHUNK_SIZE]
+        # Archived projects are filtered in the embed: they come back empty
+        app_res = await data.execute(data.db.table("applicants")\
+            .select("id, name, email, projects(name, owner_id)")\
+            .in_("id", chunk)\
+            .eq("deleted_at", EPOCH_SENTINEL)\
+            .eq(*ACTIVE_PROJECT_FILTER))
+
+        emails = {}
+        for applicant in app_res.data or []:
+            project = applicant.get("projects") or {}
+            if isinstance(project, list):
+                project = project[0] if project else {}
+            if project.get("owner_id") != user_id:
+                results[applicant["id"]] = "forbidden"
+                continue
+            emails[applicant["id"]] = build_decision_email(applicant["email"], applicant["name"], update.status, project.get("name"))
+
+        if emails:
+            decided = await decide_applicants(data, user_id, update.status, emails)
+            for applicant_id, row in decided.items():
+                results[applicant_id] = "updated"
+                if row["changed"]:
+                    changed_ids.append(applicant_id)
+                emails_queued += bool(row["email_queued"])
+
+    if changed_ids:
+        publish_event(user_id, APPLICANT_STATUS_CHANGED, {"ids": changed_ids, "status": update.status})
+    updated = sum(1 for result in results.values() if result == "updated")
+    return {
+        "status": "success",
+        "updated": updated,
+        "emails_queued": emails_queued,
+        "results": [{"id": applicant_id, "result": result} for applicant_id, result in results.items()]
+    }
 
 @router.delete("/applicants/{applicant_id}")
-def delete_applicant(applicant_id: str, user_id: str = Depends(get_current_user)):
+async def delete_applicant(applicant_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
     now = datetime.datetime.now(datetime.timezone.utc).isoformat()
-    app_res = supabase.table("applicants").select("project_id").eq("id", applicant_id).execute()
-    if not app_res.data:
+    applicant = await data.applicants.load(applicant_id)
+    if not applicant:
         raise HTTPException(status_code=404, detail="Applicant not found")
         
-    proj_check = supabase.table("projects").select("id").eq("id", app_res.data[0]["project_id"]).eq("owner_id", user_id).execute()
-    if not proj_check.data:
+    project = await data.projects.load(applicant["project_id"])
+    if not project or project["owner_id"] != user_id:
         raise HTTPException(status_code=403, detail="Not authorized")
     
-    supabase.table("applicants").update({"deleted_at": now}).eq("id", applicant_id).execute()
+    await data.execute(data.db.table("applicants").update({"deleted_at": now}, returning="minimal").eq("id", applicant_id))
+    data.applicants.clear(applicant_id)
+    publish_event(user_id, APPLICANT_DELETED, {"ids": [applicant_id]})
     return {"status": "success", "message": "Applicant archived"}
 
 # --- Public Submission ---
 @router.post("/apply")
 async def apply_candidate(
     request: Request,
-    background_tasks: BackgroundTasks,
     name: str = Form(...),
     email: EmailStr = Form(...),
-    cv: UploadFile = File(...)
+    cv: UploadFile = File(...),
+    data: RequestData = Depends(get_request_data)
 ):
     """Public endpoint for CV submission. Validates project status and AI eligibility."""
     x_api_key = request.headers.get("X-API-KEY")
     x_project_id = request.headers.get("X-PROJECT-ID")
     
     if x_api_key:
-        key_res = supabase.table("api_keys").select("project_id").eq("key_value", x_api_key).execute()
+        # The project is embedded for the event stream's owner lookup
+        key_res = await data.execute(data.db.table("api_keys").select("project_id, projects(*)").eq("key_value", x_api_key).eq(*ACTIVE_PROJECT_FILTER))
         if not key_res.data:
             raise HTTPException(status_code=401, detail="Invalid API Key")
+        data.prime_projects(key_res.data)
         x_project_id = key_res.data[0]["project_id"]
+        project = await data.projects.load(x_project_id)
     else:
-        proj_check = supabase.table("projects").select("id, is_active").eq("id", x_project_id).eq("deleted_at", EPOCH_SENTINEL).execute()
-        if not proj_check.data:
+        project = await data.projects.load(x_project_id) if x_project_id else None
+        if not project:
             raise HTTPException(status_code=404, detail="Project not found")
-        if not proj_check.data[0].get("is_active", True):
+        if not project.get("is_active", True):
             raise HTTPException(status_code=403, detail="Position closed")
 
     content = await cv.read()
     cv_hash = calculate_cv_hash(content)
-    
-    # Deduplication
-    existing = supabase.table("applicants").select("*").eq("project_id", x_project_id).eq("cv_hash", cv_hash).eq("deleted_at", EPOCH_SENTINEL).execute()
+
+    # Double submits and job-board retries of the same CV share one extraction and scoring run.
+    # The shared work outlives any one caller, so it gets its own data context, not this request's.
+    work = RequestData(data.db)
+    result, shared = await apply_flights.do(
+        (x_project_id, cv_hash),
+        lambda: submit_application(work, project or {}, x_project_id, name, email, cv, content, cv_hash)
+    )
+    data.query_count += work.query_count
+    record_cache("apply_duplicate", shared or bool(result.get("duplicate")))
+    if shared:
+        return {"id": result.get("id"), "project_id": x_project_id, "duplicate": True}
+    return result
+
+async def duplicate_response(data: RequestData, project_id: str, cv_hash: str) -> Optional[dict]:
+    """The live applicant with this CV in the project, as /apply's duplicate answer (index-only read)."""
+    existing = await data.execute(data.db.table("applicants").select("id").eq("project_id", project_id).eq("cv_hash", cv_hash).eq("deleted_at", EPOCH_SENTINEL))
     if existing.data:
-        return existing.data[0]
+        return {"id": existing.data[0]["id"], "project_id": project_id, "duplicate": True}
+    return None
+
+async def index_cv_text(data: RequestData, owner_id: Optional[str], cv_hash: str, cv_text: str) -> None:
+    """Add the CV to its owner's search index. Best effort: search is not worth
+    failing an application over, and backfill_cv_search.py indexes what was missed."""
+    try:
+        await data.execute(data.db.rpc("index_cv_text", {
+            "p_cv_hash": cv_hash,
+            "p_text": cv_text[:SEARCH_MAX_CHARS],
+            "p_owner_id": owner_id
+        }))
+    except Exception as e:
+        print(f"index_cv_text failed for {cv_hash}: {e}")
+
+def schedule_scoring(applicant_id: str, name: str, email: str, cv_text: str, owner_id: Optional[str]) -> None:
+    """
+    Score in a worker thread, independent of any request. BackgroundTasks would
+    tie the run to one response, which is never sent if that client disconnects.
+    """
+    task = asyncio.ensure_future(asyncio.to_thread(process_ai_score, applicant_id, name, email, cv_text, owner_id))
+    scoring_tasks.add(task)
+    task.add_done_callback(scoring_tasks.discard)
 
-    # Rule-based validation
-    mime_type, _ = validate_cv_file(cv, content)
-    cv_text = extract_and_validate_cv_text(content, mime_type)
+async def submit_application(data: RequestData, project: dict, x_project_id: str,
+                             name: str, email: str, cv: UploadFile, content: bytes, cv_hash: str) -> dict:
+    """Validate, extract, rank and store one application (run once per (project, CV) at a time)."""
+    existing = await duplicate_response(data, x_project_id, cv_hash)
+    if existing:
+        return existing
+
+    # Rule-based validation (libmagic and pypdf are blocking: keep them off the event loop)
+    mime_type, _ = await run_in_threadpool(validate_cv_file, cv, content)
+    cv_text = await run_in_threadpool(extract_and_validate_cv_text, content, mime_type)
     
     if not is_professional_cv(cv_text):
         raise HTTPException(status_code=400, detail="Irrelevant content. CV must be professional.")
 
-    res = supabase.table("applicants").insert({
+    # Content-addressed: identical CVs across projects share one stored copy (and per-owner search entry)
+    await asyncio.gather(
+        run_in_threadpool(get_cv_store().put, cv_hash, cv_text),
+        index_cv_text(data, project.get("owner_id"), cv_hash, cv_text)
+    )
+    # Local skill / experience extraction: filterable before the AI score arrives
+    profile = await run_in_threadpool(extract_profile, cv_text)
+    # Local relevance to the project text; may hold the application back from the LLM
+    relevance = await run_in_threadpool(score_relevance, cv_text, project_vector(project))
+
+    # Near-duplicate of an already scored applicant (edited resubmission): reuse its score
+    signature = await run_in_threadpool(minhash_signature, cv_text)
+    bands = band_keys(x_project_id, signature) if signature else None
+    duplicate = await find_near_duplicate(data, x_project_id, signature, bands)
+    record_cache("cv_score", duplicate is not None)
+    if duplicate:
+        original, similarity = duplicate
+        hold_reason = None
+        scoring = {
+            "ai_score": original["applicants"]["ai_score"],
+            "ai_reasoning": original["applicants"]["ai_reasoning"],
+            "duplicate_of": original["applicant_id"],
+            "duplicate_similarity": round(similarity, 3)
+        }
+    else:
+        hold_reason = await check_llm_gate(data, project, relevance)
+        scoring = {"ai_reasoning": hold_reason}
+
+    # Another worker may have stored the same CV meanwhile: on conflict, answer as a duplicate
+    res = await data.execute(data.db.table("applicants").upsert({
         "project_id": x_project_id,
         "name": name,
         "email": email,
-        "cv_text": cv_text,
         "cv_hash": cv_hash,
-        "status": "processing"
-    }).execute()
-    
+        "status": "processing",
+        "deleted_at": EPOCH_SENTINEL,
+        "relevance_score": relevance,
+        **scoring,
+        **profile
+    }, on_conflict="project_id,cv_hash,deleted_at", ignore_duplicates=True))
+    if not res.data:
+        existing = await duplicate_response(data, x_project_id, cv_hash)
+        if not existing:  # the conflicting applicant was archived in between
+            raise HTTPException(status_code=409, detail="This CV was just submitted, please retry")
+        return existing
+
     applicant = res.data[0]
-    background_tasks.add_task(process_ai_score, applicant["id"], name, email, cv_text)
+    if bands:
+        await data.execute(data.db.table("cv_signatures").insert({
+            "applicant_id": applicant["id"],
+            "project_id": x_project_id,
+            "signature": signature,
+            "bands": bands
+        }, returning="minimal"))
+    owner_id = project.get("owner_id")
+    publish_event(owner_id, APPLICANT_CREATED, {
+        "id": applicant["id"],
+        "project_id": x_project_id,
+        "name": name,
+        "status": applicant.get("status"),
+        "created_at": applicant.get("created_at")
+    })
+    if not duplicate and hold_reason is None:
+        schedule_scoring(applicant["id"], name, email, cv_text, owner_id)
     return applicant
 
-@router.post("/applicants/{applicant_id}/convert", response_model=dict)
-def convert_to_employee(applicant_id: str, user_id: str = Depends(get_current_user)):
+async def find_near_duplicate(data: RequestData, project_id: str, signature: Optional[List[int]], bands: Optional[List[int]]) -> Optional[tuple]:
     """
-    Manually convert an approved applicant to an active employee.
-    HARIS Philosophy: Human-in-the-loop Final Action.
+    The project's most similar scored applicant at or above NEAR_DUPLICATE_THRESHOLD,
+    as (cv_signatures row, estimated similarity). One query: LSH candidates
+    sharing a band key (GIN index), then exact signature comparison here.
     """
-    # 1. Fetch Applicant
-    app_res = supabase.table("applicants").select("*").eq("id", applicant_id).execute()
-    if not app_res.data:
+    if not bands or NEAR_DUPLICATE_THRESHOLD > 1:
+        return None
+    res = await data.execute(data.db.table("cv_signatures")\
+        .select("applicant_id, signature, applicants!inner(ai_score, ai_reasoning, deleted_at)")\
+        .eq("project_id", project_id)\
+        .ov("bands", bands)\
+        .eq("applicants.deleted_at", EPOCH_SENTINEL)\
+        .not_.is_("applicants.ai_score", "null")\
+        .limit(NEAR_DUPLICATE_MAX_CANDIDATES))
+    return best_match(signature, res.data or [])
+
+async def check_llm_gate(data: RequestData, project: dict, relevance: Optional[int]) -> Optional[str]:
+    """Apply the project's optional LLM gates. Returns why the application is held back, or None."""
+    higher_ranked = None
+    if relevance is not None and project.get("llm_top_n"):
+        res = await data.execute(data.db.table("applicants")\
+            .select("id", count="exact", head=True)\
+            .eq("project_id", project["id"])\
+            .eq("deleted_at", EPOCH_SENTINEL)\
+            .gt("relevance_score", relevance))
+        higher_ranked = res.count or 0
+    return llm_gate(project, relevance, higher_ranked)
+
+@router.post("/applicants/{applicant_id}/score")
+async def score_applicant(applicant_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    """Send an applicant to AI scoring now: held back by the project's LLM gates, or scoring failed."""
+    applicant = await data.applicants.load(applicant_id)
+    if not applicant:
         raise HTTPException(status_code=404, detail="Applicant not found")
-    
-    applicant = app_res.data[0]
-    
-    # 2. Verify Status
-    if applicant["status"] != "approved":
-        raise HTTPException(status_code=400, detail="Only approved applicants can be converted to employees")
-        
-    # 3. Check if already exists in employees (by email)
-    emp_check = supabase.table("employees").select("id").eq("email", applicant["email"]).execute()
-    if emp_check.data:
-        raise HTTPException(status_code=400, detail="Employee with this email already exists")
-
-    # 4. Create Employee Record
-    new_employee = {
-        "name": applicant["name"],
-        "email": applicant["email"],
-        "role": "New Hire (Junior)", # Default role, can be updated later
-        "department": "Unassigned",
-        "leave_remaining": 12, # Policy Default
-        "status": "active",
-        "join_date": datetime.datetime.now().date().isoformat()
-    }
-    
-    res = supabase.table("employees").insert(new_employee).execute()
-    
+    if not is_owned_project(await data.projects.load(applicant["project_id"]), user_id):
+        raise HTTPException(status_code=403, detail="Not authorized")
+    if applicant.get("status") != "processing":
+        raise HTTPException(status_code=409, detail="Applicant already has a decision")
+    if applicant.get("duplicate_of"):
+        raise HTTPException(status_code=409, detail="Applicant shares the score of a near-duplicate CV")
+
+    cv_text = await run_in_threadpool(get_cv_store().get, applicant["cv_hash"]) if applicant.get("cv_hash") else None
+    if not cv_text:
+        raise HTTPException(status_code=404, detail="CV content not found")
+    schedule_scoring(applicant_id, applicant["name"], applicant["email"], cv_text, user_id)
+    return {"status": "queued", "id": applicant_id}
+
+# --- Hiring ---
+# hire_applicant RPC errors (see migrations/add_hire_applicant_rpc.sql) -> HTTP status
+HIRE_ERRORS = {
+    "applicant_not_found": (404, "Applicant not found"),
+    "not_authorized": (403, "Not authorized"),
+    "invalid_status": (400, None),  # detail depends on the workflow
+    "employee_exists": (400, "Employee with this email already exists"),
+}
+
+async def hire_applicant(data: RequestData, applicant_id: str, user_id: str, required_status: str, status_detail: str, employee: dict, restore_deleted: bool) -> dict:
+    """
+    Run the whole hire workflow in one transaction (one round trip).
+    The function locks the applicant row, so double submissions cannot hire twice.
+    """
+    try:
+        res = await data.execute(data.db.rpc("hire_applicant", {
+            "p_applicant_id": applicant_id,
+            "p_owner_id": user_id,
+            "p_required_status": required_status,
+            "p_restore_deleted": restore_deleted,
+            **{f"p_{k}": v for k, v in employee.items()}
+        }))
+    except APIError as e:
+        if e.message not in HIRE_ERRORS:
+            print(f"hire_applicant failed: {e}")
+            raise HTTPException(status_code=500, detail="Failed to create employee record")
+        status_code, detail = HIRE_ERRORS[e.message]
+        raise HTTPException(status_code=status_code, detail=detail or status_detail)
+    finally:
+        data.applicants.clear(applicant_id)
+
     if not res.data:
          raise HTTPException(status_code=500, detail="Failed to create employee record")
-         
-    # 5. Update Applicant Status to 'hired' to prevent double conversion
-    supabase.table("applicants").update({"status": "hired"}).eq("id", applicant_id).execute()
-    
-    return {"status": "success", "message": "Candidate successfully hired", "employee_id": res.data[0]["id"]}
+    publish_event(user_id, APPLICANT_STATUS_CHANGED, {"ids": [applicant_id], "status": "hired"})
+    return res.data
+
+@router.post("/applicants/{applicant_id}/convert", response_model=dict)
+async def convert_to_employee(applicant_id: str, user_id: str = Depends(get_current_user), data: RequestData = Depends(get_request_data)):
+    """
+    Manually convert an approved applicant to an active employee.
+    HARIS Philosophy: Human-in-the-loop Final Action.
+    """
+    employee = await hire_applicant(
+        data, applicant_id, user_id,
+        required_status="approved",
+        status_detail="Only approved applicants can be converted to employees",
+        employee={
+            "role": "New Hire (Junior)", # Default role, can be updated later
+            "department": "Unassigned",
+            "leave_remaining": 12, # Policy Default
+            "join_date": datetime.datetime.now().date().isoformat()
+        },
+        restore_deleted=False
+    )
+    return {"status": "success", "message": "Candidate successfully hired", "employee_id": employee["id"], "employee": employee}
 
 @router.post("/applicants/{applicant_id}/verify")
-def verify_and_convert_applicant(
+async def verify_and_convert_applicant(
     applicant_id: str,
     request: VerifyApplicantRequest,
-    user_id: str = Depends(get_current_user)
+    user_id: str = Depends(get_current_user),
+    data: RequestData = Depends(get_request_data)
 ):
     """
     Verification stage: HR fills complete employee data before final conversion.
     This is the final manual step before creating an employee record.
+    A soft-deleted employee with the same email is restored instead of duplicated.
     """
-    # 1. Fetch Applicant
-    app_res = supabase.table("applicants").select("*").eq("id", applicant_id).execute()
-    if not app_res.data:
-        raise HTTPException(status_code=404, detail="Applicant not found")
-    
-    applicant = app_res.data[0]
-    
-    # 2. Verify Status (must be interview_approved)
-    if applicant["status"] != "interview_approved":
-        raise HTTPException(status_code=400, detail="Only interview-approved applicants can be verified")
-        
-    # 3. Check for existing employee with this email (including deleted)
-    existing_emp_res = supabase.table("employees").select("*").eq("email", applicant["email"]).execute()
-    
-    existing_emp = existing_emp_res.data[0] if existing_emp_res.data else None
-    
-    if existing_emp:
-        # If active, prevent duplicate
-        if existing_emp["deleted_at"] == EPOCH_SENTINEL:
-             raise HTTPException(status_code=400, detail="Employee with this email already exists")
-        
-        # If soft-deleted, RESTORE it (Update)
-        res = supabase.table("employees").update({
-            "name": applicant["name"],
-            "role": request.role,
-            "department": request.department,
-            "leave_remaining": request.leave_remaining,
-            "status": "active",
-            "join_date": request.join_date,
-            "deleted_at": EPOCH_SENTINEL  # Restore!
-        }).eq("id", existing_emp["id"]).execute()
-        
-    else:
-        # 4. Create NEW Employee Record
-        new_employee = {
-            "name": applicant["name"],
-            "email": applicant["email"],
+    employee = await hire_applicant(
+        data, applicant_id, user_id,
+        required_status="interview_approved",
+        status_detail="Only interview-approved applicants can be verified",
+        employee={
             "role": request.role,
             "department": request.department,
             "leave_remaining": request.leave_remaining,
-            "status": "active",
             "join_date": request.join_date
-        }
-        res = supabase.table("employees").insert(new_employee).execute()
-    
-    if not res.data:
-         raise HTTPException(status_code=500, detail="Failed to create employee record")
-         
-    # 5. Update Applicant Status to 'hired' to prevent double conversion
-    supabase.table("applicants").update({"status": "hired"}).eq("id", applicant_id).execute()
-    
-    return {"status": "success", "message": "Candidate verified and hired", "employee_id": res.data[0]["id"]}
+        },
+        restore_deleted=True
+    )
+    return {"status": "success", "message": "Candidate verified and hired", "employee_id": employee["id"], "employee": employee}
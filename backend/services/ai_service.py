@@ -1,13 +1,106 @@
-from database import supabase
+"""
+AI Scoring Service
+Scores applicants in the background. When the LLM is unavailable the
+applicant is not scored 0: it goes to a retry state (scoring_status='retry')
+and a background worker tries again with backoff, see
+migrations/add_llm_fallbacks.sql.
+"""
+
+import asyncio
+import datetime
+import random
+from typing import List, Optional
+from database import get_supabase
 from agent import score_candidate
+from llm_gateway import LLMError
+from services.cv_store import get_cv_store
+from services.events import publish_event, APPLICANT_SCORED
+
+# Configuration
+SCORING_MAX_ATTEMPTS = 6
+SCORING_BACKOFF_BASE = 60  # seconds, doubled per attempt
+SCORING_BACKOFF_MAX = 3600  # seconds
+SCORING_RETRY_BATCH = 10
+SCORING_POLL_INTERVAL = 30.0  # seconds between retry scans
+
+RETRY_REASONING = "AI scoring is temporarily unavailable. It will be retried automatically."
+FAILED_REASONING = "AI scoring failed after several attempts. Use Score to try again."
+
 
-def process_ai_score(applicant_id: str, name: str, email: str, cv_text: str):
+def retry_delay(attempts: int) -> float:
+    """Backoff before retry number `attempts` (1-based), with jitter."""
+    delay = min(SCORING_BACKOFF_MAX, SCORING_BACKOFF_BASE * 2 ** (attempts - 1))
+    return delay * random.uniform(0.8, 1.2)
+
+
+def process_ai_score(applicant_id: str, name: str, email: str, cv_text: str, owner_id: Optional[str] = None, attempts: int = 0):
     """Background task to score candidates using AI Agent."""
-    result = score_candidate(name, email, cv_text)
-    
-    # Update score and reasoning
-    supabase.table("applicants").update({
+    try:
+        result = score_candidate(name, email, cv_text)
+    except LLMError as e:
+        schedule_retry(applicant_id, attempts + 1, str(e))
+        return
+
+    # Update score and reasoning only: a late retry must not undo HR's decision.
+    # A later failure starts a fresh backoff budget.
+    res = get_supabase().table("applicants").update({
         "ai_score": result["score"],
         "ai_reasoning": result["reasoning"],
-        "status": "processing"
+        "scoring_status": None,
+        "scoring_attempts": 0,
+        "next_scoring_at": None
     }).eq("id", applicant_id).execute()
+
+    # Push the score to the organization's dashboard stream
+    if res.data:
+        row = res.data[0]
+        publish_event(owner_id, APPLICANT_SCORED, {
+            "id": applicant_id,
+            "project_id": row.get("project_id"),
+            "ai_score": row.get("ai_score"),
+            "status": row.get("status")
+        })
+
+
+def schedule_retry(applicant_id: str, attempts: int, error: str) -> None:
+    """Leave the applicant unscored and queue another attempt (or give up after SCORING_MAX_ATTEMPTS)."""
+    print(f"AI scoring failed for {applicant_id} (attempt {attempts}): {error}")
+    update = {"scoring_attempts": attempts}
+    if attempts >= SCORING_MAX_ATTEMPTS:
+        update.update({"scoring_status": "failed", "next_scoring_at": None, "ai_reasoning": FAILED_REASONING})
+    else:
+        due = datetime.datetime.now(datetime.timezone.utc) + datetime.timedelta(seconds=retry_delay(attempts))
+        update.update({"scoring_status": "retry", "next_scoring_at": due.isoformat(), "ai_reasoning": RETRY_REASONING})
+    get_supabase().table("applicants").update(update, returning="minimal").eq("id", applicant_id).execute()
+
+
+def claim_retries(batch_size: int = SCORING_RETRY_BATCH) -> List[dict]:
+    """Lease due retries (FOR UPDATE SKIP LOCKED), so several workers can run safely."""
+    res = get_supabase().rpc("claim_scoring_retries", {"batch_size": batch_size}).execute()
+    return res.data or []
+
+
+def retry_due(batch_size: int = SCORING_RETRY_BATCH) -> int:
+    """Re-score one batch of due applicants. Returns the number of rows processed."""
+    rows = claim_retries(batch_size)
+    for row in rows:
+        cv_text = get_cv_store().get(row["cv_hash"]) if row.get("cv_hash") else None
+        if not cv_text:
+            schedule_retry(row["id"], SCORING_MAX_ATTEMPTS, "CV content not found")
+            continue
+        process_ai_score(row["id"], row["name"], row["email"], cv_text, row.get("owner_id"), row.get("scoring_attempts", 0))
+    return len(rows)
+
+
+async def run_scoring_retries(poll_interval: float = SCORING_POLL_INTERVAL) -> None:
+    """Background loop: drain due scoring retries, then poll. Started from the app lifespan."""
+    while True:
+        try:
+            processed = await asyncio.to_thread(retry_due)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Scoring retry scan failed: {e}")
+            processed = 0
+        if processed < SCORING_RETRY_BATCH:
+            await asyncio.sleep(poll_interval)
@@ -0,0 +1,135 @@
+"""
+CV Content Store
+Keeps extracted CV text out of the applicants row.
+Content is compressed and keyed by cv_hash, so identical CVs across projects are stored once.
+"""
+
+import os
+import tempfile
+import zlib
+from typing import Dict, List, Optional, Tuple
+from database import get_supabase
+
+try:
+    import zstandard
+except ImportError:  # zlib fallback keeps the store usable without the extra wheel
+    zstandard = None
+
+# Configuration
+CV_STORE_BACKEND = os.getenv("CV_STORE_BACKEND", "supabase")  # "supabase" or "local"
+CV_STORE_DIR = os.getenv("CV_STORE_DIR", "cv_store")
+ZSTD_LEVEL = 10
+ZLIB_LEVEL = 6
+
+
+def compress_text(text: str) -> Tuple[str, bytes]:
+    """Compress CV text. Returns (codec, payload)."""
+    raw = text.encode("utf-8")
+    if zstandard is not None:
+        return "zstd", zstandard.ZstdCompressor(level=ZSTD_LEVEL).compress(raw)
+    return "zlib", zlib.compress(raw, ZLIB_LEVEL)
+
+
+def decompress_text(codec: str, payload: bytes) -> str:
+    """Inverse of compress_text. 'none' is used for rows backfilled by SQL."""
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("zstandard is required to read zstd-compressed CVs")
+        return zstandard.ZstdDecompressor().decompress(payload).decode("utf-8")
+    if codec == "zlib":
+        return zlib.decompress(payload).decode("utf-8")
+    if codec == "none":
+        return payload.decode("utf-8")
+    raise ValueError(f"Unknown CV codec: {codec}")
+
+
+def decode_row(row: dict) -> str:
+    """CV text of a cv_contents row as PostgREST returns it (codec, body as bytea hex)."""
+    body = row["body"]
+    payload = bytes.fromhex(body[2:]) if body.startswith("\\x") else body.encode("utf-8")
+    return decompress_text(row["codec"], payload)
+
+
+class LocalCVStore:
+    """Filesystem backend: one compressed file per hash, fanned out by prefix."""
+
+    def __init__(self, base_dir: str = CV_STORE_DIR):
+        self.base_dir = base_dir
+
+    def _path(self, cv_hash: str, codec: str) -> str:
+        return os.path.join(self.base_dir, cv_hash[:2], f"{cv_hash}.{codec}")
+
+    def _find(self, cv_hash: str) -> Optional[Tuple[str, str]]:
+        for codec in ("zstd", "zlib", "none"):
+            path = self._path(cv_hash, codec)
+            if os.path.exists(path):
+                return codec, path
+        return None
+
+    def put(self, cv_hash: str, text: str) -> None:
+        if self._find(cv_hash):
+            return
+        codec, payload = compress_text(text)
+        path = self._path(cv_hash, codec)
+        os.makedirs(os.path.dirname(path), exist_ok=True)
+        # Write-then-rename so concurrent readers never see a partial file. Each
+        # writer gets its own temp file: two uploads of one CV may race here.
+        fd, tmp_path = tempfile.mkstemp(dir=os.path.dirname(path), suffix=".tmp")
+        try:
+            with os.fdopen(fd, "wb") as f:
+                f.write(payload)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
+
+    def get(self, cv_hash: str) -> Optional[str]:
+        found = self._find(cv_hash)
+        if not found:
+            return None
+        codec, path = found
+        with open(path, "rb") as f:
+            return decompress_text(codec, f.read())
+
+    def get_many(self, cv_hashes: List[str]) -> Dict[str, str]:
+        found = {cv_hash: self.get(cv_hash) for cv_hash in set(cv_hashes)}
+        return {cv_hash: text for cv_hash, text in found.items() if text is not None}
+
+
+class SupabaseCVStore:
+    """Database backend: the cv_contents table (see migrations/add_cv_contents.sql)."""
+
+    TABLE = "cv_contents"
+
+    def put(self, cv_hash: str, text: str) -> None:
+        codec, payload = compress_text(text)
+        get_supabase().table(self.TABLE).upsert({
+            "cv_hash": cv_hash,
+            "codec": codec,
+            "body": "\\x" + payload.hex(),  # bytea hex input format
+            "original_size": len(text)
+        }, on_conflict="cv_hash", ignore_duplicates=True).execute()
+
+    def get(self, cv_hash: str) -> Optional[str]:
+        res = get_supabase().table(self.TABLE).select("codec, body").eq("cv_hash", cv_hash).execute()
+        if not res.data:
+            return None
+        return decode_row(res.data[0])
+
+    def get_many(self, cv_hashes: List[str]) -> Dict[str, str]:
+        """Several CVs in one query (a search results page)."""
+        if not cv_hashes:
+            return {}
+        res = get_supabase().table(self.TABLE).select("cv_hash, codec, body").in_("cv_hash", list(set(cv_hashes))).execute()
+        return {row["cv_hash"]: decode_row(row) for row in res.data or []}
+
+
+_store = None
+
+
+def get_cv_store():
+    """Return the configured CV store (created on first use)."""
+    global _store
+    if _store is None:
+        _store = LocalCVStore() if CV_STORE_BACKEND == "local" else SupabaseCVStore()
+    return _store
@@ -0,0 +1,144 @@
+"""
+Email Outbox
+Notification emails are written to the email_outbox table and delivered by a
+background dispatcher, so HR actions never wait on the mail provider. Decision
+emails are queued by the decide_applicants RPC in the same transaction as the
+status change (see migrations/add_decision_rpc.sql), keyed per transition.
+
+Delivery is at-least-once with Resend idempotency keys to suppress duplicates:
+first attempts go out through the batch API, retries go out one by one with
+the row's own key (a retried batch might not contain the same rows).
+"""
+
+import asyncio
+import datetime
+import hashlib
+import random
+from typing import Dict, List, Optional
+
+from database import get_supabase
+from email_service import RESEND_API_KEY, get_resend
+
+# Configuration
+OUTBOX_TABLE = "email_outbox"
+OUTBOX_BATCH_SIZE = 100  # Resend batch API maximum
+OUTBOX_POLL_INTERVAL = 2.0  # seconds between polls when idle
+OUTBOX_MAX_ATTEMPTS = 6
+OUTBOX_BACKOFF_BASE = 5  # seconds, doubled per attempt
+OUTBOX_BACKOFF_MAX = 900  # seconds
+
+
+def outbox_message(message: dict) -> dict:
+    """Outbox columns for an email built by email_service (no idempotency key)."""
+    return {
+        "to_email": message["to"],
+        "from_email": message["from"],
+        "subject": message["subject"],
+        "html": message["html"],
+    }
+
+
+def retry_delay(attempts: int) -> float:
+    """Exponential backoff with full jitter."""
+    cap = min(OUTBOX_BACKOFF_MAX, OUTBOX_BACKOFF_BASE * (2 ** attempts))
+    return random.uniform(cap / 2, cap)
+
+
+def _params(row: dict) -> dict:
+    return {
+        "from": row["from_email"],
+        "to": row["to_email"],
+        "subject": row["subject"],
+        "html": row["html"]
+    }
+
+
+def deliver(rows: List[dict]) -> Dict[str, Optional[str]]:
+    """
+    Send outbox rows through Resend.
+    Returns {row id: None on success, error message on failure}.
+    """
+    results: Dict[str, Optional[str]] = {}
+    if not RESEND_API_KEY:
+        for row in rows:
+            print(f"[MOCK EMAIL] To: {row['to_email']}, Subject: {row['subject']} (No API Key)")
+            results[row["id"]] = None
+        return results
+
+    resend = get_resend()
+    fresh = [r for r in rows if r.get("attempts", 0) == 0]
+    retries = [r for r in rows if r.get("attempts", 0) > 0]
+
+    if fresh:
+        batch_key = "batch:" + hashlib.sha256(
+            ",".join(sorted(r["idempotency_key"] for r in fresh)).encode()
+        ).hexdigest()
+        try:
+            resend.Batch.send([_params(r) for r in fresh], {"idempotency_key": batch_key})
+            for row in fresh:
+                results[row["id"]] = None
+        except Exception as e:
+            for row in fresh:
+                results[row["id"]] = str(e)
+
+    for row in retries:
+        try:
+            resend.Emails.send(_params(row), {"idempotency_key": row["idempotency_key"]})
+            results[row["id"]] = None
+        except Exception as e:
+            results[row["id"]] = str(e)
+
+    return results
+
+
+def claim_pending(batch_size: int = OUTBOX_BATCH_SIZE) -> List[dict]:
+    """Lease due rows (FOR UPDATE SKIP LOCKED), so several dispatchers can run safely."""
+    res = get_supabase().rpc("claim_email_outbox", {"batch_size": batch_size}).execute()
+    return res.data or []
+
+
+def record_results(rows: List[dict], results: Dict[str, Optional[str]]) -> None:
+    now = datetime.datetime.now(datetime.timezone.utc)
+    sent_ids = [row_id for row_id, error in results.items() if error is None]
+    if sent_ids:
+        get_supabase().table(OUTBOX_TABLE).update({
+            "status": "sent",
+            "sent_at": now.isoformat(),
+            "last_error": None
+        }).in_("id", sent_ids).execute()
+
+    for row in rows:
+        error = results.get(row["id"])
+        if error is None:
+            continue
+        attempts = row.get("attempts", 0) + 1
+        update = {"attempts": attempts, "last_error": error[:1000]}
+        if attempts >= OUTBOX_MAX_ATTEMPTS:
+            update["status"] = "failed"
+        else:
+            update["status"] = "pending"
+            update["next_attempt_at"] = (now + datetime.timedelta(seconds=retry_delay(attempts))).isoformat()
+        get_supabase().table(OUTBOX_TABLE).update(update).eq("id", row["id"]).execute()
+
+
+def dispatch_pending(batch_size: int = OUTBOX_BATCH_SIZE) -> int:
+    """Deliver one batch of due emails. Returns the number of rows processed."""
+    rows = claim_pending(batch_size)
+    if not rows:
+        return 0
+    record_results(rows, deliver(rows))
+    return len(rows)
+
+
+async def run_dispatcher(poll_interval: float = OUTBOX_POLL_INTERVAL) -> None:
+    """Background loop: drain the outbox, then poll. Started from the app lifespan."""
+    while True:
+        try:
+            processed = await asyncio.to_thread(dispatch_pending)
+        except asyncio.CancelledError:
+            raise
+        except Exception as e:
+            print(f"Email outbox dispatch failed: {e}")
+            processed = 0
+        if processed < OUTBOX_BATCH_SIZE:
+            await asyncio.sleep(poll_interval)
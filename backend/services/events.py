@@ -0,0 +1,207 @@
+"""
+Recruitment Event Stream
+In-process pub/sub for applicant events, served to the dashboard as
+server-sent events so it no longer polls the applicant listings.
+
+Publishers (the /apply handler, the AI scoring worker, the decision
+endpoints) call publish_event(); it is thread-safe, since the scoring worker
+runs in the threadpool. Each channel (one per organization, named by the
+owner id: 1 HR = 1 Org) keeps a short replay buffer, so a client that
+reconnects with Last-Event-ID receives what it missed. If the events it
+missed are no longer buffered, or it was connected to an earlier process,
+it receives a `reset` event and should refetch. Buffers of organizations
+that have gone quiet are dropped (EVENT_CHANNEL_TTL, EVENT_MAX_CHANNELS), so
+memory stays bounded however many organizations publish.
+
+Events are only seen by clients connected to the same process: with several
+workers, route a user's stream and writes to one worker or use one worker.
+"""
+
+import asyncio
+import json
+import os
+import threading
+import time
+import uuid
+from collections import OrderedDict, deque
+from dataclasses import dataclass
+from typing import AsyncIterator, Deque, Dict, List, Optional, Set, Tuple
+
+# Configuration
+EVENT_BUFFER_SIZE = int(os.getenv("EVENT_BUFFER_SIZE", "500"))  # replayable events per channel
+EVENT_CHANNEL_TTL = float(os.getenv("EVENT_CHANNEL_TTL", "3600"))  # seconds without events before a buffer is dropped
+EVENT_MAX_CHANNELS = int(os.getenv("EVENT_MAX_CHANNELS", "1000"))  # buffers kept; the longest idle go first
+EVENT_QUEUE_SIZE = 1000  # undelivered events per client before it is disconnected (it resumes via Last-Event-ID)
+EVENT_HEARTBEAT = 15  # seconds between keep-alive comments on an idle stream
+EVENT_RETRY_MS = 3000  # client reconnect delay
+
+# Event types
+APPLICANT_CREATED = "applicant.created"
+APPLICANT_SCORED = "applicant.scored"
+APPLICANT_STATUS_CHANGED = "applicant.status_changed"
+APPLICANT_DELETED = "applicant.deleted"
+RESET = "reset"
+
+
+@dataclass(frozen=True)
+class Event:
+    id: str
+    seq: int
+    type: str
+    data: dict
+
+    def encode(self) -> str:
+        return f"id: {self.id}\nevent: {self.type}\ndata: {json.dumps(self.data, default=str)}\n\n"
+
+
+class Subscription:
+    """One connected client: an asyncio queue fed from any thread."""
+
+    def __init__(self, channel: str, loop: asyncio.AbstractEventLoop):
+        self.channel = channel
+        self.loop = loop
+        self.queue: asyncio.Queue = asyncio.Queue()
+        self.lagged = False
+
+    def deliver(self, event: Event) -> None:
+        try:
+            self.loop.call_soon_threadsafe(self._put, event)
+        except RuntimeError:
+            pass  # loop closed: the client is gone
+
+    def _put(self, event: Event) -> None:
+        if self.lagged:
+            return
+        if self.queue.qsize() >= EVENT_QUEUE_SIZE:
+            # Too slow to keep up: end the stream, the client resumes from the buffer
+            self.lagged = True
+            self.queue.put_nowait(None)
+            return
+        self.queue.put_nowait(event)
+
+
+class EventBroker:
+    """Per-channel fan-out with bounded replay buffers, dropped once idle."""
+
+    def __init__(self, buffer_size: int = EVENT_BUFFER_SIZE, channel_ttl: float = EVENT_CHANNEL_TTL,
+                 max_channels: int = EVENT_MAX_CHANNELS):
+        self.buffer_size = buffer_size
+        self.channel_ttl = channel_ttl
+        self.max_channels = max_channels
+        self._lock = threading.Lock()
+        self._epoch = uuid.uuid4().hex[:8]  # ids from another process cannot be resumed
+        self._seq = 0
+        # channel -> (last publish, buffer), least recently published first
+        self._history: "OrderedDict[str, Tuple[float, Deque[Event]]]" = OrderedDict()
+        self._evicted: Dict[str, int] = {}  # channel -> seq of the newest event dropped from the buffer
+        self._dropped_seq = 0  # newest seq when a whole buffer was last dropped
+        self._subscribers: Dict[str, Set[Subscription]] = {}
+
+    def publish(self, channel: str, event_type: str, data: dict) -> Event:
+        with self._lock:
+            self._seq += 1
+            event = Event(f"{self._epoch}-{self._seq}", self._seq, event_type, data)
+            now = time.monotonic()
+            _, history = self._history.pop(channel, (now, deque()))  # re-inserted last: most recent
+            if len(history) >= self.buffer_size:
+                self._evicted[channel] = history.popleft().seq
+            history.append(event)
+            self._history[channel] = (now, history)
+            self._drop_idle(now)
+            subscribers = list(self._subscribers.get(channel, ()))
+        for subscription in subscribers:
+            subscription.deliver(event)
+        return event
+
+    def subscribe(self, channel: str, last_event_id: Optional[str] = None) -> Tuple[Subscription, List[Event]]:
+        """
+        Register a client. Returns the subscription and the events to send
+        first: missed events after `last_event_id`, or a reset if they are gone.
+        """
+        subscription = Subscription(channel, asyncio.get_running_loop())
+        with self._lock:
+            # Registered and replayed under one lock: no event is missed or sent twice
+            self._subscribers.setdefault(channel, set()).add(subscription)
+            backlog = self._replay(channel, last_event_id) if last_event_id else []
+        return subscription, backlog
+
+    def unsubscribe(self, subscription: Subscription) -> None:
+        with self._lock:
+            subscribers = self._subscribers.get(subscription.channel)
+            if subscribers:
+                subscribers.discard(subscription)
+                if not subscribers:
+                    del self._subscribers[subscription.channel]
+
+    def subscriber_count(self, channel: str) -> int:
+        with self._lock:
+            return len(self._subscribers.get(channel, ()))
+
+    def channel_count(self) -> int:
+        with self._lock:
+            return len(self._history)
+
+    def _drop_idle(self, now: float) -> None:
+        """Drop the buffers of channels idle past the TTL, and the longest idle over the cap."""
+        while self._history:
+            channel, (published, history) = next(iter(self._history.items()))
+            if len(self._history) <= self.max_channels and now - published < self.channel_ttl:
+                return
+            del self._history[channel]
+            self._evicted.pop(channel, None)
+            self._dropped_seq = self._seq
+
+    def _replay(self, channel: str, last_event_id: str) -> List[Event]:
+        epoch, _, seq = last_event_id.partition("-")
+        if epoch != self._epoch or not seq.isdigit():
+            return [self._reset()]
+        seq = int(seq)
+        if channel not in self._history:
+            # Never published, or its buffer was dropped: only the former is safe to resume
+            return [self._reset()] if seq < self._dropped_seq else []
+        _, history = self._history[channel]
+        if seq < self._evicted.get(channel, 0):
+            return [self._reset()]
+        return [event for event in history if event.seq > seq]
+
+    def _reset(self) -> Event:
+        # Carries the current position, so the client resumes from here after refetching
+        return Event(f"{self._epoch}-{self._seq}", self._seq, RESET, {})
+
+
+event_broker = EventBroker()
+
+
+def publish_event(owner_id: Optional[str], event_type: str, data: dict) -> None:
+    """Publish to an organization's stream. Never raises: events are best-effort."""
+    if not owner_id:
+        return
+    try:
+        event_broker.publish(owner_id, event_type, data)
+    except Exception as e:
+        print(f"Failed to publish {event_type}: {e}")
+
+
+async def event_stream(channel: str, last_event_id: Optional[str] = None,
+                       heartbeat: float = EVENT_HEARTBEAT) -> AsyncIterator[str]:
+    """
+    SSE body: replayed events, then live events with keep-alive comments.
+    The client is subscribed once the response starts streaming and always
+    unsubscribed when it ends, so a client gone before then leaves nothing behind.
+    """
+    subscription, backlog = event_broker.subscribe(channel, last_event_id)
+    try:
+        yield f"retry: {EVENT_RETRY_MS}\n\n"
+        for event in backlog:
+            yield event.encode()
+        while True:
+            try:
+                event = await asyncio.wait_for(subscription.queue.get(), timeout=heartbeat)
+            except asyncio.TimeoutError:
+                yield ": keep-alive\n\n"
+                continue
+            if event is None:
+                return
+            yield event.encode()
+    finally:
+        event_broker.unsubscribe(subscription)
@@ -1,25 +1,31 @@
+import math
 import os
-from typing import List, Dict
-from pypdf import PdfReader
-from langchain_groq import ChatGroq
-from langchain_core.prompts import ChatPromptTemplate
-from database import supabase
-
-# Initialize LLM
-llm = ChatGroq(
-    temperature=0,
-    model_name="llama-3.1-8b-instant",
-    api_key=os.environ.get("GROQ_API_KEY")
-)
+import re
+from collections import Counter
+from typing import List, Dict, Optional
+from database import get_supabase
+from llm_gateway import LLMError, get_llm_gateway
 
 POLICY_DIR = "policies"
 
+# Fallbacks when the LLM is unavailable (see migrations/add_llm_fallbacks.sql)
+STALE_MIN_SIMILARITY = 0.4  # trigram similarity between the questions
+POLICY_CHUNK_CHARS = 600
+POLICY_FALLBACK_CHUNKS = 2
+
+_TERM_RE = re.compile(r"[a-z0-9]{3,}")
+_FALLBACK_STOPWORDS = frozenset(
+    "the and for are can how what when where which with this that you your from have will "
+    "yang dan untuk dengan apa bagaimana berapa kapan saya bisa boleh ini itu dari pada akan ada".split()
+)
+
 def extract_text_from_policies() -> str:
     """Read all PDFs in the policies folder and combine text."""
     combined_text = ""
     if not os.path.exists(POLICY_DIR):
         return ""
-        
+    from pypdf import PdfReader  # deferred: only needed when policies are read
+
     for filename in os.listdir(POLICY_DIR):
         if filename.endswith(".pdf"):
             try:
@@ -31,6 +37,112 @@ def extract_text_from_policies() -> str:
                 print(f"Error reading {filename}: {e}")
     return combined_text
 
+def policy_chunks(policy_text: str) -> List[str]:
+    """Consecutive lines grouped into chunks of about POLICY_CHUNK_CHARS."""
+    chunks, current = [], ""
+    for line in policy_text.splitlines():
+        line = line.strip()
+        if not line:
+            continue
+        current = f"{current} {line}" if current else line
+        if len(current) >= POLICY_CHUNK_CHARS:
+            chunks.append(current)
+            current = ""
+    if current:
+        chunks.append(current)
+    return chunks
+
+
+def _terms(text: str) -> set:
+    return {t for t in _TERM_RE.findall(text.lower()) if t not in _FALLBACK_STOPWORDS}
+
+
+def top_policy_chunks(query: str, policy_text: str, limit: int = POLICY_FALLBACK_CHUNKS) -> List[str]:
+    """Policy chunks sharing the most (IDF-weighted) terms with the question."""
+    chunks = policy_chunks(policy_text)
+    chunk_terms = [_terms(chunk) for chunk in chunks]
+    df = Counter(term for terms in chunk_terms for term in terms)
+    query_terms = _terms(query)
+
+    scored = []
+    for i, terms in enumerate(chunk_terms):
+        score = sum(math.log(1 + len(chunks) / df[t]) for t in query_terms & terms)
+        if score > 0:
+            scored.append((score, i))
+    return [chunks[i] for _, i in sorted(scored, key=lambda item: (-item[0], item[1]))[:limit]]
+
+
+def find_stale_answer(user_id: str, query: str, employee_id: Optional[str] = None) -> Optional[Dict]:
+    """
+    The most similar earlier LLM answer (similar_policy_answer RPC), or None.
+    Answers that used employee data only match the same user and employee.
+    """
+    try:
+        res = get_supabase().rpc("similar_policy_answer", {
+            "p_user_id": user_id,
+            "p_query": query,
+            "p_employee_id": employee_id,
+            "p_min_similarity": STALE_MIN_SIMILARITY
+        }).execute()
+    except Exception as e:  # the fallback must not fail: quote the policy instead
+        print(f"Stale policy answer lookup failed: {e}")
+        return None
+    return res.data[0] if res.data else None
+
+
+def fallback_answer(user_id: str, query: str, policy_text: str, employee_id: Optional[str] = None) -> Dict:
+    """
+    Answer while the LLM is unavailable: the most similar earlier answer,
+    marked stale, or else the most relevant policy passages quoted as-is.
+    """
+    stale = find_stale_answer(user_id, query, employee_id)
+    if stale:
+        answered_on = str(stale["created_at"])[:10]
+        result = {
+            "answer": stale["answer"],
+            "reasoning": stale.get("reasoning"),
+            "source": "stale",
+            "stale": True,
+            "notice": f"HARIS sedang tidak tersedia. Ini jawaban tersimpan ({answered_on}) untuk pertanyaan serupa: \"{stale['query']}\".",
+            "answered_at": stale["created_at"]
+        }
+    else:
+        quotes = top_policy_chunks(query, policy_text)
+        if quotes:
+            answer = "Berikut bagian kebijakan yang paling relevan:\n\n" + "\n\n".join(f"\"{quote}\"" for quote in quotes)
+        else:
+            answer = "Maaf, HARIS sedang mengalami gangguan dan tidak menemukan bagian kebijakan yang relevan."
+        result = {
+            "answer": answer,
+            "reasoning": "Retrieval-only answer: the AI is unavailable, so policy text is quoted without interpretation.",
+            "source": "retrieval",
+            "stale": True,
+            "notice": "HARIS sedang tidak tersedia. Jawaban ini hanya kutipan dokumen kebijakan, belum disesuaikan dengan data Anda."
+        }
+
+    try:
+        log_answer(user_id, query, result)
+    except Exception as e:
+        print(f"Policy log failed: {e}")
+    return result
+
+
+def log_answer(user_id: str, query: str, result: Dict, employee_id: Optional[str] = None) -> None:
+    """
+    Audit log of every answer; only LLM answers are reused as stale answers.
+    employee_id: whose data the answer used (None for general answers).
+    """
+    get_supabase().table("policy_logs").insert({
+        "user_id": user_id,
+        "query": query,
+        "answer": result.get("answer"),
+        "reasoning": result.get("reasoning"),
+        "source": result.get("source", "llm"),
+        "personalized": employee_id is not None,
+        "employee_id": employee_id
+    }).execute()
+
+
 def answer_policy_question(user_id: str, query: str, employee_context: Dict = None) -> Dict:
     """
     RAG-style question answering with Employee Context injection.
@@ -46,6 +158,7 @@ def answer_policy_question(user_id: str, query: str, employee_context: Dict = No
     
     # Context Injection
     emp_info = "Status: Unknown Employee"
+    employee_id = str(employee_context["id"]) if employee_context else None
     if employee_context:
         emp_info = (
             f"Employee Name: {employee_context.get('name')}\n"
@@ -65,20 +178,20 @@ def answer_policy_question(user_id: str, query: str, employee_context: Dict = No
         f"--- POLICY DOCUMENTS ---\n{policy_text}"
     )
     
-    prompt = ChatPromptTemplate.from_messages([
-        ("system", system_prompt),
-        ("user", f"USER QUESTION: {query}")
-    ])
-    
     try:
-        # We use a simple chain here
-        chain = prompt | llm
-        response = chain.invoke({})
-        
+        content = get_llm_gateway().chat("policy_chat", [
+            {"role": "system", "content": system_prompt},
+            {"role": "user", "content": f"USER QUESTION: {query}"}
+        ])
+    except LLMError as e:
+        print(f"Policy AI unavailable, answering from fallback: {e}")
+        return fallback_answer(user_id, query, policy_text, employee_id)
+
+    try:
         # Consistent JSON parsing
         import json
         try:
-            res_content = response.content
+            res_content = content
             # Try to find JSON block if mixed with text
             if "```json" in res_content:
                 res_content = res_content.split("```json")[1].split("```")[0].strip()
@@ -90,15 +203,10 @@ def answer_policy_question(user_id: str, query: str, employee_context: Dict = No
             res_json = json.loads(res_content)
         except:
             # Fallback if LLM outputs plain text
-            res_json = {"answer": response.content, "reasoning": "Direct LLM response"}
+            res_json = {"answer": content, "reasoning": "Direct LLM response"}
             
-        # Log to Supabase
-        supabase.table("policy_logs").insert({
-            "user_id": user_id,
-            "query": query,
-            "answer": res_json.get("answer"),
-            "reasoning": res_json.get("reasoning")
-        }).execute()
+        res_json["source"] = "llm"
+        log_answer(user_id, query, res_json, employee_id)
         
         return res_json
         
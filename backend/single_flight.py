@@ -0,0 +1,41 @@
+"""
+Single-Flight Request Coalescing
+Concurrent calls with the same key share one execution: the first caller
+runs the work, later callers wait for it and get the same result (or the
+same exception). Per process; across workers the database constraint is
+the backstop.
+"""
+
+import asyncio
+from typing import Any, Awaitable, Callable, Dict, Hashable, Tuple
+
+
+class SingleFlight:
+    """
+    In-flight work keyed by e.g. (project_id, cv_hash).
+    Only touched from the event loop, so a plain dict is enough.
+    """
+
+    def __init__(self):
+        self._calls: Dict[Hashable, asyncio.Task] = {}
+
+    async def do(self, key: Hashable, fn: Callable[[], Awaitable[Any]]) -> Tuple[Any, bool]:
+        """
+        Run fn() once for all concurrent callers of `key`.
+        Returns (result, shared): shared is True for callers that joined a running call.
+        The work is shielded, so a caller that disconnects does not cancel it for the others.
+        """
+        task = self._calls.get(key)
+        shared = task is not None
+        if task is None:
+            task = asyncio.ensure_future(fn())
+            self._calls[key] = task
+            task.add_done_callback(lambda _: self._forget(key, task))
+        return await asyncio.shield(task), shared
+
+    def _forget(self, key: Hashable, task: asyncio.Task) -> None:
+        if self._calls.get(key) is task:
+            del self._calls[key]
+
+    def in_flight(self) -> int:
+        return len(self._calls)
@@ -0,0 +1,309 @@
+"""
+CV Profile Extraction Module
+Fills applicants.key_skills and applicants.experience_years at /apply time,
+locally and deterministically, before (and independent of) the LLM score.
+
+Skills are matched with one Aho-Corasick automaton over the whole taxonomy,
+so a CV is scanned once however many aliases there are. Experience is the
+union of the date ranges in the CV (overlapping jobs count once), skipping
+the education section.
+"""
+
+import datetime
+import re
+from collections import deque
+from typing import Dict, Iterator, List, Optional, Tuple
+
+try:
+    import ahocorasick
+except ImportError:  # pure-Python automaton below; same results, slower
+    ahocorasick = None
+
+# Configuration
+MAX_KEY_SKILLS = 15
+MAX_EXPERIENCE_YEARS = 50
+EARLIEST_YEAR = 1960
+
+# Canonical skill -> lowercase aliases. Ambiguous words ("go", "r", "c")
+# are only matched in unambiguous spellings.
+SKILL_TAXONOMY: Dict[str, List[str]] = {
+    # Languages
+    "Python": ["python"],
+    "JavaScript": ["javascript", "js", "ecmascript"],
+    "TypeScript": ["typescript"],
+    "Java": ["java"],
+    "Kotlin": ["kotlin"],
+    "Swift": ["swift"],
+    "Go": ["golang", "go lang"],
+    "Rust": ["rust"],
+    "C++": ["c++", "cpp"],
+    "C#": ["c#", "csharp"],
+    "PHP": ["php"],
+    "Ruby": ["ruby"],
+    "Scala": ["scala"],
+    "Dart": ["dart"],
+    "SQL": ["sql", "t-sql", "pl/sql", "plsql"],
+    "Bash": ["bash", "shell scripting"],
+    # Web & mobile frameworks
+    "React": ["react", "react.js", "reactjs"],
+    "React Native": ["react native"],
+    "Next.js": ["next.js", "nextjs"],
+    "Vue": ["vue", "vue.js", "vuejs"],
+    "Angular": ["angular", "angularjs"],
+    "Node.js": ["node.js", "nodejs", "node js"],
+    "Express": ["express.js", "expressjs"],
+    "Django": ["django"],
+    "Flask": ["flask"],
+    "FastAPI": ["fastapi"],
+    "Spring": ["spring boot", "spring framework"],
+    "Laravel": ["laravel"],
+    ".NET": [".net", "asp.net", "dotnet"],
+    "Flutter": ["flutter"],
+    "Android": ["android"],
+    "iOS": ["ios"],
+    "HTML": ["html", "html5"],
+    "CSS": ["css", "css3", "tailwind", "sass"],
+    "GraphQL": ["graphql"],
+    "REST APIs": ["rest api", "rest apis", "restful"],
+    # Data & ML
+    "PostgreSQL": ["postgresql", "postgres"],
+    "MySQL": ["mysql"],
+    "MongoDB": ["mongodb", "mongo"],
+    "Redis": ["redis"],
+    "Elasticsearch": ["elasticsearch"],
+    "Kafka": ["kafka"],
+    "Spark": ["apache spark", "pyspark"],
+    "Pandas": ["pandas"],
+    "NumPy": ["numpy"],
+    "Machine Learning": ["machine learning", "ml engineer"],
+    "Deep Learning": ["deep learning"],
+    "TensorFlow": ["tensorflow"],
+    "PyTorch": ["pytorch"],
+    "scikit-learn": ["scikit-learn", "sklearn"],
+    "NLP": ["nlp", "natural language processing"],
+    "LLMs": ["llm", "llms", "large language model", "langchain"],
+    "Data Analysis": ["data analysis", "data analytics"],
+    "Power BI": ["power bi", "powerbi"],
+    "Tableau": ["tableau"],
+    "Excel": ["excel", "microsoft excel"],
+    # Cloud & DevOps
+    "AWS": ["aws", "amazon web services"],
+    "GCP": ["gcp", "google cloud"],
+    "Azure": ["azure"],
+    "Docker": ["docker"],
+    "Kubernetes": ["kubernetes", "k8s"],
+    "Terraform": ["terraform"],
+    "CI/CD": ["ci/cd", "github actions", "gitlab ci", "jenkins"],
+    "Linux": ["linux", "ubuntu"],
+    "Git": ["git", "github", "gitlab"],
+    "Supabase": ["supabase"],
+    "Firebase": ["firebase"],
+    # Design & product
+    "Figma": ["figma"],
+    "UI/UX": ["ui/ux", "ux design", "ui design", "user experience"],
+    "Agile": ["agile", "scrum", "kanban"],
+    "Jira": ["jira"],
+    "Project Management": ["project management", "pmp"],
+    "Product Management": ["product management", "product manager"],
+    # Business & HR
+    "Accounting": ["accounting", "akuntansi"],
+    "Digital Marketing": ["digital marketing", "seo"],
+    "Sales": ["sales", "business development"],
+    "Recruitment": ["recruitment", "talent acquisition", "rekrutmen"],
+    "Payroll": ["payroll"],
+    "Customer Service": ["customer service", "customer support"],
+    "Public Speaking": ["public speaking"],
+    "Leadership": ["leadership", "team lead", "team leader"],
+    "Communication": ["communication skills", "komunikasi"],
+}
+
+MONTHS = {
+    "jan": 1, "feb": 2, "mar": 3, "apr": 4, "may": 5, "mei": 5, "jun": 6, "jul": 7,
+    "aug": 8, "agu": 8, "agt": 8, "sep": 9, "oct": 10, "okt": 10, "nov": 11, "dec": 12, "des": 12,
+}
+_MONTH = r"(?:jan|feb|mar|apr|may|mei|jun|jul|aug|agu|agt|sep|oct|okt|nov|dec|des)[a-z]*\.?"
+_DATE = rf"(?:(?P<{{p}}mon>{_MONTH})\s+|(?P<{{p}}num>0?[1-9]|1[0-2])[/.])?(?P<{{p}}year>(?:19|20)\d{{{{2}}}})"
+_PRESENT = r"present|current|now|today|sekarang|saat ini|kini"
+DATE_RANGE_RE = re.compile(
+    _DATE.format(p="s_")
+    + r"\s*(?:-|–|—|to|until|till|s/d|s\.d\.?|sampai|hingga)\s*"
+    + rf"(?:(?P<present>{_PRESENT})|" + _DATE.format(p="e_") + ")",
+    re.IGNORECASE
+)
+YEAR_RE = re.compile(r"(?:19|20)\d\d")  # cheap pre-check: most lines have no dates
+STATED_YEARS_RE = re.compile(
+    r"(\d{1,2})\+?\s*(?:years?|yrs?|tahun)\s+(?:of\s+)?(?:professional\s+|work\s+|working\s+)?(?:experience|pengalaman)",
+    re.IGNORECASE
+)
+
+# Section headings: ranges under education are study years, not work experience
+EDUCATION_HEADINGS = {"education", "academic background", "pendidikan", "riwayat pendidikan", "certifications", "sertifikasi"}
+OTHER_HEADINGS = {
+    "experience", "work experience", "professional experience", "employment", "employment history",
+    "pengalaman", "pengalaman kerja", "riwayat pekerjaan", "projects", "skills", "keahlian",
+    "summary", "profile", "organizational experience", "volunteer", "achievements", "awards",
+}
+
+
+class SkillMatcher:
+    """Multi-pattern matcher over the skill taxonomy (one pass per text)."""
+
+    def __init__(self, taxonomy: Dict[str, List[str]]):
+        patterns = {alias.lower(): skill for skill, aliases in taxonomy.items() for alias in aliases}
+        if ahocorasick is not None:
+            self._automaton = ahocorasick.Automaton()
+            for alias, skill in patterns.items():
+                self._automaton.add_word(alias, (len(alias), skill))
+            self._automaton.make_automaton()
+            self._iter = self._automaton.iter
+        else:
+            self._automaton = _Automaton(patterns)
+            self._iter = self._automaton.iter
+
+    def find(self, text: str) -> List[str]:
+        """Canonical skills in `text`, most mentioned first (then first mention)."""
+        text = text.lower()
+        size = len(text)
+        counts: Dict[str, int] = {}
+        first: Dict[str, int] = {}
+        for end, (length, skill) in self._iter(text):
+            start = end - length + 1
+            # Whole tokens only: "java" must not match inside "javascript"
+            if start > 0 and _joins_word(text[start - 1], text[start]):
+                continue
+            if end + 1 < size and _joins_word(text[end + 1], text[end]):
+                continue
+            counts[skill] = counts.get(skill, 0) + 1
+            first.setdefault(skill, start)
+        return sorted(counts, key=lambda skill: (-counts[skill], first[skill]))
+
+
+def _joins_word(neighbour: str, edge: str) -> bool:
+    # A boundary only matters next to an alphanumeric pattern edge ("c++" may touch letters after "+")
+    return neighbour.isalnum() and edge.isalnum()
+
+
+class _Automaton:
+    """Aho-Corasick automaton (goto / fail / output), used without pyahocorasick."""
+
+    def __init__(self, patterns: Dict[str, str]):
+        self.goto: List[Dict[str, int]] = [{}]
+        self.fail: List[int] = [0]
+        self.out: List[List[Tuple[int, str]]] = [[]]
+        for alias, skill in patterns.items():
+            state = 0
+            for ch in alias:
+                nxt = self.goto[state].get(ch)
+                if nxt is None:
+                    nxt = len(self.goto)
+                    self.goto[state][ch] = nxt
+                    self.goto.append({})
+                    self.fail.append(0)
+                    self.out.append([])
+                state = nxt
+            self.out[state].append((len(alias), skill))
+
+        # Breadth-first fail links (depth-1 states fail to the root);
+        # a state also emits the outputs of its fail state
+        queue = deque(self.goto[0].values())
+        while queue:
+            state = queue.popleft()
+            for ch, nxt in self.goto[state].items():
+                queue.append(nxt)
+                f = self.fail[state]
+                while f and ch not in self.goto[f]:
+                    f = self.fail[f]
+                self.fail[nxt] = self.goto[f].get(ch, 0)
+                self.out[nxt] = self.out[nxt] + self.out[self.fail[nxt]]
+
+    def iter(self, text: str) -> Iterator[Tuple[int, Tuple[int, str]]]:
+        goto, fail, out = self.goto, self.fail, self.out
+        state = 0
+        for i, ch in enumerate(text):
+            while state and ch not in goto[state]:
+                state = fail[state]
+            state = goto[state].get(ch, 0)
+            for match in out[state]:
+                yield i, match
+
+
+skill_matcher = SkillMatcher(SKILL_TAXONOMY)
+
+
+def extract_skills(text: str, limit: int = MAX_KEY_SKILLS) -> List[str]:
+    return skill_matcher.find(text)[:limit] if text else []
+
+
+def _month_index(year: str, mon: Optional[str], num: Optional[str], default_month: int) -> int:
+    if mon:
+        month = MONTHS[mon[:3].lower()]
+    elif num:
+        month = int(num)
+    else:
+        month = default_month
+    return int(year) * 12 + month - 1
+
+
+def _work_lines(text: str) -> Iterator[str]:
+    """Lines of the CV outside the education section."""
+    skipping = False
+    for line in text.splitlines():
+        heading = line.strip().strip(":").strip().lower()
+        if heading in EDUCATION_HEADINGS:
+            skipping = True
+        elif heading in OTHER_HEADINGS:
+            skipping = False
+        elif not skipping:
+            yield line
+
+
+def extract_experience_years(text: str, today: Optional[datetime.date] = None) -> Optional[int]:
+    """
+    Whole years of experience: the merged date ranges of the work history,
+    or a stated "N years of experience" if the CV has no usable ranges.
+    """
+    if not text:
+        return None
+    today = today or datetime.date.today()
+    now = today.year * 12 + today.month - 1
+    lowest = EARLIEST_YEAR * 12
+
+    ranges = []
+    for line in _work_lines(text):
+        if not YEAR_RE.search(line):
+            continue
+        for m in DATE_RANGE_RE.finditer(line):
+            # Year-only ranges: "2018 - 2020" counts Jan 2018 to Dec 2020
+            start = _month_index(m["s_year"], m["s_mon"], m["s_num"], 1)
+            if m["present"]:
+                end = now
+            else:
+                end = _month_index(m["e_year"], m["e_mon"], m["e_num"], 12)
+            end = min(end, now)
+            if lowest <= start <= end:
+                ranges.append((start, end))
+
+    if ranges:
+        ranges.sort()
+        months = 0
+        cur_start, cur_end = ranges[0]
+        for start, end in ranges[1:]:
+            if start <= cur_end + 1:
+                cur_end = max(cur_end, end)
+            else:
+                months += cur_end - cur_start + 1
+                cur_start, cur_end = start, end
+        months += cur_end - cur_start + 1
+        return min(months // 12, MAX_EXPERIENCE_YEARS)
+
+    stated = [int(n) for n in STATED_YEARS_RE.findall(text)]
+    return min(max(stated), MAX_EXPERIENCE_YEARS) if stated else None
+
+
+def extract_profile(text: str, today: Optional[datetime.date] = None) -> dict:
+    """Column values for the applicants row: key_skills (comma-separated) and experience_years."""
+    skills = extract_skills(text)
+    return {
+        "key_skills": ", ".join(skills) if skills else None,
+        "experience_years": extract_experience_years(text, today)
+    }
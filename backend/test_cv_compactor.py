@@ -0,0 +1,46 @@
+"""
+CV compaction checks: cleanup of page furniture and repeats, section
+detection, and fitting long CVs into the token budget by section priority.
+"""
+
+from cv_compactor import clean_lines, compact_cv, estimate_tokens, split_sections
+
+PAGE = """Jane Doe  |  jane@example.com
+{body}
+
+Page {n} of 2
+"""
+
+
+def long_cv() -> str:
+    experience = "\n".join(f"•\tBuilt service {i} in Python and Kafka, cutting latency by {i}%." for i in range(200))
+    first = "SUMMARY\nBackend engineer, payments.\nWORK EXPERIENCE\nSenior Engineer, Acme | 2020 - Present\n" + experience
+    second = "Skills:\nPython, Go, PostgreSQL, Kafka\nEducation\nBSc Computer Science, 2012 - 2016\nReferences available upon request"
+    return PAGE.format(body=first, n=1) + PAGE.format(body=second, n=2)
+
+
+def test_cleanup_drops_page_furniture_and_repeats():
+    lines = clean_lines(long_cv())
+    assert lines.count("Jane Doe | jane@example.com") == 1
+    assert not any(line.startswith("Page ") or "upon request" in line for line in lines)
+    assert lines[5] == "- Built service 0 in Python and Kafka, cutting latency by 0%."
+    kinds = [kind for kind, _ in split_sections(lines)]
+    assert kinds == ["header", "summary", "experience", "skills", "education"]
+
+
+def test_long_cv_fits_budget_and_keeps_every_section():
+    text = long_cv()
+    compacted = compact_cv(text, budget=400)
+    assert estimate_tokens(text) > 3000
+    assert estimate_tokens(compacted) <= 420  # headings and the cut marker may go slightly over
+    # Short sections are kept whole; experience is cut, most recent lines first
+    for line in ("Backend engineer, payments.", "Python, Go, PostgreSQL, Kafka", "BSc Computer Science, 2012 - 2016"):
+        assert line in compacted
+    assert "Senior Engineer, Acme | 2020 - Present" in compacted and "[...]" in compacted
+    assert "service 199" not in compacted
+    assert compacted.index("SUMMARY") < compacted.index("WORK EXPERIENCE") < compacted.index("Skills:")
+
+
+def test_short_cv_is_only_cleaned():
+    text = "Jane   Doe\n\n\nSkills\n●  Python\x0c"
+    assert compact_cv(text, budget=400) == "Jane Doe\nSkills\n- Python"
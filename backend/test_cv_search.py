@@ -0,0 +1,22 @@
+"""
+CV search snippet checks: which query words are highlighted, and which
+part of the CV the snippet shows.
+"""
+
+from cv_search import make_snippet, query_terms
+
+
+def test_query_terms_follow_web_search_syntax():
+    assert query_terms('Python "data engineer" OR Go -Java') == {"python", "data", "engineer", "go"}
+    assert query_terms('-"team lead" kotlin') == {"kotlin"}
+    assert query_terms("node.js") == {"node", "js"}
+
+
+def test_snippet_shows_the_densest_window():
+    filler = "lorem " * 100
+    text = f"Python once. {filler} Python, Kafka and Postgres <daily>. {filler}"
+    snippet = make_snippet(text, {"python", "kafka", "postgres"}, width=10)
+    assert snippet.startswith("… ") and snippet.endswith(" …")
+    assert "<mark>Python,</mark> <mark>Kafka</mark> and <mark>Postgres</mark> &lt;daily&gt;." in snippet
+    assert make_snippet(text, {"rust"}) is None
+    assert make_snippet(None, {"python"}) is None
@@ -0,0 +1,95 @@
+"""
+CV content store checks: compressed round trips, one stored copy per hash,
+the zlib fallback without zstandard, and missing hashes. The local backend
+runs on a temp directory, the Supabase backend against a fake PostgREST.
+"""
+
+import os
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+
+from conftest import StubReply
+from services import cv_store
+from services.cv_store import LocalCVStore, SupabaseCVStore
+
+CV = "Jane Doe\nSenior Engineer. Python, SQL, Kafka.\n" * 40
+
+
+def stored_files(base_dir):
+    return sorted(os.path.relpath(os.path.join(root, name), base_dir)
+                  for root, _, names in os.walk(base_dir) for name in names)
+
+
+def test_local_store_round_trips_compressed_text(tmp_path):
+    store = LocalCVStore(str(tmp_path))
+    store.put("ab12", CV)
+    assert store.get("ab12") == CV
+    [name] = stored_files(tmp_path)
+    assert name.startswith(os.path.join("ab", "ab12."))
+    assert os.path.getsize(tmp_path / name) < len(CV) / 4
+
+
+def test_local_store_keeps_one_copy_per_hash(tmp_path):
+    store = LocalCVStore(str(tmp_path))
+    store.put("ab12", CV)
+    store.put("ab12", "a later upload never replaces the stored copy")
+    assert store.get("ab12") == CV
+    assert len(stored_files(tmp_path)) == 1
+
+
+def test_concurrent_uploads_of_one_cv_leave_one_whole_file(tmp_path, monkeypatch):
+    store = LocalCVStore(str(tmp_path))
+    monkeypatch.setattr(store, "_find", lambda cv_hash: None)  # all uploads pass the check at once
+    with ThreadPoolExecutor(max_workers=8) as pool:
+        list(pool.map(lambda _: store.put("ab12", CV), range(32)))  # re-raises a failed write
+    monkeypatch.undo()
+    assert store.get("ab12") == CV
+    assert len(stored_files(tmp_path)) == 1  # no temp files left behind
+
+
+def test_zlib_fallback_without_zstandard(tmp_path, monkeypatch):
+    store = LocalCVStore(str(tmp_path))
+    store.put("aa01", CV)
+    monkeypatch.setattr(cv_store, "zstandard", None)
+    store.put("bb02", CV)
+    assert stored_files(tmp_path)[1] == os.path.join("bb", "bb02.zlib")
+    assert store.get("bb02") == CV
+    if stored_files(tmp_path)[0].endswith(".zstd"):
+        with pytest.raises(RuntimeError):
+            store.get("aa01")
+
+
+def test_missing_hashes_are_none_or_left_out(tmp_path):
+    store = LocalCVStore(str(tmp_path))
+    store.put("ab12", CV)
+    assert store.get("cd34") is None
+    assert store.get_many(["ab12", "cd34", "ab12"]) == {"ab12": CV}
+
+
+def route(server, request):
+    if request.method == "POST":
+        for row in request.body if isinstance(request.body, list) else [request.body]:
+            server.rows.setdefault(row["cv_hash"], row)  # ignore_duplicates
+        return StubReply([])
+    _, wanted = request.query["cv_hash"][0].split(".", 1)  # eq.<hash> or in.(<hash>,...)
+    return StubReply([server.rows[h] for h in wanted.strip("()").split(",") if h in server.rows])
+
+
+@pytest.fixture
+def server(fake_postgrest):
+    return fake_postgrest(route, rows={})
+
+
+def test_supabase_store_round_trips_bytea_hex(server):
+    store = SupabaseCVStore()
+    store.put("ab12", CV)
+    store.put("ab12", "a later upload never replaces the stored copy")
+    row = server.rows["ab12"]
+    assert row["body"].startswith("\\x") and row["original_size"] == len(CV)
+    upsert = server.requests[0]
+    assert upsert.query["on_conflict"] == ["cv_hash"]
+    assert "ignore-duplicates" in upsert.headers["prefer"]
+    assert store.get("ab12") == CV
+    assert store.get("cd34") is None
+    assert store.get_many(["ab12", "cd34"]) == {"ab12": CV}
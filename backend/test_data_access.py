@@ -0,0 +1,469 @@
+"""
+Request-scoped data access checks against a local fake PostgREST.
+Verifies that loads are coalesced and memoized, that handlers report
+their round trips in X-DB-Queries, that hiring and decisions (status plus
+outbox email) are single RPC calls, that employee search is one RPC with
+an ILIKE fallback, that applicant listings filter and page in the query,
+that unchanged listings are answered with 304, that dashboard stats
+are read from counter rows in one query, and that CV search is one RPC
+plus one content read for the snippets. The fake returns timestamps in
+ISO 8601 form, as PostgREST does, and applies deleted_at filters by instant,
+so soft-delete checks must run in the query.
+"""
+
+import asyncio
+import time
+import uuid
+
+import pytest
+
+import database
+from conftest import EPOCH, StubReply, deleted_at_matches, postgrest_error
+from data_access import DataLoader, RequestData
+from pagination import decode_cursor, encode_cursor
+from routers.employees import DIRECTORY_COLUMNS
+
+USER_ID = str(uuid.uuid4())
+PROJECT_ID = str(uuid.uuid4())
+APPLICANT_ID = str(uuid.uuid4())
+ARCHIVED = "2024-05-01T09:30:00+00:00"
+
+PROJECT = {"id": PROJECT_ID, "org_id": str(uuid.uuid4()), "owner_id": USER_ID, "name": "Backend Engineer",
+           "is_active": True, "deleted_at": EPOCH}
+ORGANIZATION = {"id": PROJECT["org_id"], "owner_id": USER_ID, "name": "Acme", "deleted_at": EPOCH}
+APPLICANT = {"id": APPLICANT_ID, "project_id": PROJECT_ID, "name": "Ada", "email": "ada@example.com",
+             "status": "processing", "ai_score": 80, "ai_reasoning": "Strong fit.",
+             "deleted_at": EPOCH, "created_at": "2024-01-01T00:00:00+00:00"}
+EMPLOYEE = {"id": str(uuid.uuid4()), "name": "Grace", "email": "grace@example.com", "role": "Engineer",
+            "department": "IT", "join_date": None, "leave_remaining": 12, "status": "active", "deleted_at": EPOCH,
+            "created_at": "2024-01-01T00:00:00+00:00", "updated_at": "2024-01-01T00:00:00+00:00"}
+
+# Counter rows as maintained by migrations/add_applicant_stats.sql
+STAT_ROWS = [
+    {"project_id": PROJECT_ID, "metric": "status", "bucket": "processing", "count": 7},
+    {"project_id": PROJECT_ID, "metric": "status", "bucket": "hired", "count": 2},
+    {"project_id": PROJECT_ID, "metric": "status", "bucket": "rejected", "count": 0},
+    {"project_id": PROJECT_ID, "metric": "score", "bucket": "80", "count": 5},
+    {"project_id": PROJECT_ID, "metric": "score", "bucket": "90", "count": 1},
+    {"project_id": PROJECT_ID, "metric": "score", "bucket": "unscored", "count": 3},
+    {"project_id": PROJECT_ID, "metric": "time_to_score", "bucket": "10", "count": 2},
+    {"project_id": PROJECT_ID, "metric": "time_to_score", "bucket": "30", "count": 4},
+]
+
+CV_TEXT = "Backend engineer. Built payment APIs in Python & FastAPI on PostgreSQL."
+SEARCH_HIT = dict(APPLICANT, project_name="Backend Engineer", relevance_score=None, cv_hash="abc", rank=0.4)
+
+
+def route(server, request):
+    project = dict(PROJECT, deleted_at=server.project_deleted_at)
+    if request.method == "PATCH":
+        return StubReply([dict(APPLICANT, status="rejected")])
+    if request.method == "POST":
+        if request.table == "search_applicants":
+            return StubReply([SEARCH_HIT])
+        if request.table == "search_employees":
+            if not server.employee_search_rpc:
+                return postgrest_error("Could not find the function public.search_employees", "PGRST202", 404)
+            return StubReply([{column: EMPLOYEE[column] for column in DIRECTORY_COLUMNS.split(", ")}])
+        if request.table == "decide_applicants":
+            body = request.body
+            live = deleted_at_matches(project, [f"eq.{EPOCH}"]) and body["p_owner_id"] == USER_ID
+            changed = APPLICANT["status"] != body["p_status"]
+            return StubReply([{"applicant_id": APPLICANT_ID, "changed": changed,
+                               "email_queued": changed and APPLICANT_ID in body["p_emails"]}
+                              for applicant_id in body["p_applicant_ids"] if live and applicant_id == APPLICANT_ID])
+        if request.table == "index_cv_text" and server.cv_index_fails:
+            return postgrest_error("canceling statement due to statement timeout", "57014", 500)
+        if request.table == "hire_applicant":
+            # The applicant is no longer in the required status
+            return postgrest_error("invalid_status")
+        if request.table == "applicants":
+            return StubReply([APPLICANT], 201)
+        return StubReply([], 201)
+    params = request.query
+    if request.table == "projects":
+        return StubReply([project] if deleted_at_matches(project, params.get("deleted_at")) else [])
+    if request.table == "applicants":
+        if params.get("id") and APPLICANT_ID not in params["id"][0]:
+            return StubReply([])
+        if params.get("cv_hash") and not server.cv_on_file:
+            return StubReply([])
+        embed_live = deleted_at_matches(project, params.get("projects.deleted_at"))
+        rows = [dict(APPLICANT, projects=project if embed_live else None)]
+        return StubReply(rows * server.listing_rows if params.get("limit") else rows)
+    if request.table == "organizations":
+        return StubReply([ORGANIZATION] if deleted_at_matches(ORGANIZATION, params.get("deleted_at")) else [])
+    if request.table == "employees":
+        return StubReply([EMPLOYEE] if deleted_at_matches(EMPLOYEE, params.get("deleted_at")) else [])
+    if request.table == "applicant_stats":
+        return StubReply(STAT_ROWS)
+    if request.table == "cv_contents":
+        return StubReply([{"cv_hash": "abc", "codec": "none", "body": "\\x" + CV_TEXT.encode().hex()}])
+    if request.table == "data_versions":
+        return StubReply([{"scope": f"recruitment:{USER_ID}", "version": 3}])
+    return StubReply([])
+
+
+@pytest.fixture
+def server(fake_postgrest):
+    return fake_postgrest(route, project_deleted_at=EPOCH, cv_on_file=True, employee_search_rpc=True,
+                          listing_rows=1, cv_index_fails=False)
+
+
+def test_loads_in_one_tick_are_coalesced_and_memoized():
+    batches = []
+
+    async def batch(keys):
+        batches.append(list(keys))
+        return {k: k * 10 for k in keys if k != 3}
+
+    async def run():
+        loader = DataLoader(batch)
+        values = await asyncio.gather(loader.load(1), loader.load(2), loader.load(3), loader.load(1))
+        again = await loader.load(2)
+        return values, again
+
+    values, again = asyncio.run(run())
+    assert values == [10, 20, None, 10]
+    assert again == 20
+    assert batches == [[1, 2, 3]]
+
+
+def test_failed_batch_is_retried():
+    calls = []
+
+    async def batch(keys):
+        calls.append(keys)
+        if len(calls) == 1:
+            raise RuntimeError("boom")
+        return {k: k for k in keys}
+
+    async def run():
+        loader = DataLoader(batch)
+        try:
+            await loader.load("a")
+        except RuntimeError:
+            pass
+        return await loader.load("a")
+
+    assert asyncio.run(run()) == "a"
+    assert len(calls) == 2
+
+
+def test_applicant_load_primes_its_project(server):
+    async def run():
+        try:
+            data = RequestData(await database.get_async_supabase())
+            applicant = await data.applicants.load(APPLICANT_ID)
+            project = await data.projects.load(applicant["project_id"])
+            return data.query_count, applicant, project
+        finally:
+            await database.close_async_supabase()
+
+    count, applicant, project = asyncio.run(run())
+    assert count == 1 and len(server.requests) == 1
+    assert "projects" not in applicant
+    assert project["owner_id"] == USER_ID
+
+
+def make_client():
+    import contextlib
+    from fastapi import FastAPI
+    from fastapi.testclient import TestClient
+    from data_access import query_count_middleware
+    from metrics import metrics_middleware
+    from routers import recruitment, employees
+
+    @contextlib.asynccontextmanager
+    async def lifespan(app):
+        await database.init_async_supabase()
+        yield
+        await database.close_async_supabase()
+
+    app = FastAPI(lifespan=lifespan)
+    app.middleware("http")(query_count_middleware)
+    app.middleware("http")(metrics_middleware)
+    app.include_router(recruitment.router)
+    app.include_router(employees.router, prefix="/employees")
+    return TestClient(app)
+
+
+def auth_headers() -> dict:
+    import jwt
+    return {"Authorization": f"Bearer {jwt.encode({'sub': USER_ID}, 'test-secret', algorithm='HS256')}"}
+
+
+def test_update_applicant_reports_round_trips(server):
+    with make_client() as client:
+        res = client.patch(f"/applicants/{APPLICANT_ID}", json={"status": "rejected"}, headers=auth_headers())
+        invalid = client.patch(f"/applicants/{APPLICANT_ID}", json={"status": "hired"}, headers=auth_headers())
+
+    assert res.status_code == 200, res.text
+    assert res.json()["status"] == "rejected"
+    # Applicant + embedded project in one read, then the status change and its email in one RPC
+    assert res.headers["X-DB-Queries"] == "2"
+    assert [r.table for r in server.requests] == ["applicants", "decide_applicants"]
+    assert res.headers["Server-Timing"].startswith('db;dur=') and 'desc="2 queries"' in res.headers["Server-Timing"]
+    # Validated like the bulk endpoint, before any query
+    assert invalid.status_code == 422
+
+
+def test_repeated_decision_changes_nothing(server, monkeypatch):
+    from routers import recruitment
+
+    events = []
+    monkeypatch.setattr(recruitment, "publish_event", lambda *args: events.append(args))
+    with make_client() as client:
+        res = client.patch(f"/applicants/{APPLICANT_ID}", json={"status": "processing"}, headers=auth_headers())
+        bulk = client.post("/applicants/bulk-status", json={"applicant_ids": [APPLICANT_ID], "status": "processing"},
+                           headers=auth_headers())
+
+    assert res.status_code == 200 and res.json()["status"] == "processing"
+    assert bulk.json()["results"] == [{"id": APPLICANT_ID, "result": "updated"}]
+    assert bulk.json()["emails_queued"] == 0
+    assert events == []
+
+
+def test_owned_project_checks_accept_iso_timestamps(server):
+    with make_client() as client:
+        listing = client.get(f"/applicants?project_id={PROJECT_ID}", headers=auth_headers())
+        stats = client.get(f"/projects/{PROJECT_ID}/stats", headers=auth_headers())
+
+    assert listing.status_code == 200, listing.text
+    assert stats.status_code == 200, stats.text
+    project_reads = [r.query for r in server.requests if r.table == "projects"]
+    assert project_reads and all(params["deleted_at"] == ["eq.1970-01-01 00:00:00+00"] for params in project_reads)
+
+
+def test_archived_project_is_not_authorized(server):
+    server.project_deleted_at = ARCHIVED
+    with make_client() as client:
+        update = client.patch(f"/applicants/{APPLICANT_ID}", json={"status": "rejected"}, headers=auth_headers())
+        listing = client.get(f"/applicants?project_id={PROJECT_ID}", headers=auth_headers())
+
+    assert update.status_code == 403 and listing.status_code == 403
+    # The embedded project comes back empty, which primes the loader: no second read
+    assert update.headers["X-DB-Queries"] == "1"
+
+
+def test_employee_and_apply_lookups_accept_iso_timestamps(server):
+    cv = {"cv": ("cv.pdf", b"%PDF-1.4 resubmitted", "application/pdf")}
+    form = {"name": "Ada", "email": "ada@example.com"}
+    with make_client() as client:
+        employee = client.get(f"/employees/{EMPLOYEE['id']}", headers=auth_headers())
+        applied = client.post("/apply", data=form, files=cv, headers={"X-PROJECT-ID": PROJECT_ID})
+        server.project_deleted_at = ARCHIVED
+        closed = client.post("/apply", data=form, files=cv, headers={"X-PROJECT-ID": PROJECT_ID})
+
+    assert employee.status_code == 200 and employee.json()["name"] == "Grace"
+    # The fake already holds an applicant for every CV: answered as a duplicate
+    assert applied.status_code == 200 and applied.json()["duplicate"] is True
+    assert closed.status_code == 404
+
+
+def test_scoring_survives_the_first_client_disconnecting(server, monkeypatch):
+    import httpx
+    from routers import recruitment
+
+    server.cv_on_file = False
+    scored = []
+    monkeypatch.setattr(recruitment, "validate_cv_file", lambda cv, content: ("application/pdf", None))
+    cv_text = f"Summary: {CV_TEXT} Experience: 5 years. Skills: Python, SQL."
+    monkeypatch.setattr(recruitment, "extract_and_validate_cv_text", lambda content, mime: time.sleep(0.3) or cv_text)
+    monkeypatch.setattr(recruitment, "process_ai_score", lambda *args: scored.append(args))
+    cv = {"cv": ("cv.pdf", b"%PDF-1.4 new application", "application/pdf")}
+    form = {"name": "Ada", "email": "ada@example.com"}
+
+    async def run():
+        transport = httpx.ASGITransport(app=make_client().app)
+        try:
+            async with httpx.AsyncClient(transport=transport, base_url="http://test") as client:
+                def apply():
+                    return client.post("/apply", data=form, files=cv, headers={"X-PROJECT-ID": PROJECT_ID})
+
+                first = asyncio.ensure_future(apply())
+                while not recruitment.apply_flights.in_flight():  # the first client starts the work
+                    await asyncio.sleep(0.01)
+                second = asyncio.ensure_future(apply())
+                await asyncio.sleep(0.1)
+                first.cancel()  # the client that started the work disconnects mid-extraction
+                res = await second
+                await asyncio.gather(*recruitment.scoring_tasks)
+                return first, res
+        finally:
+            await database.close_async_supabase()
+
+    first, res = asyncio.run(run())
+    assert first.cancelled()
+    assert res.status_code == 200 and res.json() == {"id": APPLICANT_ID, "project_id": PROJECT_ID, "duplicate": True}
+    assert [args[0] for args in scored] == [APPLICANT_ID]
+    assert [r.table for r in server.requests].count("applicants") == 2  # one duplicate check, one insert
+
+
+def test_apply_survives_a_failed_search_index_write(server, monkeypatch):
+    from routers import recruitment
+
+    server.cv_on_file = False
+    server.cv_index_fails = True
+    monkeypatch.setattr(recruitment, "validate_cv_file", lambda cv, content: ("application/pdf", None))
+    cv_text = f"Summary: {CV_TEXT} Experience: 5 years. Skills: Python, SQL."
+    monkeypatch.setattr(recruitment, "extract_and_validate_cv_text", lambda content, mime: cv_text)
+    monkeypatch.setattr(recruitment, "process_ai_score", lambda *args: None)
+    cv = {"cv": ("cv.pdf", b"%PDF-1.4 index failure", "application/pdf")}
+    with make_client() as client:
+        res = client.post("/apply", data={"name": "Ada", "email": "ada@example.com"}, files=cv,
+                          headers={"X-PROJECT-ID": PROJECT_ID})
+
+    assert res.status_code == 200 and res.json()["id"] == APPLICANT_ID
+    index = next(r for r in server.requests if r.table == "index_cv_text")
+    assert index.body["p_owner_id"] == USER_ID  # indexed under the owner, searched by owner
+
+
+def test_rescoring_leaves_decided_and_duplicate_applicants_alone(server, monkeypatch):
+    from routers import recruitment
+
+    scheduled = []
+    monkeypatch.setattr(recruitment, "schedule_scoring", lambda *args: scheduled.append(args))
+    monkeypatch.setitem(APPLICANT, "cv_hash", "abc")
+    path = f"/applicants/{APPLICANT_ID}/score"
+    with make_client() as client:
+        monkeypatch.setitem(APPLICANT, "status", "rejected")
+        decided = client.post(path, headers=auth_headers())
+        monkeypatch.setitem(APPLICANT, "status", "processing")
+        monkeypatch.setitem(APPLICANT, "duplicate_of", str(uuid.uuid4()))
+        duplicate = client.post(path, headers=auth_headers())
+        monkeypatch.setitem(APPLICANT, "duplicate_of", None)
+        queued = client.post(path, headers=auth_headers())
+
+    assert decided.status_code == 409 and duplicate.status_code == 409
+    assert queued.status_code == 200 and queued.json() == {"status": "queued", "id": APPLICANT_ID}
+    assert scheduled == [(APPLICANT_ID, "Ada", "ada@example.com", CV_TEXT, USER_ID)]
+
+
+def test_bulk_decision_checks_ownership_in_the_query(server):
+    missing = str(uuid.uuid4())
+    body = {"applicant_ids": [APPLICANT_ID, missing], "status": "rejected"}
+    with make_client() as client:
+        res = client.post("/applicants/bulk-status", json=body, headers=auth_headers())
+        invalid = client.post("/applicants/bulk-status", json=dict(body, status="hired"), headers=auth_headers())
+        server.project_deleted_at = ARCHIVED
+        archived = client.post("/applicants/bulk-status", json=body, headers=auth_headers())
+
+    assert res.status_code == 200, res.text
+    assert res.json()["results"] == [{"id": APPLICANT_ID, "result": "updated"}, {"id": missing, "result": "not_found"}]
+    assert res.json()["emails_queued"] == 1
+    decide = next(r for r in server.requests if r.table == "decide_applicants")
+    assert decide.body["p_applicant_ids"] == [APPLICANT_ID] and decide.body["p_status"] == "rejected"
+    assert decide.body["p_emails"][APPLICANT_ID]["to_email"] == "ada@example.com"
+    read = next(r for r in server.requests if r.method == "GET" and r.table == "applicants")
+    assert read.query["projects.deleted_at"] == ["eq.1970-01-01 00:00:00+00"]
+    # Hiring goes through the hire RPC, never a bulk status write
+    assert invalid.status_code == 422
+    assert archived.json()["results"][0] == {"id": APPLICANT_ID, "result": "forbidden"}
+
+
+def test_employee_search_is_one_rpc_with_ilike_fallback(server):
+    with make_client() as client:
+        ranked = client.get("/employees/?q=gra%25", headers=auth_headers())
+        server.employee_search_rpc = False  # migration not applied yet
+        fallback = client.get("/employees/?q=Gra&department=IT&limit=5", headers=auth_headers())
+
+    assert ranked.status_code == 200 and [e["name"] for e in ranked.json()] == ["Grace"]
+    rpc = next(r for r in server.requests if r.table == "search_employees")
+    # LIKE wildcards are stripped before the term reaches the query
+    assert rpc.body == {"p_query": "gra", "p_department": None, "p_status": None, "p_limit": 50}
+
+    assert fallback.status_code == 200 and [e["name"] for e in fallback.json()] == ["Grace"]
+    scan = [r for r in server.requests if r.method == "GET" and r.table == "employees"][-1]
+    assert scan.query["or"] == ["(name.ilike.*Gra*,email.ilike.*Gra*)"]
+    assert scan.query["department"] == ["eq.IT"] and scan.query["limit"] == ["5"]
+    assert scan.query["deleted_at"] == ["eq.1970-01-01 00:00:00+00"]
+
+
+def test_hire_is_one_rpc_and_maps_errors(server):
+    with make_client() as client:
+        res = client.post(f"/applicants/{APPLICANT_ID}/convert", headers=auth_headers())
+
+    assert res.status_code == 400
+    assert res.json()["detail"] == "Only approved applicants can be converted to employees"
+    assert res.headers["X-DB-Queries"] == "1"
+    assert [(r.method, r.path) for r in server.requests] == [("POST", "/rest/v1/rpc/hire_applicant")]
+
+
+def test_applicant_listings_filter_and_page_in_the_query(server):
+    server.listing_rows = 3  # more rows than the page holds: a next cursor is due
+    after = str(uuid.uuid4())
+    filters = f"limit=2&cursor={encode_cursor([90, after])}&status=processing,interview_pending&min_score=50&q=ad*a"
+    with make_client() as client:
+        page = client.get(f"/applicants?project_id={PROJECT_ID}&{filters}", headers=auth_headers())
+        org = client.get("/applicants/all?limit=2&status=hired", headers=auth_headers())
+        bad = client.get(f"/applicants?project_id={PROJECT_ID}&cursor=nope", headers=auth_headers())
+
+    assert page.status_code == 200 and len(page.json()) == 2
+    assert decode_cursor(page.headers["X-Next-Cursor"], 2) == [APPLICANT["ai_score"], APPLICANT_ID]
+    listing, org_listing = [r.query for r in server.requests if r.table == "applicants" and "limit" in r.query]
+    assert listing["limit"] == ["3"] and listing["order"] == ["ai_score.desc.nullslast,id.desc"]
+    assert listing["status"] == ["in.(processing,interview_pending)"] and listing["ai_score"] == ["gte.50"]
+    assert listing["or"] == ["(name.ilike.*ada*,email.ilike.*ada*)",
+                             f'(ai_score.lt.90,and(ai_score.eq.90,id.lt."{after}"),ai_score.is.null)']
+
+    assert org.status_code == 200 and org.json()[0]["project_name"] == PROJECT["name"]
+    assert decode_cursor(org.headers["X-Next-Cursor"], 2) == [APPLICANT["created_at"], APPLICANT_ID]
+    assert org_listing["status"] == ["eq.hired"] and org_listing["projects.org_id"] == [f"eq.{PROJECT['org_id']}"]
+    assert bad.status_code == 400
+
+
+def test_unchanged_listing_is_answered_with_304(server):
+    path = f"/applicants?project_id={PROJECT_ID}"
+    with make_client() as client:
+        first = client.get(path, headers=auth_headers())
+        server.requests.clear()
+        second = client.get(path, headers=dict(auth_headers(), **{"If-None-Match": first.headers["ETag"]}))
+
+    assert first.status_code == 200 and first.headers["Cache-Control"] == "private, no-cache"
+    assert second.status_code == 304 and second.content == b""
+    assert second.headers["ETag"] == first.headers["ETag"]
+    # Ownership check and version lookup only: the listing query is skipped
+    assert sorted(r.table for r in server.requests) == ["data_versions", "projects"]
+
+
+def test_median_time_to_score_interpolates_within_bucket():
+    from analytics import median_time_to_score
+
+    assert median_time_to_score({}) is None
+    # 6 scored: the 3rd falls in (10, 30] after 2 in (5, 10] -> 10 + 20 * 1/4
+    assert median_time_to_score({"10": 2, "30": 4}) == 15.0
+    assert median_time_to_score({"inf": 3}) == 86400.0
+
+
+def test_organization_stats_are_one_counter_read(server):
+    with make_client() as client:
+        res = client.get("/organizations/stats", headers=auth_headers())
+
+    assert res.status_code == 200, res.text
+    assert res.headers["X-DB-Queries"] == "1"
+    request = server.requests[0]
+    assert request.table == "applicant_stats" and request.query["projects.owner_id"] == [f"eq.{USER_ID}"]
+
+    stats = res.json()
+    assert stats["total"] == 9
+    assert stats["by_status"] == {"hired": 2, "processing": 7}
+    assert [b["count"] for b in stats["score_histogram"]][-2:] == [5, 1]
+    assert stats["score_histogram"][-1]["max"] == 100 and stats["unscored"] == 3
+    assert len(stats["applications_per_day"]) == 30
+    assert stats["median_time_to_score_seconds"] == 15.0
+    assert stats["projects"][PROJECT_ID] == {"total": 9, "by_status": {"processing": 7, "hired": 2}}
+
+
+def test_cv_search_is_one_rpc_with_snippets(server):
+    with make_client() as client:
+        res = client.get('/applicants/search?q="payment apis" python', headers=auth_headers())
+
+    assert res.status_code == 200, res.text
+    assert res.headers["X-DB-Queries"] == "1"  # the RPC; the CV page is read through the store
+    assert [r.path for r in server.requests] == ["/rest/v1/rpc/search_applicants", "/rest/v1/cv_contents"]
+    hit = res.json()[0]
+    assert "cv_hash" not in hit and hit["rank"] == 0.4
+    assert hit["snippet"] == ("Backend engineer. Built <mark>payment</mark> <mark>APIs</mark> in "
+                              "<mark>Python</mark> &amp; FastAPI on PostgreSQL.")
+
@@ -0,0 +1,103 @@
+"""
+Email outbox checks against a local fake Resend endpoint (and a fake
+PostgREST for the dispatcher). Rows are built as the decide_applicants RPC
+writes them (migrations/add_decision_rpc.sql): the columns of
+outbox_message() plus the key decision:<applicant_id>:<status_version>.
+"""
+
+import os
+
+import pytest
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+os.environ["RESEND_API_KEY"] = "re_test_key"
+
+import resend
+from conftest import StubReply
+from email_service import build_decision_email
+from services import email_outbox
+
+
+def resend_route(server, request):
+    if server.failures_left > 0:
+        server.failures_left -= 1
+        return StubReply({"name": "internal_server_error", "message": "boom", "statusCode": 500}, 500)
+    if request.path == "/emails/batch":
+        return StubReply({"data": [{"id": f"email-{i}"} for i in range(len(request.body))]})
+    return StubReply({"id": "email-single"})
+
+
+@pytest.fixture
+def fake_resend(stub_server, monkeypatch):
+    """Factory: fake_resend(failures) answers Resend calls, failing the first `failures`."""
+    def start(failures: int = 0):
+        server = stub_server(resend_route, failures_left=failures)
+        monkeypatch.setattr(resend, "api_url", server.url)
+        return server
+
+    return start
+
+
+def make_row(i: int, attempts: int = 0) -> dict:
+    """An email_outbox row as claim_email_outbox returns it."""
+    message = build_decision_email(f"c{i}@example.com", f"Candidate {i}", "rejected", "Backend Engineer")
+    return {"id": f"row-{i}", "idempotency_key": f"decision:app-{i}:1", "attempts": attempts,
+            "status": "sending", **email_outbox.outbox_message(message)}
+
+
+def test_first_attempts_use_one_batch_call(fake_resend):
+    server = fake_resend()
+    rows = [make_row(i) for i in range(25)]
+    results = email_outbox.deliver(rows)
+    assert all(error is None for error in results.values())
+    assert len(server.requests) == 1
+    request = server.requests[0]
+    assert request.path == "/emails/batch" and len(request.body) == 25
+    key = request.headers.get("Idempotency-Key")
+    assert key and key.startswith("batch:")
+
+
+def test_failed_batch_is_reported_per_row(fake_resend):
+    fake_resend(failures=1)
+    results = email_outbox.deliver([make_row(i) for i in range(3)])
+    assert len(results) == 3 and all(results.values())
+
+
+def test_retries_go_out_individually_with_row_keys(fake_resend):
+    server = fake_resend()
+    rows = [make_row(i, attempts=1) for i in range(2)]
+    results = email_outbox.deliver(rows)
+    assert all(error is None for error in results.values())
+    assert [r.path for r in server.requests] == ["/emails", "/emails"]
+    assert [r.headers.get("Idempotency-Key") for r in server.requests] == [row["idempotency_key"] for row in rows]
+
+
+def test_retry_delay_backs_off_with_jitter():
+    delays = [email_outbox.retry_delay(a) for a in range(1, 12)]
+    assert delays[0] <= email_outbox.OUTBOX_BACKOFF_BASE * 2
+    assert max(delays) <= email_outbox.OUTBOX_BACKOFF_MAX
+
+
+
+def outbox_route(server, request):
+    if request.table == "claim_email_outbox":
+        rows, server.pending = server.pending, []
+        return StubReply(rows)
+    return StubReply([])
+
+
+def test_dispatcher_delivers_claimed_rows_and_records_the_outcome(fake_resend, fake_postgrest):
+    resend_server = fake_resend(failures=1)
+    db = fake_postgrest(outbox_route, pending=[make_row(0), make_row(1, attempts=2)])
+    assert email_outbox.dispatch_pending() == 2
+    # The batch of first attempts failed; the retry went out on its own key
+    assert [r.path for r in resend_server.requests] == ["/emails/batch", "/emails"]
+    assert resend_server.requests[1].headers.get("Idempotency-Key") == "decision:app-1:1"
+    claim, *updates = db.requests
+    assert claim.body == {"batch_size": email_outbox.OUTBOX_BATCH_SIZE}
+    sent, failed = updates
+    assert sent.body["status"] == "sent" and sent.query["id"] == ["in.(row-1)"]
+    assert failed.body["status"] == "pending" and failed.body["attempts"] == 1
+    assert failed.query["id"] == ["eq.row-0"] and failed.body["last_error"]
+    assert email_outbox.dispatch_pending() == 0
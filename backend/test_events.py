@@ -0,0 +1,130 @@
+"""
+Event stream checks: fan-out per organization, events published from worker
+threads, resume after Last-Event-ID, reset when the gap is unrecoverable, and
+no subscriptions or buffers left behind.
+"""
+
+import asyncio
+import logging
+import threading
+from types import SimpleNamespace
+
+import services.events as events
+from dependencies import AccessTokenLogFilter
+from services.events import EventBroker, Subscription, event_stream, event_broker, RESET
+
+
+def test_events_fan_out_per_channel():
+    async def run():
+        broker = EventBroker()
+        org_a, _ = broker.subscribe("owner-a")
+        org_b, _ = broker.subscribe("owner-b")
+        broker.publish("owner-a", "applicant.created", {"id": "1"})
+        await asyncio.sleep(0)
+        return org_a.queue.qsize(), org_b.queue.qsize()
+
+    assert asyncio.run(run()) == (1, 0)
+
+
+def test_resume_replays_missed_events():
+    async def run():
+        broker = EventBroker()
+        first = broker.publish("owner", "applicant.created", {"id": "1"})
+        broker.publish("other", "applicant.created", {"id": "x"})
+        broker.publish("owner", "applicant.scored", {"id": "1", "ai_score": 80})
+        broker.publish("owner", "applicant.status_changed", {"ids": ["1"], "status": "rejected"})
+        _, backlog = broker.subscribe("owner", first.id)
+        return backlog
+
+    backlog = asyncio.run(run())
+    assert [e.type for e in backlog] == ["applicant.scored", "applicant.status_changed"]
+
+
+def test_unrecoverable_gap_sends_reset():
+    async def run():
+        broker = EventBroker(buffer_size=2)
+        first = broker.publish("owner", "applicant.created", {"id": "1"})
+        for i in range(3):
+            broker.publish("owner", "applicant.created", {"id": str(i)})
+        _, evicted = broker.subscribe("owner", first.id)
+        _, restarted = broker.subscribe("owner", "0ldepoch-7")
+        _, garbage = broker.subscribe("owner", "not-an-id")
+        return evicted, restarted, garbage
+
+    for backlog in asyncio.run(run()):
+        assert [e.type for e in backlog] == [RESET]
+
+
+def test_idle_and_excess_channels_are_dropped(monkeypatch):
+    clock = [0.0]
+    monkeypatch.setattr(events, "time", SimpleNamespace(monotonic=lambda: clock[0]))
+    broker = EventBroker(channel_ttl=60, max_channels=2)
+    first = broker.publish("owner-a", "applicant.created", {"id": "1"})
+    broker.publish("owner-b", "applicant.created", {"id": "2"})
+    broker.publish("owner-c", "applicant.created", {"id": "3"})  # over the cap: owner-a goes
+    assert broker.channel_count() == 2
+    clock[0] = 61
+    broker.publish("owner-c", "applicant.scored", {"id": "3"})  # owner-b idle past the TTL
+    assert broker.channel_count() == 1
+
+    async def resume():
+        return broker.subscribe("owner-a", first.id)[1]
+
+    assert [e.type for e in asyncio.run(resume())] == [RESET]  # its missed events are gone
+
+
+def test_stream_subscribes_only_while_streaming():
+    async def run():
+        never_started = event_stream("owner-gone")  # the client left before the response started
+        await never_started.aclose()
+        stream = event_stream("owner-gone")
+        await stream.__anext__()
+        during = event_broker.subscriber_count("owner-gone")
+        await stream.aclose()
+        return during, event_broker.subscriber_count("owner-gone")
+
+    assert asyncio.run(run()) == (1, 0)
+
+
+def test_stream_delivers_events_from_worker_threads():
+    async def run():
+        stream = event_stream("owner-stream", heartbeat=0.05)
+        chunks = [await stream.__anext__()]  # retry hint (subscribes)
+
+        worker = threading.Thread(target=event_broker.publish, args=("owner-stream", "applicant.scored", {"id": "1", "ai_score": 91}))
+        worker.start()
+        worker.join()
+        chunks.append(await stream.__anext__())
+        chunks.append(await stream.__anext__())  # idle: keep-alive comment
+        await stream.aclose()
+        return chunks, event_broker.subscriber_count("owner-stream")
+
+    chunks, remaining = asyncio.run(run())
+    assert chunks[0].startswith("retry:")
+    assert "event: applicant.scored\n" in chunks[1] and '"ai_score": 91' in chunks[1]
+    assert chunks[2] == ": keep-alive\n\n"
+    assert remaining == 0  # closing the stream unsubscribes
+
+
+def test_slow_client_is_disconnected():
+    async def run():
+        subscription = Subscription("owner", asyncio.get_running_loop())
+        limit, events.EVENT_QUEUE_SIZE = events.EVENT_QUEUE_SIZE, 2
+        try:
+            for i in range(5):
+                subscription._put(events.Event(f"e-{i}", i, "applicant.created", {}))
+        finally:
+            events.EVENT_QUEUE_SIZE = limit
+        return [subscription.queue.get_nowait() for _ in range(subscription.queue.qsize())]
+
+    queued = asyncio.run(run())
+    assert len(queued) == 3 and queued[-1] is None  # the stream ends; the client resumes
+
+
+def test_stream_tokens_are_kept_out_of_access_logs():
+    record = logging.LogRecord("uvicorn.access", logging.INFO, __file__, 0, '%s - "%s %s HTTP/%s" %d',
+                               ("127.0.0.1:5000", "GET", "/organizations/events?access_token=eyJ.secret&last_event_id=a-1",
+                                "1.1", 200), None)
+    assert AccessTokenLogFilter().filter(record)
+    assert "secret" not in record.getMessage()
+    assert "/organizations/events?access_token=[redacted]&last_event_id=a-1" in record.getMessage()
@@ -0,0 +1,64 @@
+"""
+Import-Time Budget Tests
+`import main` is the cold start of every new container, so it must not
+import the heavy optional libraries (pypdf, python-magic, resend, the full
+supabase client) or create any client: those are loaded by the app
+lifespan or on first use. Each measurement runs in a fresh interpreter.
+
+IMPORT_TIME_BUDGET (seconds, default 1.0) is the regression threshold for
+the best of IMPORT_TIME_RUNS imports; raise it on slow CI machines.
+"""
+
+import json
+import os
+import subprocess
+import sys
+
+IMPORT_TIME_BUDGET = float(os.getenv("IMPORT_TIME_BUDGET", "1.0"))
+IMPORT_TIME_RUNS = 3
+
+LAZY_MODULES = ["pypdf", "magic", "resend", "supabase"]
+
+PROBE = """
+import json, sys, time
+started = time.perf_counter()
+import main
+elapsed = time.perf_counter() - started
+import database, llm_gateway
+print(json.dumps({
+    "seconds": elapsed,
+    "loaded": [m for m in %r if m in sys.modules],
+    "clients": [name for name, client in (
+        ("supabase", database._supabase),
+        ("async_supabase", database._async_supabase),
+        ("llm_gateway", llm_gateway._gateway),
+    ) if client is not None],
+}))
+""" % (LAZY_MODULES,)
+
+
+def probe_import() -> dict:
+    env = dict(os.environ)
+    env.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+    env.setdefault("SUPABASE_KEY", "test-key")
+    out = subprocess.run(
+        [sys.executable, "-c", PROBE], cwd=os.path.dirname(os.path.abspath(__file__)),
+        env=env, capture_output=True, text=True, check=True
+    ).stdout
+    return json.loads(out.strip().splitlines()[-1])
+
+
+def test_import_loads_no_heavy_modules():
+    result = probe_import()
+    assert result["loaded"] == [], f"imported at startup: {result['loaded']}"
+
+
+def test_import_creates_no_clients():
+    result = probe_import()
+    assert result["clients"] == [], f"created at import: {result['clients']}"
+
+
+def test_import_time_within_budget():
+    best = min(probe_import()["seconds"] for _ in range(IMPORT_TIME_RUNS))
+    print(f"import main: {best * 1000:.0f} ms (budget {IMPORT_TIME_BUDGET * 1000:.0f} ms)")
+    assert best <= IMPORT_TIME_BUDGET, f"import main took {best:.2f}s, budget {IMPORT_TIME_BUDGET:.2f}s"
@@ -0,0 +1,104 @@
+"""
+LLM outage fallbacks against a local fake PostgREST and an unreachable LLM:
+failed CV scoring goes to the retry state (never a 0 score), and policy chat
+serves a stale earlier answer or quotes the most relevant policy passages.
+"""
+
+import pytest
+
+import agent
+from conftest import StubReply
+from llm_gateway import LLMGateway
+from services import ai_service, policy_service
+
+STALE_ROW = {"query": "berapa hari cuti tahunan?", "answer": "Cuti tahunan 12 hari.", "reasoning": "Pasal 3.1",
+             "created_at": "2026-09-01T08:00:00+00:00", "similarity": 0.8}
+POLICY_TEXT = """Pasal 1 Jam Kerja
+Jam kerja kantor adalah 09.00 sampai 17.00, Senin sampai Jumat.
+Pasal 2 Lembur
+Lembur harus disetujui atasan langsung sebelum dikerjakan.
+Pasal 3 Cuti
+Karyawan tetap berhak atas cuti tahunan 12 hari kerja setelah masa kerja 12 bulan.
+"""
+
+
+def route(server, request):
+    return StubReply(server.stale_rows if request.table == "similar_policy_answer" else [])
+
+
+@pytest.fixture
+def server(fake_postgrest, monkeypatch):
+    # Nothing listens on port 9: every LLM call fails at once
+    down = LLMGateway(base_url="http://127.0.0.1:9/v1", api_key="test-key", max_retries=0)
+    monkeypatch.setattr(agent, "get_llm_gateway", lambda: down)
+    monkeypatch.setattr(policy_service, "get_llm_gateway", lambda: down)
+    return fake_postgrest(route, stale_rows=[])
+
+
+def test_failed_scoring_is_queued_for_retry_not_zero(server):
+    ai_service.process_ai_score("app-1", "Ada", "ada@example.com", "Senior engineer. Python, SQL. " * 5)
+    request = server.requests[-1]
+    body = request.body
+    assert (request.method, request.path) == ("PATCH", "/rest/v1/applicants")
+    assert "ai_score" not in body
+    assert body["scoring_status"] == "retry" and body["scoring_attempts"] == 1
+    assert body["next_scoring_at"] and body["ai_reasoning"] == ai_service.RETRY_REASONING
+
+    server.requests.clear()
+    ai_service.process_ai_score("app-1", "Ada", "ada@example.com", "Senior engineer. Python, SQL. " * 5,
+                                attempts=ai_service.SCORING_MAX_ATTEMPTS - 1)
+    body = server.requests[-1].body
+    assert body["scoring_status"] == "failed" and body["next_scoring_at"] is None
+
+
+def test_late_retry_scores_without_touching_the_decision(server, monkeypatch):
+    monkeypatch.setattr(ai_service, "score_candidate", lambda *args: {"score": 77, "reasoning": "Fits."})
+    ai_service.process_ai_score("app-1", "Ada", "ada@example.com", "Senior engineer. Python, SQL. " * 5, attempts=3)
+    body = server.requests[-1].body
+    assert "status" not in body  # HR may have accepted or rejected meanwhile
+    assert body["ai_score"] == 77 and body["scoring_status"] is None
+    assert body["scoring_attempts"] == 0 and body["next_scoring_at"] is None
+
+
+def test_policy_chat_serves_a_stale_answer(server):
+    server.stale_rows = [STALE_ROW]
+    result = policy_service.fallback_answer("user-1", "cuti tahunan berapa hari?", POLICY_TEXT)
+    assert result["answer"] == "Cuti tahunan 12 hari."
+    assert result["stale"] is True and result["source"] == "stale"
+    assert "2026-09-01" in result["notice"]
+    log = server.requests[-1]
+    assert log.path == "/rest/v1/policy_logs" and log.body["source"] == "stale" and log.body["personalized"] is False
+
+
+def test_policy_chat_quotes_relevant_policy_without_a_stale_answer(server, monkeypatch):
+    monkeypatch.setattr(policy_service, "extract_text_from_policies", lambda: POLICY_TEXT)
+    result = policy_service.answer_policy_question("user-1", "Berapa hari cuti tahunan saya?")
+    assert result["source"] == "retrieval" and result["stale"] is True
+    assert "cuti tahunan 12 hari kerja" in result["answer"]
+    assert [r.path for r in server.requests] == ["/rest/v1/rpc/similar_policy_answer", "/rest/v1/policy_logs"]
+
+
+def test_stale_answers_about_an_employee_are_scoped_to_that_employee(server, monkeypatch):
+    monkeypatch.setattr(policy_service, "extract_text_from_policies", lambda: POLICY_TEXT)
+    employee = {"id": "emp-b", "name": "Budi", "role": "Engineer", "leave_remaining": 3, "join_date": None}
+    policy_service.answer_policy_question("user-1", "Berapa sisa cuti saya?", employee_context=employee)
+    lookup = server.requests[0]
+    assert lookup.table == "similar_policy_answer"
+    assert lookup.body["p_user_id"] == "user-1" and lookup.body["p_employee_id"] == "emp-b"
+
+
+def test_personalized_answers_are_logged_with_the_employee(server):
+    policy_service.log_answer("user-1", "Berapa sisa cuti saya?", {"answer": "3 hari."}, employee_id="emp-b")
+    policy_service.log_answer("user-1", "Jam kerja kantor?", {"answer": "09.00-17.00."})
+    personal, general = (r.body for r in server.requests)
+    assert personal["personalized"] is True and personal["employee_id"] == "emp-b"
+    assert general["personalized"] is False and general["employee_id"] is None
+
+
+def test_top_policy_chunks_rank_by_shared_rare_terms():
+    padding = "Ketentuan umum berlaku bagi seluruh karyawan perusahaan. " * 12
+    text = "\n".join(f"{line}\n{padding}" for line in POLICY_TEXT.splitlines() if not line.startswith("Pasal"))
+    assert len(policy_service.policy_chunks(text)) == 3
+    top = policy_service.top_policy_chunks("kapan lembur harus disetujui atasan?", text)
+    assert top[0].startswith("Lembur harus disetujui") and len(top) <= policy_service.POLICY_FALLBACK_CHUNKS
+    assert policy_service.top_policy_chunks("asuransi kesehatan", text) == []
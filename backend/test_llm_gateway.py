@@ -0,0 +1,143 @@
+"""
+LLM gateway checks against a local fake OpenAI-compatible server: retries
+on 429/5xx, deadlines, the circuit breaker failing fast, the concurrency
+cap, and per-feature token counters (also exported to /metrics).
+"""
+
+import threading
+import time
+
+import pytest
+
+import metrics
+from conftest import StubReply
+from llm_gateway import CircuitBreaker, LLMError, LLMGateway, LLMUnavailable
+
+MESSAGES = [{"role": "user", "content": "Score this CV as JSON."}]
+
+
+def openai_route(server, request):
+    """POST /v1/chat/completions: replies from server.script, then succeeds."""
+    status, delay = server.script.pop(0) if server.script else (200, 0)
+    if status != 200:
+        headers = {"Retry-After": "0"} if status == 429 else {}
+        return StubReply({"error": {"message": "try again"}}, status, headers, delay)
+    return StubReply({
+        "choices": [{"message": {"role": "assistant", "content": '{"score": 82, "reasoning": "Fits."}'}}],
+        "usage": {"prompt_tokens": 120, "completion_tokens": 15}
+    }, delay=delay)
+
+
+@pytest.fixture
+def server(stub_server):
+    return stub_server(openai_route, script=[])
+
+
+@pytest.fixture
+def make_gateway(server):
+    def make(**kwargs) -> LLMGateway:
+        options = dict(base_url=f"{server.url}/v1", api_key="test-key", deadline=2, max_retries=3, backoff_base=0.01)
+        options.update(kwargs)
+        return LLMGateway(**options)
+
+    return make
+
+
+def test_retries_transient_errors_and_counts_tokens(server, make_gateway):
+    gateway = make_gateway()
+    server.script.extend([(429, 0), (503, 0)])
+    prompt_tokens = metrics.LLM_TOKENS.value(feature="cv_scoring", kind="prompt")
+    ok_calls = metrics.LLM_DURATION.count(feature="cv_scoring", outcome="ok")
+    assert gateway.chat_json("cv_scoring", MESSAGES) == {"score": 82, "reasoning": "Fits."}
+
+    request = server.requests[-1]
+    body = request.body
+    assert len(server.requests) == 3
+    assert request.path == "/v1/chat/completions" and request.headers["Authorization"] == "Bearer test-key"
+    assert body["response_format"] == {"type": "json_object"} and body["temperature"] == 0
+    stats = gateway.stats()["features"]["cv_scoring"]
+    assert stats["calls"] == 1 and stats["retries"] == 2 and stats["failures"] == 0
+    assert stats["prompt_tokens"] == 120 and stats["completion_tokens"] == 15
+    assert metrics.LLM_TOKENS.value(feature="cv_scoring", kind="prompt") == prompt_tokens + 120
+    assert metrics.LLM_DURATION.count(feature="cv_scoring", outcome="ok") == ok_calls + 1
+
+
+def test_client_errors_are_not_retried(server, make_gateway):
+    gateway = make_gateway()
+    server.script.append((400, 0))
+    try:
+        gateway.chat("policy_chat", MESSAGES)
+        assert False, "expected LLMError"
+    except LLMError as e:
+        assert "400" in str(e)
+    assert len(server.requests) == 1
+
+
+def test_rejected_requests_do_not_open_the_breaker(server, make_gateway):
+    gateway = make_gateway(max_retries=0, breaker=CircuitBreaker(threshold=2, reset_after=60))
+    server.script.extend([(400, 0)] * 3)  # e.g. prompts over the context window
+    for _ in range(3):
+        with pytest.raises(LLMError) as raised:
+            gateway.chat("policy_chat", MESSAGES)
+        assert not isinstance(raised.value, LLMUnavailable)
+    assert gateway.stats()["breaker"] == "closed"
+    assert gateway.chat("cv_scoring", MESSAGES)  # other features are unaffected
+
+
+def test_deadline_bounds_a_hanging_provider(server, make_gateway):
+    gateway = make_gateway(deadline=0.3)
+    server.script.extend([(200, 1.0)] * 3)
+    started = time.monotonic()
+    try:
+        gateway.chat("cv_scoring", MESSAGES)
+        assert False, "expected LLMError"
+    except LLMError:
+        pass
+    assert time.monotonic() - started < 0.6
+
+
+def test_breaker_fails_fast_then_recovers(server, make_gateway):
+    gateway = make_gateway(max_retries=0, breaker=CircuitBreaker(threshold=2, reset_after=0.2))
+    server.script.extend([(500, 0), (500, 0)])
+    for _ in range(2):
+        try:
+            gateway.chat("cv_scoring", MESSAGES)
+        except LLMError:
+            pass
+    assert gateway.stats()["breaker"] == "open"
+
+    try:
+        gateway.chat("cv_scoring", MESSAGES)
+        assert False, "expected LLMUnavailable"
+    except LLMUnavailable:
+        pass
+    assert len(server.requests) == 2  # rejected without a request
+    assert gateway.stats()["features"]["cv_scoring"]["rejected"] == 1
+
+    time.sleep(0.25)  # half-open: one trial call closes the circuit again
+    assert gateway.chat("cv_scoring", MESSAGES)
+    assert gateway.stats()["breaker"] == "closed"
+
+
+def test_concurrency_cap(server, make_gateway):
+    gateway = make_gateway(max_concurrency=1, deadline=0.2)
+    server.script.append((200, 0.5))
+    results = []
+
+    def call():
+        try:
+            results.append(gateway.chat("policy_chat", MESSAGES, deadline=1.0))
+        except LLMError as e:
+            results.append(e)
+
+    slow = threading.Thread(target=call)
+    slow.start()
+    time.sleep(0.05)
+    try:
+        gateway.chat("policy_chat", MESSAGES)  # waits up to 0.2s for the only slot
+        assert False, "expected LLMUnavailable"
+    except LLMUnavailable:
+        pass
+    slow.join()
+    assert isinstance(results[0], str) and len(server.requests) == 1
+
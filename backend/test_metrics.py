@@ -0,0 +1,104 @@
+"""
+Metrics Tests
+Prometheus text rendering, histogram buckets, and the per-request
+Server-Timing header (including timings recorded in threadpool calls).
+"""
+
+import time
+
+from fastapi import FastAPI
+from fastapi.responses import Response
+from fastapi.testclient import TestClient
+from starlette.concurrency import run_in_threadpool
+
+import metrics
+from metrics import Counter, Histogram, add_timing, metrics_middleware, server_timing, timed
+
+
+def test_histogram_buckets_are_cumulative():
+    hist = Histogram("test_seconds", "Test.", ("route",), buckets=(0.1, 1.0), registry=[])
+    for value in (0.05, 0.1, 0.5, 3.0):
+        hist.observe(value, route="/a")
+
+    lines = hist.render()
+    assert 'test_seconds_bucket{route="/a",le="0.1"} 2' in lines
+    assert 'test_seconds_bucket{route="/a",le="1.0"} 3' in lines
+    assert 'test_seconds_bucket{route="/a",le="+Inf"} 4' in lines
+    assert 'test_seconds_count{route="/a"} 4' in lines
+    assert 'test_seconds_sum{route="/a"} 3.65' in lines
+    assert lines[:2] == ["# HELP test_seconds Test.", "# TYPE test_seconds histogram"]
+
+
+def test_counter_renders_total_and_escapes_labels():
+    counter = Counter("test_events", "Test.", ("cache", "result"), registry=[])
+    counter.inc(cache='say "hi"\n', result="hit")
+    counter.inc(2, cache='say "hi"\n', result="hit")
+
+    assert counter.render()[-1] == 'test_events_total{cache="say \\"hi\\"\\n",result="hit"} 3'
+
+
+def test_server_timing_header_format():
+    header = server_timing({"db": [0.0412, 3], "pdf": [0.085, 1], "llm": [1.5, 2]}, 0.1603, 3)
+    assert header == 'db;dur=41.2;desc="3 queries", pdf;dur=85.0, llm;dur=1500.0;desc="2 calls", app;dur=160.3'
+
+
+def make_client():
+    app = FastAPI()
+    app.middleware("http")(metrics_middleware)
+
+    def extract():
+        with timed(metrics.EXTRACTION_DURATION, "pdf", step="pdf"):
+            time.sleep(0.01)
+
+    @app.get("/items/{item_id}")
+    async def item(item_id: str):
+        await run_in_threadpool(extract)
+        add_timing("db", 0.002)
+        return {"id": item_id}
+
+    @app.get("/metrics")
+    def scrape():
+        return Response(metrics.render(), media_type=metrics.CONTENT_TYPE)
+
+    return TestClient(app)
+
+
+def test_request_gets_server_timing_and_route_histogram():
+    pdf_before = metrics.EXTRACTION_DURATION.count(step="pdf")
+    with make_client() as client:
+        res = client.get("/items/42")
+        missing = client.get("/nope")
+        scrape = client.get("/metrics")
+
+    timing = dict(entry.split(";", 1) for entry in res.headers["Server-Timing"].split(", "))
+    assert set(timing) == {"pdf", "db", "app"}
+    assert float(timing["pdf"].split("=")[1]) >= 10.0
+    assert metrics.EXTRACTION_DURATION.count(step="pdf") == pdf_before + 1
+
+    # Route templates, not raw paths, so label cardinality stays bounded
+    assert metrics.REQUEST_DURATION.count(method="GET", route="/items/{item_id}", status=200) >= 1
+    assert missing.status_code == 404
+    assert metrics.REQUEST_DURATION.count(method="GET", route=metrics.UNMATCHED_ROUTE, status=404) >= 1
+
+    assert scrape.headers["Content-Type"] == metrics.CONTENT_TYPE
+    assert 'http_request_duration_seconds_bucket{method="GET",route="/items/{item_id}",status="200",le="+Inf"}' in scrape.text
+    assert "# TYPE cv_extraction_duration_seconds histogram" in scrape.text
+
+
+def test_timings_outside_requests_are_ignored():
+    add_timing("db", 1.0)  # background tasks have no request: no error, nothing recorded
+    with timed(metrics.DB_QUERY_DURATION, "db"):
+        pass
+
+
+def test_metrics_endpoint_needs_the_token(monkeypatch):
+    import main
+
+    client = TestClient(main.app)  # no lifespan: no clients or warm-up
+    monkeypatch.setattr(main, "METRICS_TOKEN", None)
+    assert client.get("/metrics").status_code == 404  # off unless configured
+
+    monkeypatch.setattr(main, "METRICS_TOKEN", "scrape-secret")
+    assert client.get("/metrics").status_code == 401
+    res = client.get("/metrics", headers={"Authorization": "Bearer scrape-secret"})
+    assert res.status_code == 200 and "# TYPE http_request_duration_seconds histogram" in res.text
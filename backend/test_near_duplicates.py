@@ -0,0 +1,67 @@
+"""
+Near-duplicate CV detection checks: MinHash similarity of edited and
+unrelated CVs, project-scoped LSH band keys, short-text densification, and
+the minimum length for linking.
+"""
+
+import random
+
+from near_duplicates import (
+    NEAR_DUPLICATE_MIN_SHINGLES, SHINGLE_SIZE, SIGNATURE_SIZE, band_keys, best_match, estimate_similarity,
+    minhash_signature, shingles
+)
+
+WORDS = ("python backend engineer built services postgres kafka deployed kubernetes led team "
+         "migrated monolith reduced latency designed api owned on-call improved test coverage "
+         "mentored interns shipped payments platform analytics pipeline").split()
+
+
+def make_cv(seed: int, words: int = 600) -> str:
+    rng = random.Random(seed)
+    return " ".join(rng.choice(WORDS) + str(rng.randint(0, 50)) for _ in range(words))
+
+
+CV = make_cv(1)
+
+
+def test_edited_cv_is_a_near_duplicate():
+    words = CV.split()
+    edited = " ".join(words[:300] + ["Updated", "phone:", "+62", "812", "555"] + words[300:-4]).upper()
+    a, b = minhash_signature(CV), minhash_signature(edited)
+    assert len(a) == SIGNATURE_SIZE
+    assert estimate_similarity(a, b) >= 0.9
+    # Case, punctuation and spacing do not matter
+    assert minhash_signature(CV.replace(" ", " ,\n ")) == a
+
+
+def test_unrelated_cv_is_not_matched():
+    a, b = minhash_signature(CV), minhash_signature(make_cv(2))
+    assert estimate_similarity(a, b) < 0.1
+    candidates = [{"applicant_id": "other", "signature": b}, {"applicant_id": "self", "signature": a}]
+    row, score = best_match(a, candidates, threshold=0.9)
+    assert row["applicant_id"] == "self" and score == 1.0
+    assert best_match(a, candidates[:1], threshold=0.9) is None
+
+
+def test_band_keys_are_project_scoped():
+    sig = minhash_signature(CV)
+    keys = band_keys("project-a", sig)
+    assert keys == band_keys("project-a", list(sig))
+    assert not set(keys) & set(band_keys("project-b", sig))
+    assert all(-2 ** 63 <= key < 2 ** 63 for key in keys)  # Postgres bigint
+
+
+def test_short_texts_are_densified():
+    assert minhash_signature("", min_shingles=1) is None
+    assert shingles("Senior Python Engineer") == {"senior python engineer"}
+    sig = minhash_signature("Senior Python Engineer", min_shingles=1)
+    assert len(sig) == SIGNATURE_SIZE and len(set(sig)) == 1  # one shingle fills every bin
+    assert estimate_similarity(sig, minhash_signature("senior  python engineer!", min_shingles=1)) == 1.0
+
+
+def test_short_cvs_are_never_linked():
+    def text(shingle_count: int) -> str:
+        return " ".join(f"word{i}" for i in range(shingle_count + SHINGLE_SIZE - 1))
+
+    assert minhash_signature(text(NEAR_DUPLICATE_MIN_SHINGLES - 1)) is None
+    assert len(minhash_signature(text(NEAR_DUPLICATE_MIN_SHINGLES))) == SIGNATURE_SIZE
@@ -0,0 +1,63 @@
+"""
+Keyset pagination helper checks: cursor round trips and validation, the
+PostgREST `or` filters each sort order pages with, and search term cleanup.
+"""
+
+import pytest
+from fastapi import HTTPException
+
+from pagination import (
+    created_keyset_filter, decode_cursor, encode_cursor, name_keyset_filter, next_cursor,
+    score_keyset_filter, search_filter
+)
+
+
+def test_cursor_round_trip_is_url_safe():
+    cursor = encode_cursor(["2024-01-01T00:00:00+00:00", "a/b?c"])
+    assert "=" not in cursor and "/" not in cursor and "+" not in cursor
+    assert decode_cursor(cursor, 2) == ["2024-01-01T00:00:00+00:00", "a/b?c"]
+
+
+@pytest.mark.parametrize("cursor", ["not-base64!", encode_cursor([1]), encode_cursor({"a": 1})])
+def test_malformed_cursors_are_rejected(cursor):
+    with pytest.raises(HTTPException) as exc:
+        decode_cursor(cursor, 2)
+    assert exc.value.status_code == 400
+
+
+def test_score_filter_puts_unscored_rows_last():
+    assert score_keyset_filter(encode_cursor([80, "id-1"])) == (
+        'ai_score.lt.80,and(ai_score.eq.80,id.lt."id-1"),ai_score.is.null'
+    )
+    # Past the last scored row only unscored rows remain
+    assert score_keyset_filter(encode_cursor([None, "id-1"]), "relevance_score") == (
+        'and(relevance_score.is.null,id.lt."id-1")'
+    )
+    with pytest.raises(HTTPException):
+        score_keyset_filter(encode_cursor(["80);drop", "id-1"]))
+
+
+def test_keyset_filters_quote_values():
+    assert created_keyset_filter(encode_cursor(["2024-01-01T00:00:00+00:00", "id-1"])) == (
+        'created_at.lt."2024-01-01T00:00:00+00:00",'
+        'and(created_at.eq."2024-01-01T00:00:00+00:00",id.lt."id-1")'
+    )
+    assert name_keyset_filter(encode_cursor(['Smith, "Jo"', "id-1"])) == (
+        'name.gt."Smith, \\"Jo\\"",and(name.eq."Smith, \\"Jo\\"",id.gt."id-1")'
+    )
+
+
+def test_search_filter_strips_filter_syntax():
+    assert search_filter(" ada,(x)* ", ("name", "email")) == "name.ilike.*adax*,email.ilike.*adax*"
+    assert search_filter("(*)", ("name",)) is None
+
+
+def test_search_filter_strips_like_wildcards():
+    assert search_filter("ada_l%", ("name",)) == "name.ilike.*adal*"
+    assert search_filter("_", ("name",)) is None and search_filter(" % ", ("name",)) is None
+
+
+def test_next_cursor_only_when_a_row_is_left_over():
+    rows = [{"name": n, "id": i} for i, n in enumerate("abc")]
+    assert next_cursor(rows, 3, ("name", "id")) is None
+    assert decode_cursor(next_cursor(rows, 2, ("name", "id")), 2) == ["b", 1]
@@ -0,0 +1,144 @@
+"""
+Rate limiter backend and middleware checks.
+Runs without Supabase: the Redis backend runs its Lua script on a real
+Redis (TEST_REDIS_URL) or on fakeredis with Lua, and is skipped without
+either; SQLite runs against a temp file shared by several worker processes.
+"""
+
+import multiprocessing
+import os
+import tempfile
+import uuid
+from concurrent.futures import ThreadPoolExecutor
+
+import pytest
+from fastapi import FastAPI
+from fastapi.testclient import TestClient
+
+import rate_limiter
+from rate_limit_backends import SlidingWindowCounter, SQLiteRateLimitBackend, RedisRateLimitBackend
+
+LIMIT = 10
+WINDOW = 3600
+NOW = 1_700_000_000.0
+
+
+def test_memory_backend_limits_and_evicts():
+    backend = SlidingWindowCounter(capacity=100)
+    allowed = sum(backend.hit("ip:a", LIMIT, WINDOW, NOW) for _ in range(LIMIT + 5))
+    assert allowed == LIMIT
+    for i in range(500):
+        backend.hit(f"ip:{i}", LIMIT, WINDOW, NOW)
+    assert len(backend) == 100
+
+
+@pytest.fixture
+def redis_backend(redis_url):
+    backend = RedisRateLimitBackend(redis_url, prefix=f"test-rl:{uuid.uuid4().hex}:")
+    yield backend
+    backend.clear()
+
+
+def test_redis_backend_limits_across_windows(redis_backend):
+    backend = redis_backend
+    allowed = sum(backend.hit("ip:b", LIMIT, WINDOW, NOW) for _ in range(LIMIT + 5))
+    assert allowed == LIMIT
+    # Early in the next window the previous one still weighs ~10 requests
+    next_window = NOW - NOW % WINDOW + WINDOW + 1
+    assert sum(backend.hit("ip:b", LIMIT, WINDOW, next_window) for _ in range(5)) == 1
+
+
+def test_redis_backend_concurrent_hits_are_atomic(redis_backend):
+    with ThreadPoolExecutor(max_workers=16) as pool:
+        allowed = sum(pool.map(lambda _: redis_backend.hit("ip:c", LIMIT, WINDOW, NOW), range(LIMIT * 4)))
+    assert allowed == LIMIT
+    # Rejected requests leave the counter alone; it expires after two windows
+    client = redis_backend.client
+    keys = list(client.scan_iter(f"{redis_backend.prefix}ip:c:*"))
+    assert [int(client.get(key)) for key in keys] == [LIMIT]
+    assert 0 < client.ttl(keys[0]) <= 2 * WINDOW
+
+
+@pytest.fixture(params=["memory", "sqlite", "redis"])
+def any_backend(request):
+    if request.param == "memory":
+        return SlidingWindowCounter()
+    if request.param == "sqlite":
+        return SQLiteRateLimitBackend(os.path.join(tempfile.mkdtemp(), "rate_limits.db"))
+    return request.getfixturevalue("redis_backend")
+
+
+def test_rejected_request_uses_up_no_limit(any_backend):
+    checks = [("ip:d", LIMIT, WINDOW), ("project:p", 2, WINDOW)]
+    assert [any_backend.hit_all(checks, NOW) for _ in range(3)] == [None, None, 1]
+    # The per-IP limit only counted the two admitted requests
+    assert sum(any_backend.hit("ip:d", LIMIT, WINDOW, NOW) for _ in range(LIMIT)) == LIMIT - 2
+
+
+def _sqlite_worker(path, results):
+    backend = SQLiteRateLimitBackend(path)
+    results.put(sum(backend.hit("ip:shared", LIMIT, WINDOW, NOW) for _ in range(LIMIT)))
+
+
+def test_sqlite_backend_shared_across_processes():
+    path = os.path.join(tempfile.mkdtemp(), "rate_limits.db")
+    SQLiteRateLimitBackend(path)  # create schema once
+    results = multiprocessing.Queue()
+    workers = [multiprocessing.Process(target=_sqlite_worker, args=(path, results)) for _ in range(4)]
+    for w in workers:
+        w.start()
+    for w in workers:
+        w.join()
+    total = sum(results.get() for _ in workers)
+    # 4 workers x 10 attempts, but only one shared limit's worth gets through
+    assert total == LIMIT, total
+
+
+def make_app():
+    app = FastAPI()
+    app.middleware("http")(rate_limiter.rate_limit_middleware)
+
+    @app.post("/apply")
+    def apply():
+        return {"status": "ok"}
+
+    @app.get("/policy/chat")
+    def chat():
+        return {"answer": "ok"}
+
+    return app
+
+
+def test_middleware_returns_429_with_retry_after():
+    rate_limiter.rate_limit_store.clear()
+    client = TestClient(make_app())
+    codes = [client.post("/apply").status_code for _ in range(rate_limiter.RATE_LIMIT_PER_IP + 1)]
+    assert codes[:-1] == [200] * rate_limiter.RATE_LIMIT_PER_IP
+    res = client.post("/apply")
+    assert res.status_code == 429
+    assert int(res.headers["Retry-After"]) > 0
+
+
+def test_middleware_runs_blocking_backends_in_threadpool(monkeypatch):
+    path = os.path.join(tempfile.mkdtemp(), "rate_limits.db")
+    monkeypatch.setattr(rate_limiter, "rate_limit_store", SQLiteRateLimitBackend(path))
+    client = TestClient(make_app())
+    codes = [client.post("/apply", headers={"X-Project-ID": "p1"}).status_code
+             for _ in range(rate_limiter.RATE_LIMIT_PER_IP + 1)]
+    assert codes == [200] * rate_limiter.RATE_LIMIT_PER_IP + [429]
+
+
+def test_middleware_sheds_load_over_concurrency_cap():
+    rate_limiter.rate_limit_store.clear()
+    limiter = rate_limiter.concurrency_limiters["llm"]
+    client = TestClient(make_app())
+    limiter.in_flight = limiter.max_in_flight  # simulate saturated LLM slots
+    try:
+        res = client.get("/policy/chat")
+        assert res.status_code == 503
+        assert res.headers["Retry-After"] == str(rate_limiter.LOAD_SHED_RETRY_AFTER)
+    finally:
+        limiter.in_flight = 0
+    assert client.get("/policy/chat").status_code == 200
+    assert limiter.in_flight == 0
+
@@ -0,0 +1,55 @@
+"""
+Relevance pre-ranking checks: CVs that cover the project's requirements rank
+first, stored project vectors are reused until the project text changes, and
+the optional LLM gates hold back low-relevance applications.
+"""
+
+import relevance
+from relevance import build_project_vector, project_vector, score_relevance, llm_gate
+
+PROJECT = {
+    "id": "p1",
+    "description": "We build payroll software for Indonesian SMEs.",
+    "requirements": "3+ years Python, FastAPI, PostgreSQL. Docker and AWS a plus.",
+}
+FILLER = " delivered features on time" * 60
+
+
+def test_matching_cvs_rank_first():
+    vector = build_project_vector(PROJECT["description"], PROJECT["requirements"])
+    good = "Backend engineer: Python, FastAPI, PostgreSQL, Docker on AWS. Built payroll software." + FILLER
+    partial = "Frontend engineer: React, TypeScript, a little Python." + FILLER
+    unrelated = "Accountant: tax reporting, audit, Excel." + FILLER
+    scores = [score_relevance(cv, vector) for cv in (good, partial, unrelated)]
+    assert scores[0] > scores[1] > scores[2] >= 0
+    assert all(0 <= s <= 100 for s in scores)
+    # Stopwords and generic job-ad words carry no weight
+    assert "experience" not in vector["terms"] and "and" not in vector["terms"]
+
+
+def test_no_project_text_means_no_score():
+    assert build_project_vector(None, "") is None
+    assert score_relevance("Python developer", None) is None
+    assert llm_gate({"llm_min_relevance": 50}, None) is None
+
+
+def test_stored_vector_reused_until_text_changes():
+    stored = build_project_vector(PROJECT["description"], PROJECT["requirements"])
+    project = dict(PROJECT, relevance_vector=stored)
+    assert project_vector(project) is stored
+
+    relevance._vector_cache.clear()
+    edited = dict(project, requirements="Go and Kubernetes")  # stored vector is now stale
+    first = project_vector(edited)
+    assert first is not stored and "skill:Kubernetes" in first["terms"]
+    assert project_vector(edited) is first  # cached in-process
+    assert len(relevance._vector_cache) == 1
+
+
+def test_llm_gates():
+    assert llm_gate(PROJECT, 10) is None  # no gates configured
+    assert llm_gate(dict(PROJECT, llm_min_relevance=0, llm_top_n=0), 0) is None
+    assert "threshold of 40" in llm_gate(dict(PROJECT, llm_min_relevance=40), 39)
+    assert llm_gate(dict(PROJECT, llm_min_relevance=40), 40) is None
+    assert "top 20" in llm_gate(dict(PROJECT, llm_top_n=20), 70, higher_ranked=20)
+    assert llm_gate(dict(PROJECT, llm_top_n=20), 70, higher_ranked=19) is None
@@ -0,0 +1,59 @@
+"""
+Response layer checks: trusted rows keep endpoint headers, and compression
+applies only to complete bodies above the threshold.
+"""
+
+import os
+
+os.environ.setdefault("SUPABASE_URL", "http://127.0.0.1:54321")
+os.environ.setdefault("SUPABASE_KEY", "test-key")
+
+from fastapi import FastAPI, Response
+from fastapi.responses import StreamingResponse
+from fastapi.testclient import TestClient
+from responses import CompressionMiddleware, trusted_json
+
+ROWS = [{"id": i, "name": f"Candidate {i}", "email": f"c{i}@example.com"} for i in range(200)]
+
+
+def make_client() -> TestClient:
+    app = FastAPI()
+
+    @app.get("/rows")
+    async def rows(response: Response):
+        response.headers["X-Next-Cursor"] = "abc"
+        response.headers["ETag"] = '"v1"'
+        return trusted_json(ROWS, response)
+
+    @app.get("/small")
+    async def small():
+        return trusted_json({"ok": True})
+
+    @app.get("/events")
+    async def events():
+        async def stream():
+            for i in range(3):
+                yield f"data: {'x' * 1000}{i}\n\n"
+        return StreamingResponse(stream(), media_type="text/event-stream")
+
+    app.add_middleware(CompressionMiddleware, minimum_size=1024)
+    return TestClient(app)
+
+
+def test_large_body_is_gzipped_with_headers_kept():
+    client = make_client()
+    res = client.get("/rows", headers={"Accept-Encoding": "gzip"})
+    assert res.headers["Content-Encoding"] == "gzip"
+    assert int(res.headers["Content-Length"]) < len(res.content)  # content is decoded by the client
+    assert res.json() == ROWS
+    assert res.headers["X-Next-Cursor"] == "abc"
+    assert res.headers["ETag"] == 'W/"v1"'
+    assert "Accept-Encoding" in res.headers["Vary"]
+
+
+def test_small_streaming_and_identity_pass_through():
+    client = make_client()
+    assert "Content-Encoding" not in client.get("/small", headers={"Accept-Encoding": "gzip"}).headers
+    assert "Content-Encoding" not in client.get("/events", headers={"Accept-Encoding": "gzip"}).headers
+    res = client.get("/rows", headers={"Accept-Encoding": "identity"})
+    assert "Content-Encoding" not in res.headers and res.headers["ETag"] == '"v1"'
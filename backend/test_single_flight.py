@@ -0,0 +1,71 @@
+"""
+Single-flight coalescing checks: concurrent calls with one key run the work
+once and share its result or error; a caller that goes away does not cancel
+the work for the others.
+"""
+
+import asyncio
+
+from single_flight import SingleFlight
+
+
+def test_concurrent_duplicates_share_one_run():
+    flights = SingleFlight()
+    runs = []
+
+    async def work(key):
+        runs.append(key)
+        applicant_id = f"applicant-{len(runs)}"
+        await asyncio.sleep(0.01)
+        return {"id": applicant_id}
+
+    async def run():
+        calls = [flights.do(key, lambda key=key: work(key)) for key in ["a"] * 20 + ["b"]]
+        results = await asyncio.gather(*calls)
+        assert flights.in_flight() == 0
+        # Finished calls are forgotten: a later retry runs again
+        later, shared = await flights.do("a", lambda: work("a"))
+        return results, later, shared
+
+    results, later, shared = asyncio.run(run())
+    assert runs == ["a", "b", "a"]
+    assert [shared for _, shared in results] == [False] + [True] * 19 + [False]
+    assert {result["id"] for result, _ in results[:20]} == {"applicant-1"}
+    assert later == {"id": "applicant-3"} and not shared
+
+
+def test_errors_are_shared():
+    flights = SingleFlight()
+    runs = []
+
+    async def work():
+        runs.append(1)
+        await asyncio.sleep(0.01)
+        raise ValueError("Irrelevant content")
+
+    async def run():
+        return await asyncio.gather(*[flights.do("k", work) for _ in range(5)], return_exceptions=True)
+
+    errors = asyncio.run(run())
+    assert len(runs) == 1
+    assert all(isinstance(e, ValueError) for e in errors)
+
+
+def test_cancelled_caller_does_not_cancel_the_work():
+    flights = SingleFlight()
+
+    async def work():
+        await asyncio.sleep(0.02)
+        return "stored"
+
+    async def run():
+        first = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0)
+        second = asyncio.ensure_future(flights.do("k", work))
+        await asyncio.sleep(0.005)
+        first.cancel()  # the first client disconnected
+        result = await second
+        assert first.cancelled()
+        return result
+
+    assert asyncio.run(run()) == ("stored", True)
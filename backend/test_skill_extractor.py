@@ -0,0 +1,65 @@
+"""
+Local CV profile extraction checks: skill matching on whole tokens (with and
+without pyahocorasick), and experience from merged work-history date ranges.
+"""
+
+import datetime
+
+from skill_extractor import (
+    SKILL_TAXONOMY, SkillMatcher, _Automaton, extract_experience_years, extract_profile, skill_matcher
+)
+
+TODAY = datetime.date(2026, 10, 1)
+
+CV = """Jane Doe
+Summary
+Backend engineer, 6+ years of experience. Python and FastAPI daily; some JavaScript and C++.
+Experience
+Senior Engineer, Acme | Jan 2020 - Present
+Python, PostgreSQL, Docker, Kubernetes on AWS
+Engineer, Beta | 03/2017 – 12/2019
+Freelance web work 2018 to 2019 (Node.js, React)
+Education
+BSc Computer Science, 2012 - 2016
+Skills
+Git, SQL, Java
+"""
+
+
+def pure_python_matcher() -> SkillMatcher:
+    matcher = SkillMatcher.__new__(SkillMatcher)
+    patterns = {alias: skill for skill, aliases in SKILL_TAXONOMY.items() for alias in aliases}
+    matcher._iter = _Automaton(patterns).iter
+    return matcher
+
+
+def test_skills_match_whole_tokens_most_mentioned_first():
+    skills = skill_matcher.find(CV)
+    assert skills[0] == "Python"
+    assert {"Java", "JavaScript", "C++", "Node.js", "PostgreSQL", "Kubernetes"} <= set(skills)
+    # Substrings of other words are not skills
+    assert skill_matcher.find("Javanese cuisine, gosh, excellent rusty scalability") == []
+
+
+def test_pure_python_automaton_matches_pyahocorasick():
+    text = CV + " asp.net golang react native ci/cd pl/sql c# " * 3
+    assert pure_python_matcher().find(text) == skill_matcher.find(text)
+
+
+def test_experience_merges_overlapping_ranges_and_skips_education():
+    # Mar 2017 - Sep 2026 (the freelance years overlap), education ignored
+    assert extract_experience_years(CV, TODAY) == 9
+
+
+def test_experience_formats_and_fallback():
+    assert extract_experience_years("Staff Accountant\nMei 2021 - Sekarang", TODAY) == 5
+    assert extract_experience_years("Analyst 2015 - 2017\nLead 2019 – 2020", TODAY) == 5
+    assert extract_experience_years("I have 4 years of experience in sales", TODAY) == 4
+    assert extract_experience_years("Graduated in 2024", TODAY) is None
+
+
+def test_profile_columns():
+    profile = extract_profile(CV, TODAY)
+    assert profile["experience_years"] == 9
+    assert profile["key_skills"].startswith("Python, ")
+    assert extract_profile("", TODAY) == {"key_skills": None, "experience_years": None}
@@ -6,7 +6,7 @@ Rejects invalid files early to prevent wasted processing.
 
 from fastapi import UploadFile, HTTPException
 from typing import Tuple
-import magic  # python-magic for file type detection
+from metrics import EXTRACTION_DURATION, timed
 
 # Configuration
 MAX_FILE_SIZE = 5 * 1024 * 1024  # 5MB
@@ -83,8 +83,11 @@ def validate_mime_type(content: bytes) -> str:
     Raises:
         ValidationError: If MIME type is not allowed
     """
+    import magic  # python-magic, deferred: loads libmagic and its database
+
     try:
-        mime = magic.from_buffer(content, mime=True)
+        with timed(EXTRACTION_DURATION, "mime", step="mime"):
+            mime = magic.from_buffer(content, mime=True)
     except Exception as e:
         raise ValidationError(f"Could not detect file type: {str(e)}")
     
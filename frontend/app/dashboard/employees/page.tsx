@@ -6,6 +6,8 @@ import { createBrowserClient } from "@supabase/ssr";
 export default function EmployeesPage() {
   const [employees, setEmployees] = useState<any[]>([]);
   const [loading, setLoading] = useState(true);
+  const [search, setSearch] = useState("");
+  const [nextCursor, setNextCursor] = useState<string | null>(null);
   const [isModalOpen, setIsModalOpen] = useState(false);
   const [formData, setFormData] = useState({
     name: "",
@@ -21,10 +23,12 @@ export default function EmployeesPage() {
   );
 
   useEffect(() => {
-    fetchEmployees();
-  }, []);
+    // Debounce search-as-you-type
+    const timer = setTimeout(() => fetchEmployees(), search ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [search]);
 
-  async function fetchEmployees() {
+  async function fetchEmployees(cursor?: string) {
     setLoading(true);
     try {
       const {
@@ -33,14 +37,18 @@ export default function EmployeesPage() {
       const API_URL =
         process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000";
 
-      const res = await fetch(`${API_URL}/employees/`, {
+      const params = new URLSearchParams();
+      if (search.trim()) params.set("q", search.trim());
+      if (cursor) params.set("cursor", cursor);
+      const res = await fetch(`${API_URL}/employees/?${params}`, {
         headers: {
           Authorization: `Bearer ${session?.access_token}`,
         },
       });
       if (res.ok) {
         const data = await res.json();
-        setEmployees(data);
+        setEmployees((prev) => (cursor ? [...prev, ...data] : data));
+        setNextCursor(res.headers.get("X-Next-Cursor"));
       }
     } catch (err) {
       console.error("Error fetching employees:", err);
@@ -122,6 +130,14 @@ export default function EmployeesPage() {
         </button>
       </div>
 
+      <input
+        type="search"
+        value={search}
+        onChange={(e) => setSearch(e.target.value)}
+        placeholder="Search by name or email..."
+        className="w-full mb-4 px-4 py-2 border border-gray-200 rounded-lg text-sm focus:outline-none focus:ring-2 focus:ring-black"
+      />
+
       <div className="bg-white border border-gray-200 rounded-xl overflow-hidden shadow-sm">
         <table className="w-full text-left text-sm text-gray-600">
           <thead className="bg-gray-50 border-b border-gray-200 font-medium text-gray-900 uppercase tracking-wider text-xs">
@@ -134,7 +150,7 @@ export default function EmployeesPage() {
             </tr>
           </thead>
           <tbody className="divide-y divide-gray-100">
-            {loading ? (
+            {loading && employees.length === 0 ? (
               <tr>
                 <td
                   colSpan={5}
@@ -194,6 +210,18 @@ export default function EmployeesPage() {
         </table>
       </div>
 
+      {nextCursor && (
+        <div className="flex justify-center mt-4">
+          <button
+            onClick={() => fetchEmployees(nextCursor)}
+            disabled={loading}
+            className="px-4 py-2 text-sm font-medium border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loading ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
+
       {isModalOpen && (
         <div className="fixed inset-0 bg-black/50 flex items-center justify-center z-50">
           <div className="bg-white rounded-xl p-8 max-w-md w-full shadow-2xl">
@@ -2,7 +2,8 @@
 
 import { useEffect, useState } from "react";
 import useSWR from "swr";
-import { getProjects, getOrgApplicants } from "@/lib/api";
+import { useRecruitmentEvents } from "@/lib/events";
+import { getProjects, getRecentApplicants, getOrgStats } from "@/lib/api";
 import Link from "next/link";
 import { Users, FileText, CheckCircle, Clock, TrendingUp } from "lucide-react";
 
@@ -22,37 +23,34 @@ interface Applicant {
   created_at: string;
 }
 
+interface OrgStats {
+  total: number;
+  by_status: Record<string, number>;
+  projects: Record<string, { total: number; by_status: Record<string, number> }>;
+}
+
 export default function DashboardOverview() {
+  useRecruitmentEvents();
   const { data: projects = [] } = useSWR<Project[]>("projects", getProjects);
-  const { data: applicants = [] } = useSWR<Applicant[]>(
-    "applicants-overview",
-    getOrgApplicants,
-    { refreshInterval: 10000 }
+  // Newest first from the server; counts come from the stats endpoint
+  const { data: recentApplicants = [] } = useSWR<Applicant[]>(
+    "applicants-recent",
+    () => getRecentApplicants(5)
   );
+  const { data: orgStats } = useSWR<OrgStats>("org-stats", getOrgStats);
 
-  // Calculate statistics
+  const byStatus = orgStats?.by_status ?? {};
+  const count = (status: string) => byStatus[status] ?? 0;
   const stats = {
     totalProjects: projects.length,
     activeProjects: projects.filter((p) => p.is_active).length,
-    totalApplicants: applicants.length,
-    inboxCount: applicants.filter(
-      (a) => a.status === "processing" || a.status === "interview_pending"
-    ).length,
-    interviewCount: applicants.filter((a) => a.status === "interview_pending")
-      .length,
-    verificationCount: applicants.filter(
-      (a) => a.status === "interview_approved"
-    ).length,
-    hiredCount: applicants.filter((a) => a.status === "hired").length,
+    totalApplicants: orgStats?.total ?? 0,
+    inboxCount: count("processing") + count("interview_pending"),
+    interviewCount: count("interview_pending"),
+    verificationCount: count("interview_approved"),
+    hiredCount: count("hired"),
   };
 
-  const recentApplicants = applicants
-    .sort(
-      (a, b) =>
-        new Date(b.created_at).getTime() - new Date(a.created_at).getTime()
-    )
-    .slice(0, 5);
-
   return (
     <div className="max-w-7xl mx-auto p-4 md:p-6 lg:p-8">
       {/* Header */}
@@ -218,9 +216,10 @@ export default function DashboardOverview() {
             {projects
               .filter((p) => p.is_active)
               .map((project) => {
-                const projectApplicants = applicants.filter(
-                  (a) => a.status !== "rejected"
-                );
+                const projectStats = orgStats?.projects[project.id];
+                const activeCandidates =
+                  (projectStats?.total ?? 0) -
+                  (projectStats?.by_status.rejected ?? 0);
                 return (
                   <div
                     key={project.id}
@@ -238,7 +237,7 @@ export default function DashboardOverview() {
                       </div>
                       <span className="inline-flex items-center gap-1 text-xs font-medium text-gray-600 bg-gray-100 px-2 py-1 rounded-full">
                         <Users className="w-3 h-3" />
-                        {projectApplicants.length}
+                        {activeCandidates}
                       </span>
                     </div>
                   </div>
@@ -3,7 +3,16 @@
 import { useEffect, useState } from "react";
 import { useRouter } from "next/navigation";
 import useSWR from "swr";
-import { getOrgApplicants, updateApplicantStatus } from "@/lib/api";
+import { useRecruitmentEvents } from "@/lib/events";
+import { usePagedList } from "@/lib/pages";
+import {
+  getApplicantCV,
+  getOrgApplicants,
+  getOrgStats,
+  updateApplicantStatus,
+} from "@/lib/api";
+
+const INBOX_STATUSES = ["processing", "interview_pending"];
 
 interface Applicant {
   id: string;
@@ -13,29 +22,57 @@ interface Applicant {
   project_name?: string;
   ai_score: number;
   ai_reasoning?: string;
+  scoring_status?: "retry" | "failed" | null;
+  relevance_score?: number | null;
+  duplicate_of?: string | null;
   status: string;
-  cv_text: string;
+  cv_text?: string;
   created_at: string;
 }
 
 export default function CVInboxPage() {
+  useRecruitmentEvents();
   const router = useRouter();
   const [selectedId, setSelectedId] = useState<string | null>(null);
   const [blindMode, setBlindMode] = useState(false);
 
-  const { data: allCandidates = [], mutate } = useSWR<Applicant[]>(
-    "applicants-inbox",
-    getOrgApplicants,
-    { refreshInterval: 10000 }
+  // Screening stage (processing or interview_pending), filtered server-side
+  // and loaded a page at a time, newest first
+  const {
+    items: pageItems,
+    hasMore,
+    loadMore,
+    loading,
+    mutate,
+  } = usePagedList<Applicant>("applicants-inbox", (cursor) =>
+    getOrgApplicants({ cursor, status: INBOX_STATUSES })
   );
-
-  // Filter for screening stage (processing or interview_pending)
-  const candidates = allCandidates.filter(
-    (c) => c.status === "processing" || c.status === "interview_pending"
+  const { data: orgStats } = useSWR<{ by_status: Record<string, number> }>(
+    "org-stats",
+    getOrgStats
   );
+  const awaitingReview = INBOX_STATUSES.reduce(
+    (total, status) => total + (orgStats?.by_status[status] ?? 0),
+    0
+  );
+
+  // Best AI score first among the loaded pages; unscored candidates (still
+  // scoring, or held back by the project's LLM gates) ordered by local relevance
+  const candidates = [...pageItems]
+    .sort(
+      (a, b) =>
+        (b.ai_score ?? -1) - (a.ai_score ?? -1) ||
+        (b.relevance_score ?? -1) - (a.relevance_score ?? -1)
+    );
 
   const selectedCandidate = candidates.find((c) => c.id === selectedId);
 
+  // CV text is no longer part of the list payload; fetch it on selection
+  const { data: selectedCV } = useSWR<{ cv_text: string }>(
+    selectedId ? ["applicant-cv", selectedId] : null,
+    () => getApplicantCV(selectedId!)
+  );
+
   async function handleMoveToInterview(id: string) {
     try {
       await updateApplicantStatus(id, "interview_pending");
@@ -89,7 +126,7 @@ export default function CVInboxPage() {
           </div>
           <p className="text-xs text-gray-500">
             AI-screened candidates awaiting review ({candidates.length} of{" "}
-            {allCandidates.length} total)
+            {Math.max(awaitingReview, candidates.length)} loaded)
           </p>
         </div>
 
@@ -123,10 +160,36 @@ export default function CVInboxPage() {
               </div>
               <div className="flex justify-between items-center text-xs text-gray-500">
                 <span>{new Date(app.created_at).toLocaleDateString()}</span>
+                {app.relevance_score != null && (
+                  <span title="Match with the project requirements">
+                    {app.relevance_score}% match
+                  </span>
+                )}
+                {app.scoring_status === "retry" && (
+                  <span title="AI scoring is unavailable; it will be retried automatically">
+                    Scoring retry
+                  </span>
+                )}
+                {app.duplicate_of && (
+                  <span title="Near-duplicate of an earlier application; its score was reused">
+                    Resubmission
+                  </span>
+                )}
                 <span className="capitalize">{app.status}</span>
               </div>
             </div>
           ))}
+          {hasMore && (
+            <div className="p-4 flex justify-center">
+              <button
+                onClick={loadMore}
+                disabled={loading}
+                className="px-4 py-2 text-xs font-medium border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+              >
+                {loading ? "Loading..." : "Load more"}
+              </button>
+            </div>
+          )}
           {candidates.length === 0 && (
             <div className="p-8 text-center text-gray-400 text-xs mt-10">
               No candidates in CV Inbox
@@ -215,7 +278,7 @@ export default function CVInboxPage() {
                     Resume Extraction
                   </h3>
                   <div className="font-mono text-xs sm:text-sm text-gray-600 whitespace-pre-wrap leading-relaxed max-h-96 overflow-y-auto">
-                    {selectedCandidate.cv_text}
+                    {selectedCV?.cv_text ?? "Loading..."}
                   </div>
                 </div>
               </div>
@@ -1,7 +1,8 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import useSWR from "swr";
+import { useRecruitmentEvents } from "@/lib/events";
+import { usePagedList } from "@/lib/pages";
 import { getOrgApplicants, updateApplicantStatus } from "@/lib/api";
 
 interface Applicant {
@@ -15,15 +16,16 @@ interface Applicant {
 }
 
 export default function InterviewPage() {
-  const { data: allCandidates = [], mutate } = useSWR<Applicant[]>(
-    "applicants-interview",
-    getOrgApplicants,
-    { refreshInterval: 10000 }
-  );
-
-  // Filter for interview_pending status
-  const candidates = allCandidates.filter(
-    (c) => c.status === "interview_pending"
+  useRecruitmentEvents();
+  // interview_pending only, filtered server-side and loaded a page at a time
+  const {
+    items: candidates,
+    hasMore,
+    loadMore,
+    loading,
+    mutate,
+  } = usePagedList<Applicant>("applicants-interview", (cursor) =>
+    getOrgApplicants({ cursor, status: ["interview_pending"] })
   );
 
   async function handleApprove(id: string) {
@@ -219,6 +221,18 @@ export default function InterviewPage() {
           </div>
         )}
       </div>
+
+      {hasMore && (
+        <div className="flex justify-center mt-4">
+          <button
+            onClick={loadMore}
+            disabled={loading}
+            className="px-4 py-2 text-sm font-medium border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+          >
+            {loading ? "Loading..." : "Load more"}
+          </button>
+        </div>
+      )}
     </div>
   );
 }
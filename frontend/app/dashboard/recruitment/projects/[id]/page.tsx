@@ -1,9 +1,16 @@
 "use client";
 
-import { useState } from "react";
+import { useEffect, useState } from "react";
 import { useParams, useRouter } from "next/navigation";
 import useSWR from "swr";
-import { getProject, getApplicants, updateProject } from "@/lib/api";
+import {
+  getProject,
+  getApplicants,
+  getProjectStats,
+  searchApplicants,
+  updateProject,
+} from "@/lib/api";
+import { usePagedList } from "@/lib/pages";
 import { ArrowLeft, Edit2, Save, X, ExternalLink } from "lucide-react";
 
 interface Project {
@@ -22,6 +29,7 @@ interface Applicant {
   status: string;
   ai_score: number;
   created_at: string;
+  snippet?: string | null; // search hits: HTML-escaped CV excerpt, matches in <mark>
 }
 
 export default function ProjectDetailPage() {
@@ -41,22 +49,46 @@ export default function ProjectDetailPage() {
     () => getProject(projectId)
   );
 
-  const { data: applicants = [] } = useSWR<Applicant[]>(
+  // Best AI score first, a page at a time
+  const {
+    items: applicants,
+    hasMore,
+    loadMore,
+    loading,
+  } = usePagedList<Applicant>(
     projectId ? `project-${projectId}-applicants` : null,
-    () => getApplicants(projectId)
+    (cursor) => getApplicants(projectId, { cursor })
   );
 
+  // Full-text CV search within the project, best match first; replaces the
+  // paged list while a query is entered
+  const [search, setSearch] = useState("");
+  const [query, setQuery] = useState("");
+  useEffect(() => {
+    const timer = setTimeout(() => setQuery(search.trim()), search ? 250 : 0);
+    return () => clearTimeout(timer);
+  }, [search]);
+  const { data: hits, isValidating: searching } = useSWR<Applicant[]>(
+    projectId && query ? ["applicant-search", projectId, query] : null,
+    () => searchApplicants(query, projectId)
+  );
+  const rows = query ? hits ?? [] : applicants;
+
+  // Counts cover every applicant, not just the loaded pages
+  const { data: projectStats } = useSWR<{
+    total: number;
+    by_status: Record<string, number>;
+  }>(projectId ? `project-${projectId}-stats` : null, () =>
+    getProjectStats(projectId)
+  );
+  const count = (status: string) => projectStats?.by_status[status] ?? 0;
   const stats = {
-    total: applicants.length,
-    processing: applicants.filter(
-      (a) => a.status === "processing" || a.status === "interview_pending"
-    ).length,
-    interview: applicants.filter((a) => a.status === "interview_pending")
-      .length,
-    verification: applicants.filter((a) => a.status === "interview_approved")
-      .length,
-    hired: applicants.filter((a) => a.status === "hired").length,
-    rejected: applicants.filter((a) => a.status === "rejected").length,
+    total: projectStats?.total ?? 0,
+    processing: count("processing") + count("interview_pending"),
+    interview: count("interview_pending"),
+    verification: count("interview_approved"),
+    hired: count("hired"),
+    rejected: count("rejected"),
   };
 
   function handleEdit() {
@@ -272,8 +304,15 @@ export default function ProjectDetailPage() {
         <div className="p-4 border-b border-gray-100">
           <h2 className="font-bold text-sm text-gray-900">All Applicants</h2>
           <p className="text-xs text-gray-500 mt-0.5">
-            {applicants.length} total applicants for this project
+            {stats.total} total applicants for this project
           </p>
+          <input
+            type="search"
+            value={search}
+            onChange={(e) => setSearch(e.target.value)}
+            placeholder='Search CVs: skills, "exact phrase", -exclude...'
+            className="w-full mt-3 px-4 py-2 border border-gray-200 rounded-lg text-sm focus:outline-none focus:ring-2 focus:ring-black"
+          />
         </div>
 
         {/* Desktop Table */}
@@ -299,10 +338,16 @@ export default function ProjectDetailPage() {
               </tr>
             </thead>
             <tbody className="divide-y divide-gray-100">
-              {applicants.map((app) => (
+              {rows.map((app) => (
                 <tr key={app.id} className="hover:bg-gray-50">
-                  <td className="px-6 py-4 whitespace-nowrap text-sm font-medium text-gray-900">
-                    {app.name}
+                  <td className="px-6 py-4 text-sm font-medium text-gray-900">
+                    <div className="whitespace-nowrap">{app.name}</div>
+                    {app.snippet && (
+                      <div
+                        className="mt-1 max-w-md text-xs font-normal text-gray-500 [&_mark]:bg-yellow-100"
+                        dangerouslySetInnerHTML={{ __html: app.snippet }}
+                      />
+                    )}
                   </td>
                   <td className="px-6 py-4 whitespace-nowrap text-sm text-gray-500 font-mono">
                     {app.email}
@@ -348,7 +393,7 @@ export default function ProjectDetailPage() {
 
         {/* Mobile Cards */}
         <div className="md:hidden divide-y divide-gray-100">
-          {applicants.map((app) => (
+          {rows.map((app) => (
             <div key={app.id} className="p-4 space-y-2">
               <div className="flex justify-between items-start">
                 <div>
@@ -358,6 +403,12 @@ export default function ProjectDetailPage() {
                   <div className="text-xs text-gray-500 font-mono">
                     {app.email}
                   </div>
+                  {app.snippet && (
+                    <div
+                      className="mt-1 text-xs text-gray-500 [&_mark]:bg-yellow-100"
+                      dangerouslySetInnerHTML={{ __html: app.snippet }}
+                    />
+                  )}
                 </div>
                 <span
                   className={`inline-flex px-2 py-1 text-xs font-semibold rounded-full ${
@@ -395,9 +446,27 @@ export default function ProjectDetailPage() {
           ))}
         </div>
 
-        {applicants.length === 0 && (
+        {rows.length === 0 && (
           <div className="p-12 text-center text-gray-400">
-            <p className="text-sm">No applicants yet for this project</p>
+            <p className="text-sm">
+              {!query
+                ? "No applicants yet for this project"
+                : searching
+                ? "Searching..."
+                : "No CVs match this search"}
+            </p>
+          </div>
+        )}
+
+        {hasMore && !query && (
+          <div className="p-4 flex justify-center border-t border-gray-100">
+            <button
+              onClick={loadMore}
+              disabled={loading}
+              className="px-4 py-2 text-sm font-medium border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+            >
+              {loading ? "Loading..." : "Load more"}
+            </button>
           </div>
         )}
       </div>
@@ -5,7 +5,7 @@ import { useRouter } from "next/navigation";
 import useSWR from "swr";
 import {
   getProjects,
-  getOrgApplicants,
+  getOrgStats,
   deleteProject,
   updateProject,
   createProject,
@@ -19,10 +19,8 @@ interface Project {
   created_at: string;
 }
 
-interface Applicant {
-  id: string;
-  project_id: string;
-  status: string;
+interface OrgStats {
+  projects: Record<string, { total: number; by_status: Record<string, number> }>;
 }
 
 export default function ProjectsPage() {
@@ -37,10 +35,7 @@ export default function ProjectsPage() {
     getProjects
   );
 
-  const { data: applicants = [] } = useSWR<Applicant[]>(
-    "applicants-for-projects",
-    getOrgApplicants
-  );
+  const { data: orgStats } = useSWR<OrgStats>("org-stats", getOrgStats);
 
   async function handleCreateProject() {
     if (!newProjectName.trim()) {
@@ -97,18 +92,13 @@ export default function ProjectsPage() {
   }
 
   function getProjectStats(projectId: string) {
-    const projectApplicants = applicants.filter(
-      (a) => a.project_id === projectId
-    );
+    const summary = orgStats?.projects[projectId];
+    const count = (status: string) => summary?.by_status[status] ?? 0;
     return {
-      total: projectApplicants.length,
-      inbox: projectApplicants.filter(
-        (a) => a.status === "processing" || a.status === "interview_pending"
-      ).length,
-      interview: projectApplicants.filter(
-        (a) => a.status === "interview_pending"
-      ).length,
-      hired: projectApplicants.filter((a) => a.status === "hired").length,
+      total: summary?.total ?? 0,
+      inbox: count("processing") + count("interview_pending"),
+      interview: count("interview_pending"),
+      hired: count("hired"),
     };
   }
 
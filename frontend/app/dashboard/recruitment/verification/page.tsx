@@ -1,7 +1,8 @@
 "use client";
 
 import { useEffect, useState } from "react";
-import useSWR from "swr";
+import { useRecruitmentEvents } from "@/lib/events";
+import { usePagedList } from "@/lib/pages";
 import { getOrgApplicants } from "@/lib/api";
 import { createBrowserClient } from "@supabase/ssr";
 
@@ -16,6 +17,7 @@ interface Applicant {
 }
 
 export default function VerificationPage() {
+  useRecruitmentEvents();
   const [selectedId, setSelectedId] = useState<string | null>(null);
   const [formData, setFormData] = useState({
     department: "",
@@ -24,15 +26,15 @@ export default function VerificationPage() {
     leave_remaining: 12,
   });
 
-  const { data: allCandidates = [], mutate } = useSWR<Applicant[]>(
-    "applicants-verification",
-    getOrgApplicants,
-    { refreshInterval: 10000 }
-  );
-
-  // Filter for interview_approved status
-  const candidates = allCandidates.filter(
-    (c) => c.status === "interview_approved"
+  // interview_approved only, filtered server-side and loaded a page at a time
+  const {
+    items: candidates,
+    hasMore,
+    loadMore,
+    loading,
+    mutate,
+  } = usePagedList<Applicant>("applicants-verification", (cursor) =>
+    getOrgApplicants({ cursor, status: ["interview_approved"] })
   );
 
   const selectedCandidate = candidates.find((c) => c.id === selectedId);
@@ -127,7 +129,8 @@ export default function VerificationPage() {
               Approved Candidates
             </h2>
             <p className="text-xs text-gray-500 mt-1">
-              {candidates.length} awaiting verification
+              {candidates.length}
+              {hasMore ? "+" : ""} awaiting verification
             </p>
           </div>
 
@@ -163,6 +166,18 @@ export default function VerificationPage() {
               </div>
             ))}
 
+            {hasMore && (
+              <div className="p-4 flex justify-center">
+                <button
+                  onClick={loadMore}
+                  disabled={loading}
+                  className="px-4 py-2 text-xs font-medium border border-gray-200 rounded-lg hover:bg-gray-50 disabled:opacity-50"
+                >
+                  {loading ? "Loading..." : "Load more"}
+                </button>
+              </div>
+            )}
+
             {candidates.length === 0 && (
               <div className="p-12 text-center text-gray-400">
                 <div className="w-16 h-16 bg-gray-100 rounded-full flex items-center justify-center mx-auto mb-4">
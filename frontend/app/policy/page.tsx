@@ -7,6 +7,7 @@ interface Message {
   role: "user" | "assistant";
   content: string;
   reasoning?: string;
+  notice?: string;
 }
 
 export default function EmployeePolicyPage() {
@@ -99,6 +100,7 @@ export default function EmployeePolicyPage() {
           role: "assistant",
           content: data.answer,
           reasoning: data.reasoning,
+          notice: data.notice,
         },
       ]);
     } catch (err: any) {
@@ -164,6 +166,11 @@ export default function EmployeePolicyPage() {
                   >
                     {m.content}
                   </div>
+                  {m.notice && (
+                    <div className="bg-orange-50 border-l-2 border-orange-400 p-2 text-[11px] text-orange-800 rounded-r">
+                      {m.notice}
+                    </div>
+                  )}
                   {m.reasoning && (
                     <div className="bg-yellow-50 border-l-2 border-yellow-400 p-2 text-[11px] text-yellow-800 rounded-r">
                       <strong>AI Checking Logic:</strong> {m.reasoning}
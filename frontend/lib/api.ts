@@ -97,13 +97,51 @@ export async function updateProject(
   return res.json();
 }
 
-export async function getApplicants(projectId: string) {
+// One page of a keyset-paginated listing; pass nextCursor back for the next page
+export interface Page<T = any> {
+  items: T[];
+  nextCursor: string | null;
+}
+
+export interface ApplicantPageOptions {
+  cursor?: string | null;
+  status?: string[]; // any of these statuses
+  limit?: number;
+}
+
+function applicantPageParams(options: ApplicantPageOptions) {
+  const params = new URLSearchParams();
+  if (options.cursor) params.set("cursor", options.cursor);
+  if (options.status?.length) params.set("status", options.status.join(","));
+  if (options.limit) params.set("limit", String(options.limit));
+  return params;
+}
+
+async function fetchPage(url: string, error: string): Promise<Page> {
+  const headers = await getHeaders();
+  delete headers["Content-Type"];
+  const res = await fetch(url, { headers });
+  if (!res.ok) throw new Error(error);
+  return { items: await res.json(), nextCursor: res.headers.get("X-Next-Cursor") };
+}
+
+// A project's applicants, best AI score first
+export async function getApplicants(
+  projectId: string,
+  options: ApplicantPageOptions = {}
+) {
+  const params = applicantPageParams(options);
+  params.set("project_id", projectId);
+  return fetchPage(`${API_URL}/applicants?${params}`, "Failed to fetch applicants");
+}
+
+export async function getApplicantCV(applicantId: string) {
   const headers = await getHeaders();
   delete headers["Content-Type"];
-  const res = await fetch(`${API_URL}/applicants?project_id=${projectId}`, {
+  const res = await fetch(`${API_URL}/applicants/${applicantId}/cv`, {
     headers,
   });
-  if (!res.ok) throw new Error("Failed to fetch applicants");
+  if (!res.ok) throw new Error("Failed to fetch CV");
   return res.json();
 }
 
@@ -121,13 +159,53 @@ export async function updateApplicantStatus(
   return res.json();
 }
 
-export async function getOrgApplicants() {
+// Applicants across the organization's projects, newest first
+export async function getOrgApplicants(options: ApplicantPageOptions = {}) {
+  return fetchPage(
+    `${API_URL}/applicants/all?${applicantPageParams(options)}`,
+    "Failed to fetch organization applicants"
+  );
+}
+
+export async function getRecentApplicants(limit = 5) {
+  const headers = await getHeaders();
+  delete headers["Content-Type"];
+  const res = await fetch(`${API_URL}/applicants/all?limit=${limit}`, {
+    headers,
+  });
+  if (!res.ok) throw new Error("Failed to fetch recent applicants");
+  return res.json();
+}
+
+// Full-text CV search: words, "exact phrases", OR, -excluded
+export async function searchApplicants(q: string, projectId?: string, limit = 20) {
+  const headers = await getHeaders();
+  delete headers["Content-Type"];
+  const params = new URLSearchParams({ q, limit: String(limit) });
+  if (projectId) params.set("project_id", projectId);
+  const res = await fetch(`${API_URL}/applicants/search?${params}`, {
+    headers,
+  });
+  if (!res.ok) throw new Error("Failed to search applicants");
+  return res.json();
+}
+
+// Aggregates from server-side counters: cost does not grow with applicant count
+export async function getOrgStats() {
+  const headers = await getHeaders();
+  delete headers["Content-Type"];
+  const res = await fetch(`${API_URL}/organizations/stats`, { headers });
+  if (!res.ok) throw new Error("Failed to fetch organization stats");
+  return res.json();
+}
+
+export async function getProjectStats(projectId: string) {
   const headers = await getHeaders();
   delete headers["Content-Type"];
-  const res = await fetch(`${API_URL}/applicants/all`, {
+  const res = await fetch(`${API_URL}/projects/${projectId}/stats`, {
     headers,
   });
-  if (!res.ok) throw new Error("Failed to fetch organization applicants");
+  if (!res.ok) throw new Error("Failed to fetch project stats");
   return res.json();
 }
 
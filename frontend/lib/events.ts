@@ -0,0 +1,71 @@
+import { useEffect } from "react";
+import { useSWRConfig } from "swr";
+import { createBrowserClient } from "@supabase/ssr";
+import { revalidatePagedLists } from "./pages";
+
+const API_URL = process.env.NEXT_PUBLIC_API_URL || "http://127.0.0.1:8000";
+
+const APPLICANT_EVENTS = [
+  "applicant.created",
+  "applicant.scored",
+  "applicant.status_changed",
+  "applicant.deleted",
+  "reset",
+];
+
+// Revalidate applicant lists and stats when the organization's stream reports a change.
+// Replaces interval polling: lists are only refetched when something happened.
+export function useRecruitmentEvents() {
+  const { mutate } = useSWRConfig();
+
+  useEffect(() => {
+    const supabase = createBrowserClient(
+      process.env.NEXT_PUBLIC_SUPABASE_URL!,
+      process.env.NEXT_PUBLIC_SUPABASE_ANON_KEY!
+    );
+    let source: EventSource | null = null;
+    let lastEventId = "";
+    let retryTimer: ReturnType<typeof setTimeout> | undefined;
+    let closed = false;
+
+    const refresh = () => {
+      revalidatePagedLists((key) => key.startsWith("applicants-"));
+      mutate(
+        (key) =>
+          typeof key === "string" &&
+          (key.startsWith("applicants-") || key === "org-stats")
+      );
+    };
+
+    async function connect() {
+      const { data } = await supabase.auth.getSession();
+      if (closed || !data.session) return;
+      // EventSource cannot send headers: the token goes in the query string
+      const params = new URLSearchParams({
+        access_token: data.session.access_token,
+      });
+      if (lastEventId) params.set("last_event_id", lastEventId);
+      source = new EventSource(`${API_URL}/organizations/events?${params}`);
+      for (const type of APPLICANT_EVENTS) {
+        source.addEventListener(type, (event) => {
+          lastEventId = (event as MessageEvent).lastEventId || lastEventId;
+          refresh();
+        });
+      }
+      source.onerror = () => {
+        // EventSource retries by itself; a rejected (e.g. expired) token closes it,
+        // so reopen with a fresh session and resume after the last event seen
+        if (source?.readyState === EventSource.CLOSED && !closed) {
+          retryTimer = setTimeout(connect, 3000);
+        }
+      };
+    }
+
+    connect();
+    return () => {
+      closed = true;
+      clearTimeout(retryTimer);
+      source?.close();
+    };
+  }, [mutate]);
+}
@@ -0,0 +1,57 @@
+import { useEffect } from "react";
+import useSWRInfinite from "swr/infinite";
+import type { Page } from "./api";
+
+const CURSOR_SEPARATOR = "?cursor=";
+
+// mutate() of every mounted usePagedList, by list key
+const mountedLists = new Map<string, Set<() => void>>();
+
+// A cursor-paged list under one SWR key, loaded a page at a time ("Load more").
+// The first page is cached under `key`, later ones under `${key}?cursor=...`;
+// mutate() (or revalidatePagedLists) refetches every loaded page.
+export function usePagedList<T>(
+  key: string | null,
+  fetchPage: (cursor: string | null) => Promise<Page<T>>
+) {
+  const { data, size, setSize, mutate, isValidating } = useSWRInfinite<Page<T>>(
+    (index, previous: Page<T> | null) => {
+      if (key === null) return null;
+      if (index === 0) return key;
+      return previous?.nextCursor
+        ? `${key}${CURSOR_SEPARATOR}${previous.nextCursor}`
+        : null;
+    },
+    (pageKey: string) =>
+      fetchPage(pageKey.split(CURSOR_SEPARATOR)[1] ?? null)
+  );
+
+  useEffect(() => {
+    if (key === null) return;
+    const revalidate = () => mutate();
+    const handles = mountedLists.get(key) ?? new Set();
+    handles.add(revalidate);
+    mountedLists.set(key, handles);
+    return () => {
+      handles.delete(revalidate);
+      if (handles.size === 0) mountedLists.delete(key);
+    };
+  }, [key, mutate]);
+
+  const lastPage = data ? data[data.length - 1] : undefined;
+  return {
+    items: data ? data.flatMap((page) => page.items) : [],
+    hasMore: Boolean(lastPage?.nextCursor),
+    loadMore: () => setSize(size + 1),
+    loading: isValidating,
+    mutate,
+  };
+}
+
+// Revalidate the mounted usePagedList lists whose key matches, through their
+// own useSWRInfinite handles
+export function revalidatePagedLists(match: (key: string) => boolean) {
+  mountedLists.forEach((handles, key) => {
+    if (match(key)) handles.forEach((revalidate) => revalidate());
+  });
+}
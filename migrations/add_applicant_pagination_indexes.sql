@@ -0,0 +1,14 @@
+-- Migration: Composite indexes for keyset pagination of applicant listings
+-- Run this in the Supabase SQL Editor
+
+-- 1. Project inbox: ORDER BY ai_score DESC NULLS LAST, id DESC
+CREATE INDEX IF NOT EXISTS idx_applicants_project_score
+ON applicants(project_id, deleted_at, ai_score DESC NULLS LAST, id DESC);
+
+-- 2. Org-wide inbox: ORDER BY created_at DESC, id DESC
+CREATE INDEX IF NOT EXISTS idx_applicants_project_created
+ON applicants(project_id, deleted_at, created_at DESC, id DESC);
+
+-- 3. Status filter within a project (CV Inbox / Interview / Verification tabs)
+CREATE INDEX IF NOT EXISTS idx_applicants_project_status
+ON applicants(project_id, deleted_at, status, ai_score DESC NULLS LAST, id DESC);
@@ -0,0 +1,132 @@
+-- Migration: Trigger-maintained recruitment analytics counters
+-- Run this in the Supabase SQL Editor
+
+-- Dashboard stats read a few dozen counter rows per project instead of every
+-- applicant. Counters are adjusted by statement-level triggers, so writes from
+-- the API, the AI scorer, RPCs and the SQL editor all keep them exact.
+--   status         bucket = applicant status
+--   score          bucket = '0', '10', ... '90' (10-point bands, 100 falls in '90') or 'unscored'
+--   day            bucket = 'YYYY-MM-DD' (UTC) of created_at
+--   time_to_score  bucket = upper bound in seconds of (scored_at - created_at), or 'inf'
+-- Soft-deleted applicants are not counted; archived projects are filtered at read time.
+
+-- 1. When the AI score landed (the first time ai_score is set)
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS scored_at timestamp with time zone;
+
+CREATE OR REPLACE FUNCTION set_applicant_scored_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.ai_score IS NOT NULL AND NEW.scored_at IS NULL
+       AND (TG_OP = 'INSERT' OR OLD.ai_score IS NULL) THEN
+        NEW.scored_at := timezone('utc'::text, now());
+    END IF;
+    RETURN NEW;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS applicants_scored_at ON applicants;
+CREATE TRIGGER applicants_scored_at BEFORE INSERT OR UPDATE OF ai_score ON applicants
+    FOR EACH ROW EXECUTE FUNCTION set_applicant_scored_at();
+
+-- 2. Counters
+CREATE TABLE IF NOT EXISTS applicant_stats (
+    project_id uuid not null references projects(id) on delete cascade,
+    metric text not null,
+    bucket text not null,
+    count bigint not null default 0,
+    primary key (project_id, metric, bucket)
+);
+
+ALTER TABLE applicant_stats ENABLE ROW LEVEL SECURITY;  -- service role only
+
+-- The (metric, bucket) pairs one applicant contributes to
+CREATE OR REPLACE FUNCTION applicant_stat_buckets(a applicants)
+RETURNS TABLE (metric text, bucket text)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT 'status', coalesce(a.status, 'unknown')
+    UNION ALL
+    SELECT 'score', CASE
+        WHEN a.ai_score IS NULL THEN 'unscored'
+        ELSE (least(greatest(a.ai_score, 0) / 10, 9) * 10)::text
+    END
+    UNION ALL
+    SELECT 'day', to_char(a.created_at AT TIME ZONE 'UTC', 'YYYY-MM-DD')
+    UNION ALL
+    SELECT 'time_to_score', coalesce((
+        SELECT min(b)::text
+        FROM unnest(ARRAY[5, 10, 30, 60, 120, 300, 600, 1800, 3600, 21600, 86400]) b
+        WHERE extract(epoch FROM a.scored_at - a.created_at) <= b
+    ), 'inf')
+    WHERE a.scored_at IS NOT NULL;
+$$;
+
+-- Net the removed and added rows, then upsert only the counters that moved.
+-- Rows are upserted in key order so concurrent writers lock counters in the same order.
+CREATE OR REPLACE FUNCTION add_applicant_stats(removed applicants[], added applicants[])
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    WITH deltas AS (
+        SELECT r.project_id, b.metric, b.bucket, -1 AS delta
+        FROM unnest(removed) r, applicant_stat_buckets(r) b
+        WHERE r.deleted_at = '1970-01-01 00:00:00+00'
+        UNION ALL
+        SELECT n.project_id, b.metric, b.bucket, 1 AS delta
+        FROM unnest(added) n, applicant_stat_buckets(n) b
+        WHERE n.deleted_at = '1970-01-01 00:00:00+00'
+    )
+    INSERT INTO applicant_stats (project_id, metric, bucket, count)
+    SELECT project_id, metric, bucket, sum(delta)
+    FROM deltas
+    GROUP BY project_id, metric, bucket
+    HAVING sum(delta) <> 0
+    ORDER BY project_id, metric, bucket
+    ON CONFLICT (project_id, metric, bucket) DO UPDATE
+    SET count = applicant_stats.count + excluded.count;
+$$;
+
+CREATE OR REPLACE FUNCTION update_applicant_stats()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    IF TG_OP = 'INSERT' THEN
+        PERFORM add_applicant_stats('{}', array(SELECT n FROM new_rows n));
+    ELSIF TG_OP = 'UPDATE' THEN
+        PERFORM add_applicant_stats(array(SELECT o FROM old_rows o), array(SELECT n FROM new_rows n));
+    ELSE
+        PERFORM add_applicant_stats(array(SELECT o FROM old_rows o), '{}');
+    END IF;
+    RETURN NULL;
+END;
+$$;
+
+DROP TRIGGER IF EXISTS applicants_stats_insert ON applicants;
+CREATE TRIGGER applicants_stats_insert AFTER INSERT ON applicants
+    REFERENCING NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_applicant_stats();
+
+DROP TRIGGER IF EXISTS applicants_stats_update ON applicants;
+CREATE TRIGGER applicants_stats_update AFTER UPDATE ON applicants
+    REFERENCING OLD TABLE AS old_rows NEW TABLE AS new_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_applicant_stats();
+
+DROP TRIGGER IF EXISTS applicants_stats_delete ON applicants;
+CREATE TRIGGER applicants_stats_delete AFTER DELETE ON applicants
+    REFERENCING OLD TABLE AS old_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION update_applicant_stats();
+
+-- 3. Backfill from existing applicants (blocks applicant writes while it runs).
+--    Applicants scored before this migration have no scored_at and are left out
+--    of time-to-score.
+BEGIN;
+LOCK TABLE applicants IN SHARE ROW EXCLUSIVE MODE;
+TRUNCATE applicant_stats;
+SELECT add_applicant_stats('{}', array(SELECT a FROM applicants a));
+COMMIT;
@@ -0,0 +1,37 @@
+-- Migration: Move CV text out of applicants into a content-addressed store
+-- Run this in the Supabase SQL Editor
+
+-- 1. CV content table, keyed by SHA-256 of the uploaded file
+-- codec: 'zstd' / 'zlib' when written by the backend, 'none' for rows backfilled below
+CREATE TABLE IF NOT EXISTS cv_contents (
+    cv_hash text PRIMARY KEY,
+    codec text NOT NULL DEFAULT 'none',
+    body bytea NOT NULL,
+    original_size integer,
+    created_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Let Postgres compress the (few) uncompressed backfilled rows too (PG14+)
+ALTER TABLE cv_contents ALTER COLUMN body SET COMPRESSION lz4;
+
+-- 2. Backfill from existing applicants (one row per distinct hash)
+INSERT INTO cv_contents (cv_hash, codec, body, original_size)
+SELECT DISTINCT ON (cv_hash) cv_hash, 'none', convert_to(cv_text, 'UTF8'), length(cv_text)
+FROM applicants
+WHERE cv_hash IS NOT NULL AND cv_text IS NOT NULL
+ORDER BY cv_hash, created_at
+ON CONFLICT (cv_hash) DO NOTHING;
+
+-- 3. Drop the inline copy (the column stays for older rows without a hash)
+UPDATE applicants
+SET cv_text = NULL
+WHERE cv_hash IS NOT NULL
+  AND cv_text IS NOT NULL
+  AND EXISTS (SELECT 1 FROM cv_contents c WHERE c.cv_hash = applicants.cv_hash);
+
+-- 4. Covering index so the /apply dedup check is index-only
+CREATE INDEX IF NOT EXISTS idx_applicants_dedup
+ON applicants(project_id, cv_hash, deleted_at) INCLUDE (id);
+
+-- Reclaim space from the dropped inline text (run on its own, outside a transaction):
+-- VACUUM (ANALYZE) applicants;
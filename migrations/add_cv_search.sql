@@ -0,0 +1,97 @@
+-- Migration: Full-text search over CV content
+-- Run this in the Supabase SQL Editor
+
+CREATE EXTENSION IF NOT EXISTS btree_gin;
+
+-- 1. Search index, one row per (owner, CV): cv_hash is the SHA-256 of the
+--    uploaded file, as in cv_contents, so a CV submitted to several of an
+--    owner's projects is indexed once. The owner is part of the GIN key, so a
+--    search only matches (and ranks) the caller's own rows; a CV sent to
+--    several organizations is indexed once per organization. The 'simple'
+--    configuration (no stemming, no stopwords) suits mixed English / Indonesian
+--    CVs and keeps skill names such as "go" or "r" searchable.
+
+CREATE TABLE IF NOT EXISTS cv_search (
+    owner_id uuid NOT NULL,
+    cv_hash text NOT NULL,
+    tsv tsvector NOT NULL,
+    PRIMARY KEY (owner_id, cv_hash)
+);
+
+CREATE INDEX IF NOT EXISTS idx_cv_search_owner_tsv ON cv_search USING gin (owner_id, tsv);
+
+-- Backend-only (service role)
+ALTER TABLE cv_search ENABLE ROW LEVEL SECURITY;
+
+-- 2. Indexing happens server-side so the backend only sends the extracted text.
+--    Without p_owner_id (backfills) the CV is indexed for every owner with an
+--    applicant holding it.
+CREATE OR REPLACE FUNCTION index_cv_text(p_cv_hash text, p_text text, p_owner_id uuid DEFAULT NULL)
+RETURNS void
+LANGUAGE sql
+AS $$
+    WITH doc AS (
+        SELECT to_tsvector('simple', p_text) AS tsv
+    ), owners AS (
+        SELECT p_owner_id AS owner_id
+        WHERE p_owner_id IS NOT NULL
+        UNION
+        SELECT p.owner_id
+        FROM applicants a
+        JOIN projects p ON p.id = a.project_id
+        WHERE p_owner_id IS NULL AND a.cv_hash = p_cv_hash
+    )
+    INSERT INTO cv_search (owner_id, cv_hash, tsv)
+    SELECT o.owner_id, p_cv_hash, doc.tsv
+    FROM owners o CROSS JOIN doc
+    ON CONFLICT (owner_id, cv_hash) DO NOTHING;
+$$;
+
+-- 3. Ranked search within one owner's organization, optionally one project.
+--    p_query uses web search syntax: words (AND), "quoted phrases", OR, -excluded.
+--    Rank is cover density, normalized by document length so long CVs do not win by size.
+CREATE OR REPLACE FUNCTION search_applicants(
+    p_owner_id uuid,
+    p_query text,
+    p_project_id uuid DEFAULT NULL,
+    p_limit integer DEFAULT 20
+)
+RETURNS TABLE (
+    id uuid,
+    project_id uuid,
+    project_name text,
+    name text,
+    email text,
+    ai_score integer,
+    relevance_score integer,
+    status text,
+    cv_hash text,
+    created_at timestamp with time zone,
+    rank real
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT a.id, a.project_id, p.name, a.name, a.email, a.ai_score, a.relevance_score,
+           a.status, a.cv_hash, a.created_at, ts_rank_cd(s.tsv, q.query, 1) AS rank
+    FROM websearch_to_tsquery('simple', p_query) AS q(query)
+    JOIN cv_search s ON s.owner_id = p_owner_id AND s.tsv @@ q.query
+    JOIN applicants a ON a.cv_hash = s.cv_hash
+    JOIN projects p ON p.id = a.project_id
+    WHERE p.owner_id = p_owner_id
+      AND p.deleted_at = '1970-01-01 00:00:00+00'
+      AND a.deleted_at = '1970-01-01 00:00:00+00'
+      AND (p_project_id IS NULL OR a.project_id = p_project_id)
+    ORDER BY rank DESC, a.id DESC
+    LIMIT p_limit;
+$$;
+
+-- 4. Backfill CVs stored uncompressed by add_cv_contents.sql. CVs written by the
+--    backend are zstd/zlib-compressed: index those with backend/backfill_cv_search.py.
+INSERT INTO cv_search (owner_id, cv_hash, tsv)
+SELECT DISTINCT ON (p.owner_id, c.cv_hash) p.owner_id, c.cv_hash, to_tsvector('simple', convert_from(c.body, 'UTF8'))
+FROM cv_contents c
+JOIN applicants a ON a.cv_hash = c.cv_hash
+JOIN projects p ON p.id = a.project_id
+WHERE c.codec = 'none'
+ON CONFLICT (owner_id, cv_hash) DO NOTHING;
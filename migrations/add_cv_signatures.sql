@@ -0,0 +1,42 @@
+-- Migration: Near-duplicate CV detection (MinHash signatures + LSH band index)
+-- Run this in the Supabase SQL Editor (after add_applicant_stats.sql)
+
+-- 1. One MinHash signature per applicant (see backend/near_duplicates.py)
+--    bands: LSH band keys, already scoped to the project; a shared key marks a candidate pair
+CREATE TABLE IF NOT EXISTS cv_signatures (
+    applicant_id uuid PRIMARY KEY REFERENCES applicants(id) ON DELETE CASCADE,
+    project_id uuid NOT NULL REFERENCES projects(id) ON DELETE CASCADE,
+    signature bigint[] NOT NULL,
+    bands bigint[] NOT NULL,
+    created_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Candidate lookup: bands && '{...}' (array overlap) within a project
+CREATE INDEX IF NOT EXISTS idx_cv_signatures_bands ON cv_signatures USING GIN (bands);
+CREATE INDEX IF NOT EXISTS idx_cv_signatures_project ON cv_signatures(project_id);
+
+-- Backend-only (service role)
+ALTER TABLE cv_signatures ENABLE ROW LEVEL SECURITY;
+
+-- 2. Link from a near-duplicate application to the applicant whose score it reused
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS duplicate_of uuid REFERENCES applicants(id) ON DELETE SET NULL;
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS duplicate_similarity real;
+
+-- Only applications received after this migration are signed; earlier CVs
+-- are not matched as near-duplicates.
+
+-- 3. A score copied from the original is not a scoring run: leave scored_at
+--    unset, so near-duplicates stay out of time-to-score (replaces the
+--    function from add_applicant_stats.sql)
+CREATE OR REPLACE FUNCTION set_applicant_scored_at()
+RETURNS trigger
+LANGUAGE plpgsql
+AS $$
+BEGIN
+    IF NEW.ai_score IS NOT NULL AND NEW.scored_at IS NULL AND NEW.duplicate_of IS NULL
+       AND (TG_OP = 'INSERT' OR OLD.ai_score IS NULL) THEN
+        NEW.scored_at := timezone('utc'::text, now());
+    END IF;
+    RETURN NEW;
+END;
+$$;
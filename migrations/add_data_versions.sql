@@ -0,0 +1,101 @@
+-- Migration: Version markers for ETag / conditional GET on dashboard reads
+-- Run this in the Supabase SQL Editor
+
+-- One counter per cache scope, bumped by triggers on every write, so writes from
+-- any worker, the AI scorer or the SQL editor all invalidate cached views.
+--   recruitment:<owner_id>  projects and applicants of one HR owner
+--   employees               the employee directory
+CREATE TABLE IF NOT EXISTS data_versions (
+    scope text primary key,
+    version bigint not null default 1,
+    updated_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+ALTER TABLE data_versions ENABLE ROW LEVEL SECURITY;  -- service role only
+
+CREATE OR REPLACE FUNCTION bump_data_versions(scopes text[])
+RETURNS void
+LANGUAGE sql
+SECURITY DEFINER
+AS $$
+    INSERT INTO data_versions (scope)
+    SELECT DISTINCT unnest(scopes)
+    ON CONFLICT (scope) DO UPDATE
+    SET version = data_versions.version + 1,
+        updated_at = timezone('utc'::text, now());
+$$;
+
+-- Statement-level triggers: a bulk update of 1000 applicants bumps each owner once.
+CREATE OR REPLACE FUNCTION bump_applicant_versions()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    PERFORM bump_data_versions(array(
+        SELECT DISTINCT 'recruitment:' || p.owner_id
+        FROM changed_rows c JOIN projects p ON p.id = c.project_id
+        WHERE p.owner_id IS NOT NULL
+    ));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION bump_project_versions()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    PERFORM bump_data_versions(array(
+        SELECT DISTINCT 'recruitment:' || owner_id FROM changed_rows WHERE owner_id IS NOT NULL
+    ));
+    RETURN NULL;
+END;
+$$;
+
+CREATE OR REPLACE FUNCTION bump_employee_versions()
+RETURNS trigger
+LANGUAGE plpgsql
+SECURITY DEFINER
+AS $$
+BEGIN
+    PERFORM bump_data_versions(ARRAY['employees']);
+    RETURN NULL;
+END;
+$$;
+
+-- Transition tables allow one event per trigger
+DROP TRIGGER IF EXISTS applicants_version_insert ON applicants;
+CREATE TRIGGER applicants_version_insert AFTER INSERT ON applicants
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_applicant_versions();
+
+DROP TRIGGER IF EXISTS applicants_version_update ON applicants;
+CREATE TRIGGER applicants_version_update AFTER UPDATE ON applicants
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_applicant_versions();
+
+DROP TRIGGER IF EXISTS applicants_version_delete ON applicants;
+CREATE TRIGGER applicants_version_delete AFTER DELETE ON applicants
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_applicant_versions();
+
+DROP TRIGGER IF EXISTS projects_version_insert ON projects;
+CREATE TRIGGER projects_version_insert AFTER INSERT ON projects
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_project_versions();
+
+DROP TRIGGER IF EXISTS projects_version_update ON projects;
+CREATE TRIGGER projects_version_update AFTER UPDATE ON projects
+    REFERENCING NEW TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_project_versions();
+
+DROP TRIGGER IF EXISTS projects_version_delete ON projects;
+CREATE TRIGGER projects_version_delete AFTER DELETE ON projects
+    REFERENCING OLD TABLE AS changed_rows
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_project_versions();
+
+DROP TRIGGER IF EXISTS employees_version ON employees;
+CREATE TRIGGER employees_version AFTER INSERT OR UPDATE OR DELETE ON employees
+    FOR EACH STATEMENT EXECUTE FUNCTION bump_employee_versions();
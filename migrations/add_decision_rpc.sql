@@ -0,0 +1,52 @@
+-- Migration: Status decisions and their notification emails in one transaction
+-- Run this in the Supabase SQL Editor (after add_email_outbox.sql)
+
+-- Bumped on every status change; decision emails are keyed on it, so each
+-- transition queues one email (A -> B -> A sends twice, a double click once).
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS status_version integer NOT NULL DEFAULT 0;
+
+-- Set one status on a set of applicants and queue their decision emails.
+-- Only live applicants in the caller's live projects are touched; applicants
+-- already in p_status are locked and reported but not changed (no email).
+--
+-- p_emails maps applicant id -> {to_email, from_email, subject, html}; the
+-- outbox idempotency key is decision:<applicant_id>:<status_version>.
+-- Returns one row per matched applicant.
+CREATE OR REPLACE FUNCTION decide_applicants(
+    p_applicant_ids uuid[],
+    p_owner_id uuid,
+    p_status text,
+    p_emails jsonb DEFAULT '{}'::jsonb
+)
+RETURNS TABLE (applicant_id uuid, changed boolean, email_queued boolean)
+LANGUAGE sql
+AS $$
+    WITH target AS (
+        SELECT a.id, a.status IS DISTINCT FROM p_status AS changed
+        FROM applicants a
+        JOIN projects p ON p.id = a.project_id
+        WHERE a.id = ANY(p_applicant_ids)
+          AND a.deleted_at = '1970-01-01 00:00:00+00'
+          AND p.deleted_at = '1970-01-01 00:00:00+00'
+          AND p.owner_id = p_owner_id
+        FOR UPDATE OF a
+    ), updated AS (
+        UPDATE applicants a
+        SET status = p_status,
+            status_version = a.status_version + 1
+        FROM target t
+        WHERE a.id = t.id AND t.changed
+        RETURNING a.id, a.status_version
+    ), queued AS (
+        INSERT INTO email_outbox (idempotency_key, to_email, from_email, subject, html)
+        SELECT 'decision:' || u.id || ':' || u.status_version,
+               m ->> 'to_email', m ->> 'from_email', m ->> 'subject', m ->> 'html'
+        FROM updated u
+        CROSS JOIN LATERAL (SELECT p_emails -> u.id::text AS m) message
+        WHERE m IS NOT NULL
+        ON CONFLICT (idempotency_key) DO NOTHING
+        RETURNING 1
+    )
+    SELECT t.id, t.changed, t.changed AND p_emails ? t.id::text
+    FROM target t;
+$$;
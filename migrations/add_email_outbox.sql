@@ -0,0 +1,43 @@
+-- Migration: Transactional outbox for notification emails
+-- Run this in the Supabase SQL Editor
+
+CREATE TABLE IF NOT EXISTS email_outbox (
+    id uuid default uuid_generate_v4() primary key,
+    idempotency_key text not null unique,  -- e.g. decision:<applicant_id>:<status>
+    to_email text not null,
+    from_email text not null,
+    subject text not null,
+    html text not null,
+    status text not null default 'pending',  -- pending, sending, sent, failed
+    attempts integer not null default 0,
+    next_attempt_at timestamp with time zone default timezone('utc'::text, now()) not null,
+    locked_until timestamp with time zone,
+    last_error text,
+    sent_at timestamp with time zone,
+    created_at timestamp with time zone default timezone('utc'::text, now()) not null
+);
+
+-- Dispatcher scan: only undelivered rows are indexed
+CREATE INDEX IF NOT EXISTS idx_email_outbox_due
+ON email_outbox(next_attempt_at)
+WHERE status IN ('pending', 'sending');
+
+-- Lease a batch of due rows. SKIP LOCKED lets several dispatchers run side by side;
+-- rows leased by a dispatcher that died become due again once the lease expires.
+CREATE OR REPLACE FUNCTION claim_email_outbox(batch_size integer, lease_seconds integer DEFAULT 300)
+RETURNS SETOF email_outbox
+LANGUAGE sql
+AS $$
+    UPDATE email_outbox
+    SET status = 'sending',
+        locked_until = now() + make_interval(secs => lease_seconds)
+    WHERE id IN (
+        SELECT id FROM email_outbox
+        WHERE (status = 'pending' AND next_attempt_at <= now())
+           OR (status = 'sending' AND locked_until < now())
+        ORDER BY next_attempt_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    )
+    RETURNING *;
+$$;
@@ -0,0 +1,64 @@
+-- Migration: Employee directory paging, filters and trigram search
+-- Run this in the Supabase SQL Editor
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 1. Directory pages: ORDER BY name, id (keyset), optionally filtered by department / status
+CREATE INDEX IF NOT EXISTS idx_employees_directory
+ON employees(deleted_at, name, id);
+
+CREATE INDEX IF NOT EXISTS idx_employees_department_directory
+ON employees(deleted_at, department, name, id);
+
+CREATE INDEX IF NOT EXISTS idx_employees_status_directory
+ON employees(deleted_at, status, name, id);
+
+-- 2. Name / email search: trigram GIN indexes on the bare columns serve
+--    `name ILIKE '%term%'` (the RPC and the PostgREST ilike fallback alike) and
+--    the % similarity operator. Trigrams are case-insensitive, so no lower().
+CREATE INDEX IF NOT EXISTS idx_employees_name_trgm
+ON employees USING gin (name gin_trgm_ops)
+WHERE deleted_at = '1970-01-01 00:00:00+00';
+
+CREATE INDEX IF NOT EXISTS idx_employees_email_trgm
+ON employees USING gin (email gin_trgm_ops)
+WHERE deleted_at = '1970-01-01 00:00:00+00';
+
+-- 3. Ranked search: prefix matches first, then substring matches, then fuzzy
+--    (typo-tolerant) matches by similarity. Returns only the directory columns.
+CREATE OR REPLACE FUNCTION search_employees(
+    p_query text,
+    p_department text DEFAULT NULL,
+    p_status text DEFAULT NULL,
+    p_limit integer DEFAULT 50
+)
+RETURNS TABLE (
+    id uuid,
+    name text,
+    email text,
+    role text,
+    department text,
+    leave_remaining integer,
+    status text
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT e.id, e.name, e.email, e.role, e.department, e.leave_remaining, e.status
+    FROM employees e
+    WHERE e.deleted_at = '1970-01-01 00:00:00+00'
+      AND (p_department IS NULL OR e.department = p_department)
+      AND (p_status IS NULL OR e.status = p_status)
+      AND (
+          e.name ILIKE '%' || p_query || '%'
+          OR e.email ILIKE '%' || p_query || '%'
+          OR e.name % p_query
+          OR e.email % p_query
+      )
+    ORDER BY
+        (e.name ILIKE p_query || '%' OR e.email ILIKE p_query || '%') DESC,
+        (e.name ILIKE '%' || p_query || '%' OR e.email ILIKE '%' || p_query || '%') DESC,
+        greatest(similarity(e.name, p_query), similarity(e.email, p_query)) DESC,
+        e.name, e.id
+    LIMIT p_limit;
+$$;
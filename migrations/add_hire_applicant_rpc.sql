@@ -0,0 +1,77 @@
+-- Migration: Transactional hire workflow (convert / verify) as one RPC call
+-- Run this in the Supabase SQL Editor
+
+-- Replaces the fetch applicant -> check status -> look up employee -> insert/restore
+-- -> mark hired sequence. The applicant row is locked FOR UPDATE, so a double click
+-- waits for the first call and then fails the status check instead of hiring twice.
+--
+-- Errors are raised with a stable message the API maps to an HTTP status:
+--   applicant_not_found, not_authorized, invalid_status, employee_exists
+CREATE OR REPLACE FUNCTION hire_applicant(
+    p_applicant_id uuid,
+    p_owner_id uuid,
+    p_required_status text,
+    p_role text,
+    p_department text,
+    p_leave_remaining integer DEFAULT 12,
+    p_join_date date DEFAULT CURRENT_DATE,
+    p_restore_deleted boolean DEFAULT false  -- reactivate a soft-deleted employee with the same email
+)
+RETURNS employees
+LANGUAGE plpgsql
+AS $$
+DECLARE
+    v_applicant applicants%ROWTYPE;
+    v_owner uuid;
+    v_existing employees%ROWTYPE;
+    v_employee employees%ROWTYPE;
+BEGIN
+    SELECT * INTO v_applicant
+    FROM applicants
+    WHERE id = p_applicant_id AND deleted_at = '1970-01-01 00:00:00+00'
+    FOR UPDATE;
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'applicant_not_found' USING ERRCODE = 'P0002';
+    END IF;
+
+    SELECT owner_id INTO v_owner FROM projects WHERE id = v_applicant.project_id;
+    IF v_owner IS DISTINCT FROM p_owner_id THEN
+        RAISE EXCEPTION 'not_authorized' USING ERRCODE = '42501';
+    END IF;
+
+    IF v_applicant.status IS DISTINCT FROM p_required_status THEN
+        RAISE EXCEPTION 'invalid_status' USING ERRCODE = 'P0001';
+    END IF;
+
+    SELECT * INTO v_existing FROM employees WHERE email = v_applicant.email FOR UPDATE;
+    IF FOUND THEN
+        IF v_existing.deleted_at = '1970-01-01 00:00:00+00' OR NOT p_restore_deleted THEN
+            RAISE EXCEPTION 'employee_exists' USING ERRCODE = 'P0001';
+        END IF;
+
+        UPDATE employees SET
+            name = v_applicant.name,
+            role = p_role,
+            department = p_department,
+            leave_remaining = p_leave_remaining,
+            status = 'active',
+            join_date = p_join_date,
+            updated_at = timezone('utc'::text, now()),
+            deleted_at = '1970-01-01 00:00:00+00'
+        WHERE id = v_existing.id
+        RETURNING * INTO v_employee;
+    ELSE
+        BEGIN
+            INSERT INTO employees (name, email, role, department, leave_remaining, status, join_date)
+            VALUES (v_applicant.name, v_applicant.email, p_role, p_department, p_leave_remaining, 'active', p_join_date)
+            RETURNING * INTO v_employee;
+        EXCEPTION WHEN unique_violation THEN
+            -- A concurrent hire of another applicant with the same email won the race
+            RAISE EXCEPTION 'employee_exists' USING ERRCODE = 'P0001';
+        END;
+    END IF;
+
+    UPDATE applicants SET status = 'hired' WHERE id = p_applicant_id;
+    RETURN v_employee;
+END;
+$$;
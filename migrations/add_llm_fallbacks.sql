@@ -0,0 +1,90 @@
+-- Migration: Fallbacks for LLM outages (stale policy answers, scoring retries)
+-- Run this in the Supabase SQL Editor
+
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+
+-- 1. Policy chat: where each logged answer came from, and whether it used an
+--    employee's data (personalized answers are only reused for the same user
+--    asking about the same employee)
+--    source: 'llm', 'stale' (a reused answer) or 'retrieval' (quoted policy text)
+ALTER TABLE policy_logs ADD COLUMN IF NOT EXISTS source text NOT NULL DEFAULT 'llm';
+ALTER TABLE policy_logs ADD COLUMN IF NOT EXISTS personalized boolean NOT NULL DEFAULT false;
+ALTER TABLE policy_logs ADD COLUMN IF NOT EXISTS employee_id uuid;  -- whose data a personalized answer used
+
+CREATE INDEX IF NOT EXISTS idx_policy_logs_query_trgm
+ON policy_logs USING gin (lower(query) gin_trgm_ops)
+WHERE source = 'llm';
+
+-- Most similar earlier LLM answer to a question (trigram similarity), for when the LLM is down.
+-- p_employee_id: the employee the question is about (NULL: none; only general answers match)
+DROP FUNCTION IF EXISTS similar_policy_answer(uuid, text, real);  -- before p_employee_id
+
+CREATE OR REPLACE FUNCTION similar_policy_answer(
+    p_user_id uuid,
+    p_query text,
+    p_employee_id uuid DEFAULT NULL,
+    p_min_similarity real DEFAULT 0.4
+)
+RETURNS TABLE (
+    query text,
+    answer text,
+    reasoning text,
+    created_at timestamp with time zone,
+    similarity real
+)
+LANGUAGE sql
+STABLE
+AS $$
+    SELECT l.query, l.answer, l.reasoning, l.created_at, similarity(lower(l.query), lower(p_query))
+    FROM policy_logs l
+    WHERE l.source = 'llm'
+      AND (NOT l.personalized OR (l.user_id = p_user_id AND l.employee_id = p_employee_id))
+      AND lower(l.query) % lower(p_query)
+      AND similarity(lower(l.query), lower(p_query)) >= p_min_similarity
+    ORDER BY similarity(lower(l.query), lower(p_query)) DESC, l.created_at DESC
+    LIMIT 1;
+$$;
+
+-- 2. CV scoring: failed LLM calls are retried later instead of scoring the CV 0
+--    scoring_status: NULL (scored or never queued), 'retry' (waiting for next_scoring_at),
+--    'failed' (gave up; HR can re-queue it from the inbox)
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS scoring_status text;
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS scoring_attempts integer NOT NULL DEFAULT 0;
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS next_scoring_at timestamp with time zone;
+
+CREATE INDEX IF NOT EXISTS idx_applicants_scoring_due
+ON applicants(next_scoring_at)
+WHERE scoring_status = 'retry';
+
+-- Lease due retries: next_scoring_at moves past the lease, so a worker that dies
+-- mid-batch leaves its rows due again later. SKIP LOCKED lets workers run side by side.
+CREATE OR REPLACE FUNCTION claim_scoring_retries(batch_size integer, lease_seconds integer DEFAULT 300)
+RETURNS TABLE (
+    id uuid,
+    name text,
+    email text,
+    cv_hash text,
+    scoring_attempts integer,
+    owner_id uuid
+)
+LANGUAGE sql
+AS $$
+    WITH due AS (
+        SELECT a.id FROM applicants a
+        WHERE a.scoring_status = 'retry'
+          AND a.next_scoring_at <= now()
+          AND a.deleted_at = '1970-01-01 00:00:00+00'
+        ORDER BY a.next_scoring_at
+        LIMIT batch_size
+        FOR UPDATE SKIP LOCKED
+    ), leased AS (
+        UPDATE applicants a
+        SET next_scoring_at = now() + make_interval(secs => lease_seconds)
+        FROM due
+        WHERE a.id = due.id
+        RETURNING a.id, a.name, a.email, a.cv_hash, a.scoring_attempts, a.project_id
+    )
+    SELECT l.id, l.name, l.email, l.cv_hash, l.scoring_attempts, p.owner_id
+    FROM leased l
+    JOIN projects p ON p.id = l.project_id;
+$$;
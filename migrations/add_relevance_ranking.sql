@@ -0,0 +1,18 @@
+-- Migration: Local relevance pre-ranking and optional LLM scoring gates
+-- Run this in the Supabase SQL Editor
+
+-- 1. CV relevance to the project's description / requirements (0-100, see backend/relevance.py)
+ALTER TABLE applicants ADD COLUMN IF NOT EXISTS relevance_score INTEGER;
+
+-- Project inbox sorted by relevance: ORDER BY relevance_score DESC NULLS LAST, id DESC
+CREATE INDEX IF NOT EXISTS idx_applicants_project_relevance
+ON applicants(project_id, deleted_at, relevance_score DESC NULLS LAST, id DESC);
+
+-- 2. Precomputed project term vector, rewritten whenever description / requirements change
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS relevance_vector JSONB;
+
+-- 3. Optional gates on LLM scoring for high-volume roles (NULL or 0 = off)
+--    llm_min_relevance: only applications at or above this relevance are sent to the LLM
+--    llm_top_n:         only applications ranking in the project's top N by relevance are sent
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS llm_min_relevance INTEGER CHECK (llm_min_relevance BETWEEN 0 AND 100);
+ALTER TABLE projects ADD COLUMN IF NOT EXISTS llm_top_n INTEGER CHECK (llm_top_n >= 0);